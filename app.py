@@ -1,12 +1,31 @@
-from flask import Flask, jsonify, send_from_directory, request
+from flask import Flask, Response, jsonify, send_from_directory, request
 from flask_cors import CORS
+from werkzeug.exceptions import RequestEntityTooLarge
+from collections import OrderedDict
+from datetime import datetime, timezone
+import hashlib
 import json
-import joblib
-import numpy as np
+import math
+import mimetypes
 import os
+import re
+import threading
+import time
+import metrics
+from model_registry import REGISTRY_DIR, ModelRegistry, UnknownModelVersion
+from predict_coalescer import PredictionCoalescer
 
 app = Flask(__name__)
 
+# Largest request body accepted (asgi.py enforces the same cap); past it the
+# POST routes answer 413 before parsing anything
+MAX_BODY_BYTES = 16 * 1024 * 1024
+app.config['MAX_CONTENT_LENGTH'] = MAX_BODY_BYTES
+
+@app.errorhandler(RequestEntityTooLarge)
+def request_too_large(e):
+    return jsonify({"error": f"Request body exceeds {app.config['MAX_CONTENT_LENGTH']} bytes"}), 413
+
 # Explicitly allow all Vercel deployments and local dev
 allowed_origins = [
     "https://engagex-yt.vercel.app",
@@ -19,56 +38,671 @@ allowed_origins = [
 ]
 CORS(app, origins=allowed_origins, supports_credentials=True)
 
-# Load the trained machine learning model and scaler
-try:
-    rf_model = joblib.load('rf_model.joblib')
-    rf_scaler = joblib.load('rf_scaler.joblib')
-except Exception as e:
-    print(f"Warning: ML model not found. /api/predict will fail. {e}")
-    rf_model = None
-    rf_scaler = None
+# Request instrumentation, exposed on /metrics. Routes are labelled by their
+# template (e.g. /api/assets/<path:filename>) to keep label cardinality fixed.
+REQUEST_SECONDS = metrics.REGISTRY.histogram(
+    'engagex_http_request_duration_seconds', 'Time to produce a response, by route template',
+    labelnames=('route', 'method', 'status'))
+REQUESTS_IN_FLIGHT = metrics.REGISTRY.gauge(
+    'engagex_http_requests_in_flight', 'Requests currently being handled', ('route',))
+INFERENCE_SECONDS = metrics.REGISTRY.histogram(
+    'engagex_model_inference_seconds', 'Model scoring time per call, excluding JSON handling',
+    labelnames=('engine',))
+INFERENCE_ROWS = metrics.REGISTRY.histogram(
+    'engagex_model_inference_rows', 'Rows scored per model call',
+    bounds=(1, 2, 4, 8, 16, 32, 64, 128, 512, 2048, 10000), labelnames=('engine',))
+JSON_SECONDS = metrics.REGISTRY.histogram(
+    'engagex_json_seconds', 'Request body decoding and response encoding time',
+    labelnames=('route', 'phase'))
+
+_static_routes = None
+
+def route_label(path):
+    """The route template serving `path`, without running the URL router."""
+    global _static_routes
+    if path.startswith('/api/assets/'):
+        return '/api/assets/<path:filename>'
+    if _static_routes is None:
+        _static_routes = frozenset(rule.rule for rule in app.url_map.iter_rules() if not rule.arguments)
+    return path if path in _static_routes else 'unmatched'
+
+class RequestMetricsMiddleware:
+    """Times each request from arrival until its response body is closed.
+
+    A WSGI wrapper rather than Flask request hooks: a few microseconds per
+    request, and the timing covers streamed bodies such as assets.
+    """
+
+    def __init__(self, wsgi_app):
+        self.wsgi_app = wsgi_app
+
+    def __call__(self, environ, start_response):
+        start = time.perf_counter()
+        route = route_label(environ.get('PATH_INFO', ''))
+        in_flight = REQUESTS_IN_FLIGHT.labels(route)
+        in_flight.inc()
+        status = ['500']
+
+        def record_status(status_line, headers, exc_info=None):
+            status[0] = status_line.split(' ', 1)[0]
+            return start_response(status_line, headers, exc_info)
+
+        def finish():
+            in_flight.dec()
+            REQUEST_SECONDS.labels(route, environ['REQUEST_METHOD'], status[0]).observe(time.perf_counter() - start)
+
+        try:
+            body = self.wsgi_app(environ, record_status)
+        except BaseException:
+            finish()
+            raise
+        return _ClosingBody(body, finish)
+
+class _ClosingBody:
+    # Iterates the wrapped body directly (no per-chunk wrapper) and runs
+    # `on_close` once the server closes it
+    __slots__ = ('body', 'on_close')
+
+    def __init__(self, body, on_close):
+        self.body = body
+        self.on_close = on_close
+
+    def __iter__(self):
+        return iter(self.body)
+
+    def close(self):
+        try:
+            if hasattr(self.body, 'close'):
+                self.body.close()
+        finally:
+            self.on_close()
+
+app.wsgi_app = RequestMetricsMiddleware(app.wsgi_app)
+
+# How often (seconds) the registry poller checks models/manifest.json (or the
+# legacy root artifacts) for a newly published model
+MODEL_CHECK_INTERVAL = float(os.environ.get('MODEL_CHECK_INTERVAL', 2.0))
+
+class PredictionCache:
+    """Bounded LRU cache of single-row predictions.
+
+    Keys are (model sha256, feature_tuple), so every model version gets its
+    own entries and a new version can never be answered from an old one's;
+    stale entries age out through the LRU.
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+prediction_cache = PredictionCache(int(os.environ.get('PREDICT_CACHE_SIZE', 4096)))
+
+model_registry = ModelRegistry(REGISTRY_DIR, poll_interval=MODEL_CHECK_INTERVAL,
+                               max_loaded=int(os.environ.get('MODEL_MAX_LOADED', 3)))
+# Load the model in the background so the worker answers /health and
+# /api/insights at once; a prediction arriving first waits for the load.
+# NumPy and joblib are imported by that load (and the functions below), not here.
+model_registry.start()
+
+def select_model(version=None):
+    """Return (ModelVersion, None) to serve (`version` pins one), or (None, (message, status))."""
+    model_registry.start()
+    try:
+        model = model_registry.get(version)
+    except UnknownModelVersion as e:
+        return None, (str(e), 404)
+    except Exception as e:
+        return None, (f"Model could not be loaded: {e}", 500)
+    if model is None:
+        return None, ("Model not loaded", 500)
+    return model, None
+
+def resolve_model():
+    """The ModelVersion for this Flask request, or an error response."""
+    model, error = select_model(request.args.get('model'))
+    if error:
+        message, status = error
+        return None, (jsonify({"error": message}), status)
+    return model, None
+
+INSIGHTS_PATH = 'frontend/public/insights.json'
+
+class JSONFileSnapshot:
+    """In-memory, pre-serialized copy of a JSON file on disk.
+
+    The file is only re-read when its mtime or size changes (checked at most
+    every `check_interval` seconds), and only re-parsed when its content hash
+    changes. The hash doubles as a strong ETag. If a changed file fails to
+    parse, the last good copy keeps being served.
+    """
+
+    def __init__(self, path, check_interval=1.0):
+        self.path = path
+        self.check_interval = check_interval
+        self._snapshot = None  # (signature, content_hash, body, etag, last_modified, data)
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _refresh(self):
+        st = os.stat(self.path)
+        signature = (st.st_mtime_ns, st.st_size)
+        if self._snapshot is not None and self._snapshot[0] == signature:
+            return
+        with open(self.path, 'rb') as f:
+            raw = f.read()
+        content_hash = hashlib.sha256(raw).hexdigest()
+        last_modified = datetime.fromtimestamp(int(st.st_mtime), tz=timezone.utc)
+        if self._snapshot is not None and self._snapshot[1] == content_hash:
+            # Touched but unchanged: keep the serialized body and ETag
+            self._snapshot = (signature, content_hash) + self._snapshot[2:]
+            return
+        try:
+            data = json.loads(raw)
+        except ValueError as e:
+            if self._snapshot is None:
+                raise
+            # A bad write shouldn't take the route down: keep serving the last good
+            # copy, and only look again once the file changes
+            print(f"Warning: could not parse {self.path}, keeping the previous version. {e}")
+            self._snapshot = (signature,) + self._snapshot[1:]
+            return
+        # Serialize the same way jsonify would, once per change instead of per request
+        body = (app.json.dumps(data) + "\n").encode('utf-8')
+        self._snapshot = (signature, content_hash, body, content_hash[:32], last_modified, data)
+
+    def get(self):
+        """Return (body, etag, last_modified, data), reloading from disk if the file changed."""
+        now = time.monotonic()
+        if self._snapshot is None or now - self._checked_at >= self.check_interval:
+            with self._lock:
+                self._refresh()
+                self._checked_at = now
+        return self._snapshot[2:]
+
+insights_snapshot = JSONFileSnapshot(INSIGHTS_PATH)
 
 @app.route('/api/insights', methods=['GET'])
 def get_insights():
     try:
-        with open('frontend/public/insights.json', 'r') as f:
-            data = json.load(f)
-        return jsonify(data)
+        body, etag, last_modified, _ = insights_snapshot.get()
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+    response = Response(body, mimetype='application/json')
+    response.set_etag(etag)
+    response.last_modified = last_modified
+    # Clients may keep a copy but must revalidate; unchanged payloads cost a 304
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+ASSETS_DIR = 'frontend/public/assets'
+ASSET_ENCODINGS = [('br', '.br'), ('gzip', '.gz')]  # preferred first
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+# Content-addressed copies the pipeline writes next to each chart, <stem>.<sha256[:12]><ext>
+# (listed in manifest.json by data_analysis.update_asset_manifest). A file with
+# such a name is never rewritten, so it can be cached for good.
+HASHED_ASSET_NAME = re.compile(r'\.[0-9a-f]{12}\.[^./]+$')
+
+def is_hashed_asset(filename):
+    return HASHED_ASSET_NAME.search(filename) is not None
+
 @app.route('/api/assets/<path:filename>')
 def serve_assets(filename):
     # This now seamlessly serves the .json Plotly graph payloads
-    return send_from_directory('frontend/public/assets', filename)
+    mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+
+    # Prefer a precompressed sibling the client accepts over compressing on the fly
+    for encoding, suffix in ASSET_ENCODINGS:
+        if request.accept_encodings[encoding] and os.path.isfile(os.path.join(ASSETS_DIR, filename + suffix)):
+            response = send_from_directory(ASSETS_DIR, filename + suffix, mimetype=mimetype)
+            response.headers['Content-Encoding'] = encoding
+            break
+    else:
+        response = send_from_directory(ASSETS_DIR, filename, mimetype=mimetype)
+    response.vary.add('Accept-Encoding')
+
+    if is_hashed_asset(filename):
+        # The name carries the content hash of this very file, so this URL can never change meaning
+        response.cache_control.no_cache = None
+        response.cache_control.public = True
+        response.cache_control.max_age = IMMUTABLE_MAX_AGE
+        response.cache_control.immutable = True
+    else:
+        response.cache_control.no_cache = True
+    return response
+
+# Feature order the scaler and forest were trained on, with the calculator defaults
+PREDICT_FEATURES = ['price', 'dlc_count', 'release_year', 'metacritic_score']
+PREDICT_DEFAULTS = {
+    'price': 0,
+    'dlc_count': 0,
+    'release_year': 2025,
+    'metacritic_score': 75, # default to mid-tier metacritic if not provided
+}
+
+# Upper bound on rows accepted by a single /api/predict/batch request
+MAX_BATCH_ROWS = int(os.environ.get('PREDICT_BATCH_MAX_ROWS', 10000))
+
+# The compiled forest wins on small inputs where sklearn's fixed per-call cost
+# dominates; past a few hundred rows sklearn's threaded Cython traversal is faster.
+COMPILED_FOREST_MAX_ROWS = 512
+
+def score_features(X, model):
+    """Standardize a (n_rows, 4) feature matrix and return clipped 0-100 engagement scores."""
+    import numpy as np
+    start = time.perf_counter()
+    if model.forest is not None and len(X) <= COMPILED_FOREST_MAX_ROWS:
+        engine = 'compiled'
+        scores = np.clip(model.forest.predict(X), 0, 100)
+    else:
+        engine = 'sklearn'
+        X_scaled = model.scaler.transform(X)
+        scores = np.clip(model.model.predict(X_scaled), 0, 100)
+    INFERENCE_SECONDS.labels(engine).observe(time.perf_counter() - start)
+    INFERENCE_ROWS.labels(engine).observe(len(X))
+    return scores
+
+def _column_to_floats(values, name, errors):
+    # Fast path: the whole column converts in one call. Otherwise fall back to
+    # per-value conversion so that only the offending rows are rejected.
+    import numpy as np
+    try:
+        col = np.asarray(values, dtype=np.float64)
+        if col.ndim == 1:
+            return col
+    except (TypeError, ValueError):
+        pass
+    col = np.full(len(values), np.nan)
+    for i, value in enumerate(values):
+        try:
+            col[i] = float(value)
+        except (TypeError, ValueError):
+            errors.setdefault(i, f"invalid value for '{name}': {value!r}")
+    return col
+
+def parse_batch(payload):
+    """Turn a batch payload into a feature matrix plus a {row_index: error} map.
+
+    Accepts either a list of records (top-level or under "rows") or a columnar
+    object under "columns" mapping feature names to equal-length lists.
+    """
+    import numpy as np
+    if isinstance(payload, dict) and 'columns' in payload:
+        columns = payload['columns']
+        if not isinstance(columns, dict):
+            raise ValueError("'columns' must be an object of feature lists")
+        lengths = {len(v) for v in columns.values() if isinstance(v, list)}
+        if len(lengths) > 1 or any(not isinstance(v, list) for v in columns.values()):
+            raise ValueError("'columns' must hold lists of equal length")
+        n_rows = lengths.pop() if lengths else 0
+        records = None
+    else:
+        records = payload.get('rows') if isinstance(payload, dict) else payload
+        if not isinstance(records, list):
+            raise ValueError("Expected a list of rows or a 'columns' object")
+        n_rows = len(records)
+
+    if n_rows > MAX_BATCH_ROWS:
+        raise OverflowError(f"Batch of {n_rows} rows exceeds the limit of {MAX_BATCH_ROWS}")
+
+    errors = {}
+    if records is not None:
+        for i, row in enumerate(records):
+            if not isinstance(row, dict):
+                errors[i] = "row must be an object"
+        columns = {
+            name: [row.get(name, PREDICT_DEFAULTS[name]) if isinstance(row, dict) else 0 for row in records]
+            for name in PREDICT_FEATURES
+        }
+
+    X = np.empty((n_rows, len(PREDICT_FEATURES)))
+    for j, name in enumerate(PREDICT_FEATURES):
+        values = columns.get(name)
+        if values is None:
+            X[:, j] = PREDICT_DEFAULTS[name]
+        else:
+            X[:, j] = _column_to_floats(values, name, errors)
+
+    for i in np.flatnonzero(~np.isfinite(X).all(axis=1)):
+        errors.setdefault(int(i), "features must be finite numbers")
+    return X, errors
+
+def parse_features(data):
+    features = tuple(float(data.get(name, PREDICT_DEFAULTS[name])) for name in PREDICT_FEATURES)
+    # float() accepts "nan" and "inf", which the forest would score like any other number
+    if not all(math.isfinite(value) for value in features):
+        raise ValueError("features must be finite numbers")
+    return features
+
+# Where a prediction lands among real games, from the score quantiles the
+# pipeline exported (score_distribution.py, imported on first use)
+SCORE_DISTRIBUTION_PATH = 'score_distribution.json'
+distribution_snapshot = JSONFileSnapshot(SCORE_DISTRIBUTION_PATH)
+_score_distribution = (None, None)  # (content etag, ScoreDistribution)
+
+def current_score_distribution():
+    """The exported ScoreDistribution, or None before the pipeline has written one."""
+    global _score_distribution
+    try:
+        _, etag, _, data = distribution_snapshot.get()
+    except FileNotFoundError:
+        return None
+    if _score_distribution[0] != etag:
+        from score_distribution import ScoreDistribution
+        _score_distribution = (etag, ScoreDistribution(data))
+    return _score_distribution[1]
+
+def score_ranking(data, score):
+    """Percentile and rank of a score overall, in the price's tier and, if the body names one, the genre."""
+    distribution = current_score_distribution()
+    if distribution is None:
+        return {}
+    from score_distribution import pricing_tier
+    peers = {"pricing_tier": distribution.rank(score, 'pricing_tier',
+                                               pricing_tier(float(data.get('price', PREDICT_DEFAULTS['price']))))}
+    if isinstance(data.get('genre'), str):
+        peers["genre"] = distribution.rank(score, 'genre', data['genre'])
+    return {**distribution.rank(score), "peers": {name: rank for name, rank in peers.items() if rank is not None}}
+
+def prediction_response(data, model, score):
+    return {
+        "predicted_engagement": round(score, 1),
+        "inputs": data,
+        "model_version": model.version,
+        **score_ranking(data, score)
+    }
+
+# Concurrent single predictions are scored together: a batch closes after
+# PREDICT_COALESCE_ROWS rows, PREDICT_COALESCE_MS after its first row, or as
+# soon as no other admitted request is still on its way
+predict_coalescer = PredictionCoalescer(
+    score_features,
+    max_rows=int(os.environ.get('PREDICT_COALESCE_ROWS', 64)),
+    max_delay=float(os.environ.get('PREDICT_COALESCE_MS', 2.0)) / 1000)
+
+def predict_single(data, model, ticket):
+    """Score one request body through the coalescer; raises on invalid input."""
+    features = parse_features(data)
+
+    # Slider-driven calls repeat the same inputs constantly, so check the cache first
+    cache_key = (model.sha256, features)
+    score = prediction_cache.get(cache_key)
+    if score is None:
+        # Standardize, predict and clip score between 0 and 100 for safety
+        score = ticket.submit(features, model).result()
+        prediction_cache.put(cache_key, score)
+    return prediction_response(data, model, score)
+
+def predict_many(payload, model):
+    """Score a batch payload; raises OverflowError past MAX_BATCH_ROWS, ValueError if malformed."""
+    import numpy as np
+    X, errors = parse_batch(payload)
+
+    # Score every valid row with a single scaler + forest pass over the matrix
+    valid = np.ones(len(X), dtype=bool)
+    valid[list(errors)] = False
+    scores = np.full(len(X), np.nan)
+    if valid.any():
+        scores[valid] = score_features(X[valid], model)
+
+    predictions = [
+        {"error": errors[i]} if i in errors else {"predicted_engagement": round(float(scores[i]), 1)}
+        for i in range(len(X))
+    ]
+    return {
+        "predictions": predictions,
+        "count": len(predictions),
+        "errors": len(errors),
+        "model_version": model.version
+    }
 
 @app.route('/api/predict', methods=['POST'])
 def predict_engagement():
-    if not rf_model or not rf_scaler:
-        return jsonify({"error": "Model not loaded"}), 500
-        
+    with predict_coalescer.admit() as ticket:
+        model, error = resolve_model()
+        if error:
+            return error
+
+        try:
+            with JSON_SECONDS.labels('/api/predict', 'decode').time():
+                data = request.json
+            result = predict_single(data, model, ticket)
+        except RequestEntityTooLarge:
+            raise
+        except Exception as e:
+            return jsonify({"error": str(e)}), 400
+        with JSON_SECONDS.labels('/api/predict', 'encode').time():
+            return jsonify(result)
+
+@app.route('/api/predict/batch', methods=['POST'])
+def predict_engagement_batch():
+    # Batches are scored in one vectorized pass and bypass the per-row cache
+    model, error = resolve_model()
+    if error:
+        return error
+
     try:
-        data = request.json
-        features = [
-            float(data.get('price', 0)),
-            float(data.get('dlc_count', 0)),
-            float(data.get('release_year', 2025)),
-            float(data.get('metacritic_score', 75)) # default to mid-tier metacritic if not provided
-        ]
-        
-        # Standardize and predict
-        X_scaled = rf_scaler.transform([features])
-        prediction = rf_model.predict(X_scaled)[0]
-        
-        # Clip score between 0 and 100 for safety
-        score = min(max(prediction, 0), 100)
-        
-        return jsonify({
-            "predicted_engagement": round(score, 1),
-            "inputs": data
-        })
+        with JSON_SECONDS.labels('/api/predict/batch', 'decode').time():
+            payload = request.get_json(force=True)
+        result = predict_many(payload, model)
+    except OverflowError as e:
+        return jsonify({"error": str(e)}), 413
+    except RequestEntityTooLarge:
+        raise
     except Exception as e:
         return jsonify({"error": str(e)}), 400
+    with JSON_SECONDS.labels('/api/predict/batch', 'encode').time():
+        return jsonify(result)
+
+# Engagement scores for new titles, from the transform the pipeline saved
+# (engagement_transform.py, imported on first use like NumPy)
+ENGAGEMENT_TRANSFORM_PATH = 'engagement_transform.json'
+engagement_snapshot = JSONFileSnapshot(ENGAGEMENT_TRANSFORM_PATH)
+_engagement_transform = (None, None)  # (content etag, EngagementTransform)
+
+def current_engagement_transform():
+    """The saved EngagementTransform, rebuilt only when the file's content changes."""
+    global _engagement_transform
+    _, etag, _, data = engagement_snapshot.get()
+    if _engagement_transform[0] != etag:
+        from engagement_transform import EngagementTransform
+        _engagement_transform = (etag, EngagementTransform.from_dict(data))
+    return _engagement_transform[1]
+
+def score_engagement(payload):
+    """Score one title (an object of RAW_INPUTS) or many ({"rows": [...]}) without refitting anything."""
+    import numpy as np
+    from engagement_transform import RAW_INPUTS
+    transform = current_engagement_transform()
+    many = isinstance(payload, dict) and 'rows' in payload
+    records = payload['rows'] if many else [payload]
+    if not isinstance(records, list):
+        raise ValueError("'rows' must be a list of objects")
+    if len(records) > MAX_BATCH_ROWS:
+        raise OverflowError(f"Batch of {len(records)} rows exceeds the limit of {MAX_BATCH_ROWS}")
+
+    errors = {i: "row must be an object" for i, row in enumerate(records) if not isinstance(row, dict)}
+    X = np.column_stack([
+        _column_to_floats([row.get(name) if isinstance(row, dict) else 0 for row in records], name, errors)
+        for name in RAW_INPUTS
+    ]) if records else np.empty((0, len(RAW_INPUTS)))
+    for i in np.flatnonzero(~np.isfinite(X).all(axis=1)):
+        errors.setdefault(int(i), "features must be finite numbers")
+    if not many and errors:
+        raise ValueError(errors[0])
+
+    valid = np.ones(len(X), dtype=bool)
+    valid[list(errors)] = False
+    scores = np.full(len(X), np.nan)
+    if valid.any():
+        scores[valid] = transform.score(*X[valid].T)
+    if not many:
+        return {"engagement_score": round(float(scores[0]), 1), "inputs": payload,
+                "transform_version": transform.version}
+    return {
+        "scores": [{"error": errors[i]} if i in errors else {"engagement_score": round(float(scores[i]), 1)}
+                   for i in range(len(X))],
+        "count": len(X),
+        "errors": len(errors),
+        "transform_version": transform.version
+    }
+
+def score_titles(payload):
+    """(status, response data) for an /api/score payload."""
+    try:
+        return 200, score_engagement(payload)
+    except FileNotFoundError:
+        return 503, {"error": "No engagement transform has been fitted yet; run data_analysis.py"}
+    except OverflowError as e:
+        return 413, {"error": str(e)}
+    except Exception as e:
+        return 400, {"error": str(e)}
+
+@app.route('/api/score', methods=['POST'])
+def score_new_titles():
+    try:
+        payload = request.get_json(force=True)
+    except RequestEntityTooLarge:
+        raise
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
+    status, data = score_titles(payload)
+    return jsonify(data), status
+
+# Per-game queries over the pipeline's columnar snapshot (game_index.py, memory-
+# mapped on first use); a rerun's new snapshot is picked up within a second
+GAME_INDEX_PATH = 'game_index.joblib'
+GAME_INDEX_CHECK_INTERVAL = 1.0
+_game_index = (None, None, 0.0)  # (file signature, GameIndex, last checked)
+_game_index_lock = threading.Lock()
+
+def current_game_index():
+    """The GameIndex on disk, reloaded when the file is replaced."""
+    global _game_index
+    if _game_index[1] is None or time.monotonic() - _game_index[2] >= GAME_INDEX_CHECK_INTERVAL:
+        with _game_index_lock:
+            st = os.stat(GAME_INDEX_PATH)
+            signature, index = (st.st_mtime_ns, st.st_size), _game_index[1]
+            if signature != _game_index[0]:
+                from game_index import GameIndex
+                index = GameIndex.load(GAME_INDEX_PATH)
+            _game_index = (signature, index, time.monotonic())
+    return _game_index[1]
+
+def _int_param(params, name):
+    value = params.get(name)
+    if value is None or value == '':
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"{name} must be an integer") from None
+
+def query_games(params):
+    """(status, response data) for /api/games query parameters (a dict of strings)."""
+    try:
+        index = current_game_index()
+    except FileNotFoundError:
+        return 503, {"error": "No game index has been built yet; run data_analysis.py"}
+    try:
+        limit = _int_param(params, 'limit')
+        ranks, next_cursor = index.query(genre=params.get('genre') or None,
+                                         year_min=_int_param(params, 'year_min'),
+                                         year_max=_int_param(params, 'year_max'),
+                                         pricing=params.get('pricing') or None,
+                                         limit=20 if limit is None else limit,
+                                         cursor=params.get('cursor') or None)
+    except ValueError as e:
+        return 400, {"error": str(e)}
+    return 200, {"games": index.records(ranks), "count": len(ranks), "next_cursor": next_cursor,
+                 "snapshot": index.version}
+
+@app.route('/api/games', methods=['GET'])
+def list_games():
+    # Top games by engagement: ?genre=RPG&year_min=2015&year_max=2020&pricing=free&limit=50&cursor=...
+    status, data = query_games(request.args)
+    return jsonify(data), status
+
+@app.route('/api/predict/cache', methods=['GET'])
+def prediction_cache_stats():
+    model = model_registry.get()
+    return jsonify({**prediction_cache.stats(), "model_version": model.version if model else None})
+
+@app.route('/api/predict/batching', methods=['GET'])
+def prediction_batching_stats():
+    # Batch size and queueing delay distributions of the single-prediction coalescer
+    return jsonify(predict_coalescer.stats())
+
+@app.route('/api/models', methods=['GET'])
+def list_models():
+    # Published versions with their training metrics; loaded ones add load time and memory
+    model_registry.start()
+    return jsonify(model_registry.describe())
+
+@metrics.REGISTRY.collector
+def _collect_serving_state():
+    # Read at scrape time from the objects that own these numbers
+    cache = prediction_cache.stats()
+    yield 'counter', 'engagex_prediction_cache_hits_total', 'Single-prediction cache hits', [({}, cache['hits'])]
+    yield 'counter', 'engagex_prediction_cache_misses_total', 'Single-prediction cache misses', [({}, cache['misses'])]
+    yield 'gauge', 'engagex_prediction_cache_entries', 'Entries in the single-prediction cache', [({}, cache['size'])]
+    loaded = [v for v in model_registry.describe()['versions'] if v['loaded']]
+    yield 'gauge', 'engagex_model_memory_bytes', 'Approximate memory held by each loaded model version', \
+        [({'version': v['version']}, v['memory_bytes']) for v in loaded]
+    yield 'gauge', 'engagex_model_load_seconds', 'Time taken to load each model version', \
+        [({'version': v['version']}, v['load_seconds']) for v in loaded]
+    yield 'histogram', 'engagex_coalescer_batch_rows', 'Rows per coalesced scoring call', \
+        [({}, predict_coalescer.batch_sizes)]
+    yield 'histogram', 'engagex_coalescer_queue_delay_milliseconds', 'Queueing delay added to each coalesced row', \
+        [({}, predict_coalescer.queue_delay_ms)]
+    rss = metrics.rss_bytes()
+    if rss is not None:
+        yield 'gauge', 'engagex_process_resident_memory_bytes', 'Resident memory of this worker', [({}, rss)]
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    # Per-process numbers: with several workers, each scrape sees the one that answered
+    return Response(metrics.REGISTRY.render(), content_type=metrics.CONTENT_TYPE)
 
 @app.route('/', methods=['GET'])
 def root():
@@ -0,0 +1,335 @@
+import asyncio
+import json
+import mimetypes
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from email.utils import formatdate, parsedate_to_datetime
+from urllib.parse import parse_qs
+
+from werkzeug.http import parse_accept_header
+from werkzeug.security import safe_join
+
+import app as api
+
+# ASGI entry point for the public routes, served by uvicorn:
+#
+#     uvicorn asgi:app --host 0.0.0.0 --port $PORT
+#
+# Under `gunicorn app:app --workers 1` the Flask app handles one request at a
+# time, so a slow client draining a large chart holds up every prediction queued
+# behind it. Here one event loop multiplexes all connections: asset files are
+# read in chunks on a thread and written as the client accepts them, and
+# inference runs off the loop so it overlaps with I/O: single predictions are
+# scored in shared micro-batches by app.predict_coalescer, batch requests on a
+# small bounded thread pool.
+# The snapshots, model registry and scoring code are shared with app.py, so both
+# entry points return the same bodies.
+
+# Threads that run batch requests (and load pinned model versions), and the most
+# predictions (running plus waiting) accepted at once; past that the server
+# answers 503 instead of queueing
+PREDICT_WORKERS = int(os.environ.get('PREDICT_WORKERS', 2))
+PREDICT_QUEUE_LIMIT = int(os.environ.get('PREDICT_QUEUE_LIMIT', 64))
+
+STREAM_CHUNK_BYTES = 64 * 1024
+MAX_BODY_BYTES = api.MAX_BODY_BYTES
+
+predict_executor = ThreadPoolExecutor(PREDICT_WORKERS, thread_name_prefix='predict')
+_predictions_in_flight = 0  # only touched from the event loop thread
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+def _header(scope, name):
+    for key, value in scope['headers']:
+        if key == name:
+            return value.decode('latin-1')
+    return None
+
+def _cors_headers(scope):
+    # Same policy as flask_cors in app.py: echo allowed origins, with credentials
+    origin = _header(scope, b'origin')
+    if origin not in api.allowed_origins:
+        return []
+    return [(b'access-control-allow-origin', origin.encode('latin-1')),
+            (b'access-control-allow-credentials', b'true'),
+            (b'vary', b'Origin')]
+
+async def _respond(send, status, body=b'', headers=(), include_body=True):
+    headers = list(headers) + [(b'content-length', str(len(body)).encode())]
+    await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+    await send({'type': 'http.response.body', 'body': body if include_body else b''})
+
+def _json_body(data):
+    # Compact, sorted output, exactly as Flask's jsonify renders it outside debug mode
+    return (api.app.json.dumps(data, separators=(",", ":")) + "\n").encode('utf-8')
+
+async def _respond_json(send, status, data, headers=()):
+    await _respond(send, status, _json_body(data), [(b'content-type', b'application/json')] + list(headers))
+
+async def _read_body(receive):
+    chunks, size = [], 0
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            raise HTTPError(400, "Client disconnected")
+        chunks.append(message.get('body', b''))
+        size += len(chunks[-1])
+        if size > MAX_BODY_BYTES:
+            raise HTTPError(413, f"Request body exceeds {MAX_BODY_BYTES} bytes")
+        if not message.get('more_body'):
+            return b''.join(chunks)
+
+def _not_modified(scope, etag, last_modified):
+    if_none_match = _header(scope, b'if-none-match')
+    if if_none_match is not None:
+        return etag in [tag.strip() for tag in if_none_match.split(',')] or if_none_match.strip() == '*'
+    if_modified_since = _header(scope, b'if-modified-since')
+    if if_modified_since is not None:
+        try:
+            return int(last_modified.timestamp()) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+async def insights(scope, send, cors):
+    loop = asyncio.get_running_loop()
+    try:
+        body, etag, last_modified, _ = await loop.run_in_executor(None, api.insights_snapshot.get)
+    except Exception as e:
+        await _respond_json(send, 500, {"error": str(e)}, cors)
+        return
+    etag = f'"{etag}"'
+    headers = cors + [(b'etag', etag.encode()),
+                      (b'last-modified', formatdate(last_modified.timestamp(), usegmt=True).encode()),
+                      (b'cache-control', b'no-cache')]
+    if _not_modified(scope, etag, last_modified):
+        await _respond(send, 304, headers=headers)
+        return
+    await _respond(send, 200, body, [(b'content-type', b'application/json')] + headers,
+                   include_body=scope['method'] != 'HEAD')
+
+def _open_asset(filename, accept_encoding):
+    """Resolve and open an asset like app.serve_assets: (file, size, mtime, encoding, mimetype, immutable)."""
+    immutable = api.is_hashed_asset(filename)
+    mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    accepted = parse_accept_header(accept_encoding)
+    candidates = [(encoding, filename + suffix) for encoding, suffix in api.ASSET_ENCODINGS if accepted[encoding]]
+    for encoding, name in candidates + [(None, filename)]:
+        path = safe_join(api.ASSETS_DIR, name)
+        if path is not None and os.path.isfile(path):
+            f = open(path, 'rb')
+            st = os.fstat(f.fileno())
+            return f, st.st_size, st.st_mtime, encoding, mimetype, immutable
+    return None
+
+async def asset(scope, send, cors, filename):
+    loop = asyncio.get_running_loop()
+    opened = await loop.run_in_executor(None, _open_asset, filename, _header(scope, b'accept-encoding'))
+    if opened is None:
+        await _respond_json(send, 404, {"error": "Not Found"}, cors)
+        return
+    f, size, mtime, encoding, mimetype, immutable = opened
+    try:
+        etag = f'"{int(mtime * 1e6):x}-{size:x}"'
+        headers = cors + [(b'content-type', mimetype.encode()), (b'etag', etag.encode()),
+                          (b'last-modified', formatdate(mtime, usegmt=True).encode()),
+                          (b'vary', b'Accept-Encoding')]
+        if encoding:
+            headers.append((b'content-encoding', encoding.encode()))
+        if immutable:
+            headers.append((b'cache-control', f'public, max-age={api.IMMUTABLE_MAX_AGE}, immutable'.encode()))
+        else:
+            headers.append((b'cache-control', b'no-cache'))
+
+        if _not_modified(scope, etag, datetime.fromtimestamp(mtime, tz=timezone.utc)):
+            await _respond(send, 304, headers=headers)
+            return
+        headers.append((b'content-length', str(size).encode()))
+        await send({'type': 'http.response.start', 'status': 200, 'headers': headers})
+        if scope['method'] == 'HEAD':
+            await send({'type': 'http.response.body', 'body': b''})
+            return
+        # send() only returns once the transport accepts the chunk, so a slow
+        # reader holds one file handle here instead of a whole worker
+        while True:
+            chunk = await loop.run_in_executor(None, f.read, STREAM_CHUNK_BYTES)
+            if not chunk:
+                break
+            await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+        await send({'type': 'http.response.body', 'body': b''})
+    finally:
+        f.close()
+
+def _predict_batch(body, version):
+    """Blocking batch prediction: pick the model, parse, score. Returns (status, data)."""
+    model, error = api.select_model(version)
+    if error:
+        message, status = error
+        return status, {"error": message}
+    try:
+        with api.JSON_SECONDS.labels('/api/predict/batch', 'decode').time():
+            payload = json.loads(body)
+        return 200, api.predict_many(payload, model)
+    except OverflowError as e:
+        return 413, {"error": str(e)}
+    except Exception as e:
+        return 400, {"error": str(e)}
+
+async def _predict_single(body, version, ticket):
+    """One prediction, scored by the shared coalescer without tying up a thread per request."""
+    # Off the loop either way: the registry may be holding its load lock, and a
+    # pinned version may have to be loaded from disk first
+    loop = asyncio.get_running_loop()
+    model, error = await loop.run_in_executor(predict_executor if version else None, api.select_model, version)
+    if error:
+        message, status = error
+        return status, {"error": message}
+    try:
+        with api.JSON_SECONDS.labels('/api/predict', 'decode').time():
+            data = json.loads(body)
+        features = api.parse_features(data)
+        cache_key = (model.sha256, features)
+        score = api.prediction_cache.get(cache_key)
+        if score is None:
+            score = await asyncio.wrap_future(ticket.submit(features, model))
+            api.prediction_cache.put(cache_key, score)
+        # Ranking the score may reload score_distribution.json, so that too runs off the loop
+        return 200, await loop.run_in_executor(None, api.prediction_response, data, model, score)
+    except Exception as e:
+        return 400, {"error": str(e)}
+
+async def predict(scope, receive, send, cors, batch):
+    global _predictions_in_flight
+    if _predictions_in_flight >= PREDICT_QUEUE_LIMIT:
+        await _respond_json(send, 503, {"error": "Prediction queue is full, retry shortly"},
+                            cors + [(b'retry-after', b'1')])
+        return
+    _predictions_in_flight += 1
+    try:
+        version = parse_qs(scope['query_string'].decode('latin-1')).get('model', [None])[0]
+        if batch:
+            body = await _read_body(receive)
+            loop = asyncio.get_running_loop()
+            status, data = await loop.run_in_executor(predict_executor, _predict_batch, body, version)
+        else:
+            with api.predict_coalescer.admit() as ticket:
+                body = await _read_body(receive)
+                status, data = await _predict_single(body, version, ticket)
+    finally:
+        _predictions_in_flight -= 1
+    with api.JSON_SECONDS.labels('/api/predict/batch' if batch else '/api/predict', 'encode').time():
+        body = _json_body(data)
+    await _respond(send, status, body, [(b'content-type', b'application/json')] + cors)
+
+def _score(body):
+    try:
+        payload = json.loads(body)
+    except ValueError as e:
+        return 400, {"error": str(e)}
+    return api.score_titles(payload)
+
+async def score(receive, send, cors):
+    body = await _read_body(receive)
+    # Cheap per row, but the first call reads the transform file and imports NumPy
+    status, data = await asyncio.get_running_loop().run_in_executor(None, _score, body)
+    await _respond(send, status, _json_body(data), [(b'content-type', b'application/json')] + cors)
+
+async def games(scope, send, cors):
+    params = {name: values[0] for name, values in parse_qs(scope['query_string'].decode('latin-1')).items()}
+    # Sub-millisecond once loaded, but the first call maps the index file
+    status, data = await asyncio.get_running_loop().run_in_executor(None, api.query_games, params)
+    await _respond(send, status, _json_body(data), [(b'content-type', b'application/json')] + cors)
+
+def _describe_models():
+    # start() takes the registry's load lock, and describe() sizes the loaded models
+    api.model_registry.start()
+    return api.model_registry.describe()
+
+async def _preflight(scope, send):
+    cors = _cors_headers(scope)
+    if cors:
+        requested = _header(scope, b'access-control-request-headers')
+        cors += [(b'access-control-allow-methods', b'GET, HEAD, POST, OPTIONS')]
+        if requested:
+            cors.append((b'access-control-allow-headers', requested.encode('latin-1')))
+    await _respond(send, 200, headers=cors)
+
+async def _http(scope, receive, send):
+    path, method = scope['path'], scope['method']
+    cors = _cors_headers(scope)
+    if method == 'OPTIONS':
+        await _preflight(scope, send)
+    elif path in ('/api/predict', '/api/predict/batch'):
+        if method != 'POST':
+            raise HTTPError(405, "Method Not Allowed")
+        await predict(scope, receive, send, cors, batch=path.endswith('/batch'))
+    elif path == '/api/score':
+        if method != 'POST':
+            raise HTTPError(405, "Method Not Allowed")
+        await score(receive, send, cors)
+    elif method not in ('GET', 'HEAD'):
+        raise HTTPError(405, "Method Not Allowed")
+    elif path == '/api/insights':
+        await insights(scope, send, cors)
+    elif path == '/api/games':
+        await games(scope, send, cors)
+    elif path.startswith('/api/assets/'):
+        await asset(scope, send, cors, path[len('/api/assets/'):])
+    elif path == '/api/predict/cache':
+        model = await asyncio.get_running_loop().run_in_executor(None, api.model_registry.get)
+        await _respond_json(send, 200, {**api.prediction_cache.stats(),
+                                        "model_version": model.version if model else None}, cors)
+    elif path == '/api/predict/batching':
+        await _respond_json(send, 200, api.predict_coalescer.stats(), cors)
+    elif path == '/api/models':
+        await _respond_json(send, 200, await asyncio.get_running_loop().run_in_executor(None, _describe_models), cors)
+    elif path == '/metrics':
+        await _respond(send, 200, api.metrics.REGISTRY.render().encode('utf-8'),
+                       [(b'content-type', api.metrics.CONTENT_TYPE.encode())] + cors)
+    elif path == '/health':
+        await _respond_json(send, 200, {"status": "healthy"}, cors)
+    elif path == '/':
+        await _respond_json(send, 200, {"status": "ok", "message": "EngageX API is live."}, cors)
+    else:
+        raise HTTPError(404, "Not Found")
+
+async def _lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            api.model_registry.start()
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            predict_executor.shutdown(wait=False)
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+async def app(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        await _lifespan(receive, send)
+        return
+    if scope['type'] != 'http':
+        return
+
+    # Latency runs until the last body chunk is handed to the server, so it
+    # includes streaming an asset to a slow client
+    route, start, status = api.route_label(scope['path']), time.perf_counter(), [500]
+
+    async def send_and_record(message):
+        if message['type'] == 'http.response.start':
+            status[0] = message['status']
+        await send(message)
+
+    api.REQUESTS_IN_FLIGHT.labels(route).inc()
+    try:
+        await _http(scope, receive, send_and_record)
+    except HTTPError as e:
+        await _respond_json(send_and_record, e.status, {"error": str(e)}, _cors_headers(scope))
+    finally:
+        api.REQUESTS_IN_FLIGHT.labels(route).dec()
+        api.REQUEST_SECONDS.labels(route, scope['method'], str(status[0])).observe(time.perf_counter() - start)
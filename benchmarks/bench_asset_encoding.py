@@ -0,0 +1,77 @@
+"""Size and decode time of chart assets as decimal text, float64 bdata and compact bdata.
+
+    python -m benchmarks.bench_asset_encoding [--assets-dir frontend/public/assets]
+
+Decode time is json.loads plus typed-array materialization in Python, a proxy
+for JSON.parse and plotly.js' typed-array decoding in the browser.
+"""
+import argparse
+import base64
+import gzip
+import json
+import os
+import time
+
+import numpy as np
+
+import data_analysis
+
+def _decode(node):
+    if isinstance(node, dict):
+        if 'bdata' in node and 'dtype' in node:
+            return np.frombuffer(base64.b64decode(node['bdata']), dtype='<' + node['dtype'])
+        return {key: _decode(value) for key, value in node.items()}
+    if isinstance(node, list):
+        return [_decode(value) for value in node]
+    return node
+
+def _as_text(node):
+    if isinstance(node, dict):
+        if 'bdata' in node and 'dtype' in node:
+            return _decode(node).tolist()
+        return {key: _as_text(value) for key, value in node.items()}
+    if isinstance(node, list):
+        return [_as_text(value) for value in node]
+    return node
+
+def _as_f8(node):
+    if isinstance(node, dict):
+        if 'bdata' in node and 'dtype' in node:
+            values = _decode(node).astype('<f8')
+            return {**node, 'dtype': 'f8', 'bdata': base64.b64encode(values.tobytes()).decode('ascii')}
+        return {key: _as_f8(value) for key, value in node.items()}
+    if isinstance(node, list):
+        return [_as_f8(value) for value in node]
+    return node
+
+def decode_seconds(payload, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        _decode(json.loads(payload))
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def run(assets_dir):
+    totals = {}
+    for name in sorted(os.listdir(assets_dir)):
+        if not name.endswith('.json') or name == data_analysis.ASSET_MANIFEST:
+            continue
+        with open(os.path.join(assets_dir, name)) as f:
+            f8 = _as_f8(json.load(f))
+        encodings = {'text': _as_text(f8), 'f8': f8, 'compact': data_analysis.compact_typed_arrays(f8)}
+        row = []
+        for label, figure in encodings.items():
+            payload = json.dumps(figure, separators=(',', ':')).encode('utf-8')
+            sizes = (len(payload), len(gzip.compress(payload)), decode_seconds(payload))
+            totals[label] = [a + b for a, b in zip(totals.get(label, (0, 0, 0)), sizes)]
+            row.append(f"{label} {sizes[0] / 1e3:8.1f} KB / {sizes[1] / 1e3:6.1f} KB gz / {sizes[2] * 1e3:6.2f} ms")
+        print(f"{name:<28}" + "   ".join(row))
+    for label, (raw, gz, seconds) in totals.items():
+        print(f"{'total ' + label:<28}{raw / 1e3:8.1f} KB json  {gz / 1e3:7.1f} KB gzip  {seconds * 1e3:7.2f} ms decode")
+    return totals
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--assets-dir', default=data_analysis.ASSETS_DIR)
+    run(parser.parse_args().assets_dir)
@@ -0,0 +1,78 @@
+"""Per-chart export time of the row-level charts, plotly.express vs the lean scatter builder.
+
+    python -m benchmarks.bench_chart_export [--sizes 10000 100000 1000000] [--budget 10000]
+
+Each chart is timed in the three phases write_asset goes through: building the
+figure (trendlines included), encoding it (figure_json, compact typed arrays)
+and compressing its .gz/.br siblings. The lean builder runs first, so the px
+builder's first trendline pays the statsmodels import, once, as it does in a
+pipeline run. "same" tells whether both builders wrote identical bytes.
+"""
+import argparse
+import time
+
+import numpy as np
+
+import data_analysis
+from benchmarks.synthetic import make_steam_frame
+
+def chart_frame(n_rows):
+    df = make_steam_frame(n_rows)
+    rng = np.random.default_rng(1)
+    score = 50 + 8 * np.log1p(df['average_playtime_forever']) + rng.normal(0, 10, n_rows)
+    return df.assign(engagement_score=score, pricing_tier=data_analysis.pricing_tiers(df['price']))
+
+def pricing_regression(df, builder, budget):
+    return data_analysis.budgeted_scatter(df[['price', 'engagement_score', 'pricing_tier']], x='price',
+                                          y='engagement_score', color='pricing_tier', point_budget=budget,
+                                          builder=builder, trendline='ols', title="Pricing vs Engagement",
+                                          opacity=0.3)
+
+def dlc_impact(df, builder, budget):
+    return data_analysis.budgeted_scatter(df[['dlc_count', 'engagement_score']], x='dlc_count',
+                                          y='engagement_score', point_budget=budget, builder=builder,
+                                          trendline='ols', title="DLC Count vs Retention", opacity=0.3,
+                                          trendline_color_override="#f472b6")
+
+def playtime_distribution(df, builder, budget):
+    # px.histogram leaves the binning to plotly.js, so it is cheap to build either way
+    return data_analysis.px.histogram(df, x='average_playtime_forever', log_x=True,
+                                      title="Distribution of Lifetime Playtime")
+
+CHARTS = (pricing_regression, dlc_impact, playtime_distribution)
+
+def export(chart, df, builder, budget):
+    timings = {}
+    start = time.perf_counter()
+    fig = chart(df, builder, budget)
+    timings['build_s'] = time.perf_counter() - start
+    start = time.perf_counter()
+    payload = data_analysis.figure_json(fig).encode('utf-8')
+    timings['encode_s'] = time.perf_counter() - start
+    start = time.perf_counter()
+    data_analysis.compress_asset(payload)
+    timings['compress_s'] = time.perf_counter() - start
+    return payload, timings
+
+def run(sizes, budget):
+    results = []
+    for n_rows in sizes:
+        df = chart_frame(n_rows)
+        for chart in CHARTS:
+            payloads = {}
+            for builder in ('lean', 'px'):
+                payloads[builder], timings = export(chart, df, builder, budget)
+                results.append({'rows': n_rows, 'chart': chart.__name__, 'builder': builder,
+                                'json_bytes': len(payloads[builder]), **timings})
+                print(f"{n_rows:>9,} {chart.__name__:<22} {builder:<5} " + "  ".join(
+                    f"{phase[:-2]} {seconds:6.3f}s" for phase, seconds in timings.items())
+                      + f"  {len(payloads[builder]) / 1e6:6.2f} MB")
+            print(f"{'':>9} {chart.__name__:<22} same: {payloads['lean'] == payloads['px']}")
+    return results
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--budget', type=int, default=data_analysis.SCATTER_POINT_BUDGET)
+    args = parser.parse_args()
+    run(args.sizes, args.budget)
@@ -0,0 +1,99 @@
+"""Time to first response and per-worker memory of a freshly started API server.
+
+    python -m benchmarks.bench_cold_start [--workers 2] [--runs 3]
+
+Run from the repo root after `python data_analysis.py`. Each run starts
+gunicorn (as render.yaml does) and polls /health, /api/insights and
+/api/predict, in that order, until each answers 200; the times are measured
+from the spawn. After one prediction has been served, each worker's RSS and
+PSS are read from /proc. PSS charges shared pages (such as a memory-mapped
+model) in equal parts to the processes mapping them, so summed PSS is the
+real cost of the worker pool.
+"""
+import argparse
+import http.client
+import json
+import subprocess
+import time
+
+import numpy as np
+
+from benchmarks.bench_serving import free_port
+
+def _request(port, method, path, body=None):
+    try:
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        conn.request(method, path, body, {'Content-Type': 'application/json'} if body else {})
+        response = conn.getresponse()
+        response.read()
+        return response.status
+    except OSError:
+        return None
+
+def _wait_for(port, method, path, body, start, timeout):
+    while time.perf_counter() - start < timeout:
+        if _request(port, method, path, body) == 200:
+            return time.perf_counter() - start
+        time.sleep(0.005)
+    raise RuntimeError(f"{method} {path} did not answer 200 within {timeout}s")
+
+def _memory_mb(pid):
+    """(RSS, PSS) of a process in MB; PSS is None where smaps_rollup is unavailable."""
+    values = {}
+    for path, keys in ((f'/proc/{pid}/status', ('VmRSS:',)), (f'/proc/{pid}/smaps_rollup', ('Pss:',))):
+        try:
+            with open(path) as f:
+                for line in f:
+                    if line.startswith(keys):
+                        values[line.split(':')[0]] = int(line.split()[1]) / 1024
+        except OSError:
+            pass
+    return values.get('VmRSS'), values.get('Pss')
+
+def _workers(pid):
+    try:
+        with open(f'/proc/{pid}/task/{pid}/children') as f:
+            return [int(child) for child in f.read().split()]
+    except OSError:
+        return []
+
+def measure(workers, timeout=120):
+    port = free_port()
+    start = time.perf_counter()
+    proc = subprocess.Popen(['gunicorn', 'app:app', '--bind', f'127.0.0.1:{port}', '--workers', str(workers),
+                             '--timeout', '120'], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        result = {
+            'health_s': _wait_for(port, 'GET', '/health', None, start, timeout),
+            'insights_s': _wait_for(port, 'GET', '/api/insights', None, start, timeout),
+            'predict_s': _wait_for(port, 'POST', '/api/predict', json.dumps({'price': 9.99}), start, timeout),
+        }
+        # Every worker serves a prediction, so each one has its model loaded
+        for _ in range(8 * workers):
+            _request(port, 'POST', '/api/predict', json.dumps({'price': 9.99}))
+        memory = [_memory_mb(pid) for pid in _workers(proc.pid)]
+        result['rss_mb'] = [rss for rss, _ in memory]
+        result['pss_mb'] = [pss for _, pss in memory]
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+    return result
+
+def run(workers, runs):
+    results = [measure(workers) for _ in range(runs)]
+    print(f"gunicorn, {workers} worker(s), median of {runs} cold starts")
+    for key, label in (('health_s', '/health'), ('insights_s', '/api/insights'), ('predict_s', '/api/predict')):
+        print(f"  first 200 from {label:<14} {np.median([r[key] for r in results]):7.2f}s")
+    last = results[-1]
+    print(f"  per-worker RSS  {', '.join(f'{mb:.1f}' for mb in last['rss_mb'])} MB")
+    if all(pss is not None for pss in last['pss_mb']):
+        print(f"  per-worker PSS  {', '.join(f'{mb:.1f}' for mb in last['pss_mb'])} MB "
+              f"(total {sum(last['pss_mb']):.1f} MB)")
+    return results
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--runs', type=int, default=3)
+    args = parser.parse_args()
+    run(args.workers, args.runs)
@@ -0,0 +1,71 @@
+"""Peak memory and wall time of full-read vs streaming `clean_data` ingest.
+
+    python -m benchmarks.bench_ingest [--sizes 100000 1000000] [--chunksize 50000]
+
+Each measurement runs in a fresh interpreter so ru_maxrss reflects only that
+ingest mode. The peak RSS right after imports is reported alongside it.
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.synthetic import write_steam_csv
+
+def _peak_rss_mb():
+    # VmHWM resets on exec; ru_maxrss would carry over the parent's peak on Linux
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # ru_maxrss is kilobytes on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def _child(path, chunksize):
+    import data_analysis
+    import_rss = _peak_rss_mb()
+    start = time.perf_counter()
+    df = data_analysis.clean_data(path, chunksize=chunksize or None)
+    print(json.dumps({
+        'seconds': time.perf_counter() - start,
+        'import_rss_mb': import_rss,
+        'peak_rss_mb': _peak_rss_mb(),
+        'rows_kept': len(df),
+    }))
+
+def measure(path, chunksize):
+    out = subprocess.run([sys.executable, '-m', 'benchmarks.bench_ingest', '--child', path, str(chunksize)],
+                         capture_output=True, text=True, check=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+def run(sizes, chunksize):
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_rows in sizes:
+            path = write_steam_csv(os.path.join(tmp, f'games_{n_rows}.csv'), n_rows, wide=True)
+            size_mb = os.path.getsize(path) / 2**20
+            for mode, size in (('full', 0), ('streaming', chunksize)):
+                r = {'rows': n_rows, 'csv_mb': size_mb, 'mode': mode, **measure(path, size)}
+                results.append(r)
+                print(f"{n_rows:>9,} rows ({size_mb:7.1f} MB csv)  {mode:<9}  "
+                      f"peak RSS {r['peak_rss_mb']:7.1f} MB (imports {r['import_rss_mb']:5.1f} MB)  "
+                      f"{r['seconds']:6.2f}s  kept {r['rows_kept']:,}")
+    return results
+
+if __name__ == '__main__':
+    if sys.argv[1:2] == ['--child']:
+        _child(sys.argv[2], int(sys.argv[3]))
+        sys.exit()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100_000, 1_000_000])
+    parser.add_argument('--chunksize', type=int, default=50_000)
+    args = parser.parse_args()
+    run(args.sizes, args.chunksize)
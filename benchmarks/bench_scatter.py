@@ -0,0 +1,50 @@
+"""Scatter asset size and build time, full vs point-budgeted, on synthetic catalogs.
+
+    python -m benchmarks.bench_scatter [--sizes 10000 100000 500000] [--budget 10000]
+
+Browser render cost scales with the embedded markers, so the point count and
+payload size stand in for it here.
+"""
+import argparse
+import gzip
+import time
+
+import numpy as np
+
+import data_analysis
+from benchmarks.synthetic import make_steam_frame
+
+def pricing_frame(n_rows):
+    df = make_steam_frame(n_rows)
+    rng = np.random.default_rng(1)
+    score = 50 + 8 * np.log1p(df['average_playtime_forever']) + rng.normal(0, 10, n_rows)
+    return df.assign(engagement_score=score,
+                     pricing_tier=np.where(df['price'] == 0, 'Free',
+                                           np.where(df['price'] < 20, 'Low-cost (<$20)', 'Premium ($20+)')))
+
+def build(df, budget):
+    start = time.perf_counter()
+    fig = data_analysis.budgeted_scatter(df, x='price', y='engagement_score', color='pricing_tier',
+                                         point_budget=budget, trendline='ols', opacity=0.3)
+    payload = fig.to_json().encode('utf-8')
+    points = sum(len(trace.x) for trace in fig.data if trace.mode == 'markers')
+    return time.perf_counter() - start, points, len(payload), len(gzip.compress(payload))
+
+def run(sizes, budget):
+    results = []
+    for n_rows in sizes:
+        df = pricing_frame(n_rows)
+        for label, limit in [('full', len(df)), ('budgeted', budget)]:
+            seconds, points, raw, gz = build(df, limit)
+            results.append({'rows': n_rows, 'mode': label, 'build_s': seconds, 'points': points,
+                            'json_bytes': raw, 'gzip_bytes': gz})
+            print(f"{n_rows:>9,} {label:<9} {points:>9,} points  {raw / 1e6:8.2f} MB json  "
+                  f"{gz / 1e6:7.2f} MB gzip  {seconds:6.2f}s")
+    return results
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 500_000])
+    parser.add_argument('--budget', type=int, default=data_analysis.SCATTER_POINT_BUDGET)
+    args = parser.parse_args()
+    run(args.sizes, args.budget)
@@ -0,0 +1,170 @@
+"""/api/predict latency under a fixed load, WSGI (gunicorn) vs ASGI (uvicorn).
+
+    python -m benchmarks.bench_serving [--concurrency 8] [--duration 10] [--slow-clients 2]
+    python -m benchmarks.bench_serving --modes asgi asgi-unbatched --concurrency 32 --slow-clients 0
+
+Run from the repo root after `python data_analysis.py`, so the model and assets
+exist. Each server is started on a free port, then `--concurrency` client
+threads post predictions back to back while `--slow-clients` keep downloading
+a large asset at `--slow-rate` bytes/s, the way a phone on a bad link reads
+a chart. The large asset is a padded JSON file written into the assets dir for
+the run and removed afterwards.
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import numpy as np
+
+ASSETS_DIR = 'frontend/public/assets'
+BENCH_ASSET = '_bench_large.json'
+
+UVICORN = [sys.executable, '-m', 'uvicorn', 'asgi:app', '--host', '127.0.0.1', '--port', '{port}',
+           '--log-level', 'warning']
+
+# mode -> (command, extra environment)
+SERVERS = {
+    'wsgi': (['gunicorn', 'app:app', '--bind', '127.0.0.1:{port}', '--workers', '1', '--timeout', '120'], {}),
+    'asgi': (UVICORN, {}),
+    # Every prediction scored on its own, to measure what micro-batching buys
+    'asgi-unbatched': (UVICORN, {'PREDICT_COALESCE_ROWS': '1'}),
+}
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def start_server(mode, port, timeout=60):
+    cmd, env = SERVERS[mode]
+    proc = subprocess.Popen([part.format(port=port) for part in cmd], env={**os.environ, **env},
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            conn.request('GET', '/health')
+            if conn.getresponse().status == 200:
+                return proc
+        except OSError:
+            time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError(f"{mode} server did not come up on port {port}")
+
+def fetch_json(port, path):
+    try:
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+        conn.request('GET', path)
+        response = conn.getresponse()
+        return json.loads(response.read()) if response.status == 200 else None
+    except (OSError, ValueError):
+        return None
+
+def predict_client(port, stop, latencies, errors, seed):
+    rng = random.Random(seed)
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+    while not stop.is_set():
+        # Random inputs so the prediction cache does not answer for the model
+        body = json.dumps({'price': rng.uniform(0, 60), 'dlc_count': rng.randint(0, 20),
+                           'release_year': rng.randint(2005, 2025), 'metacritic_score': rng.randint(40, 98)})
+        start = time.perf_counter()
+        try:
+            conn.request('POST', '/api/predict', body, {'Content-Type': 'application/json'})
+            response = conn.getresponse()
+            response.read()
+            if response.status != 200:
+                errors.append(response.status)
+                continue
+        except OSError as e:
+            errors.append(type(e).__name__)
+            conn.close()
+            continue
+        latencies.append(time.perf_counter() - start)
+
+def slow_client(port, stop, rate):
+    # A tiny receive buffer makes the server's writes block at the reader's pace
+    chunk = 4096
+    while not stop.is_set():
+        with socket.socket() as s:
+            s.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, chunk)
+            s.settimeout(60)
+            s.connect(('127.0.0.1', port))
+            s.sendall(f'GET /api/assets/{BENCH_ASSET} HTTP/1.1\r\nHost: bench\r\nConnection: close\r\n\r\n'.encode())
+            while not stop.is_set():
+                try:
+                    if not s.recv(chunk):
+                        break
+                except OSError:
+                    break
+                time.sleep(chunk / rate)
+
+def measure(mode, concurrency, duration, slow_clients, slow_rate):
+    port = free_port()
+    proc = start_server(mode, port)
+    stop = threading.Event()
+    latencies, errors = [], []
+    try:
+        slow = [threading.Thread(target=slow_client, args=(port, stop, slow_rate), daemon=True)
+                for _ in range(slow_clients)]
+        for t in slow:
+            t.start()
+        time.sleep(0.5)  # let the slow downloads occupy the server first
+        clients = [threading.Thread(target=predict_client, args=(port, stop, latencies, errors, i))
+                   for i in range(concurrency)]
+        start = time.perf_counter()
+        for t in clients:
+            t.start()
+        time.sleep(duration)
+        stop.set()
+        for t in clients:
+            t.join()
+        elapsed = time.perf_counter() - start
+        batching = fetch_json(port, '/api/predict/batching')
+    finally:
+        stop.set()
+        proc.terminate()
+        proc.wait(timeout=10)
+
+    ms = np.asarray(latencies) * 1000
+    result = {'mode': mode, 'requests': len(ms), 'errors': len(errors), 'rps': len(ms) / elapsed,
+              'p50_ms': float(np.percentile(ms, 50)) if len(ms) else None,
+              'p99_ms': float(np.percentile(ms, 99)) if len(ms) else None}
+    p50 = f"{result['p50_ms']:8.1f}" if len(ms) else '     n/a'
+    p99 = f"{result['p99_ms']:8.1f}" if len(ms) else '     n/a'
+    print(f"{mode:<14} {len(ms):>7,} requests  {result['rps']:7.1f} req/s  p50 {p50} ms  "
+          f"p99 {p99} ms  {len(errors)} errors")
+    if batching:
+        result['batch_size_mean'] = batching['batch_size']['mean']
+        result['queue_delay_ms_mean'] = batching['queue_delay_ms']['mean']
+        print(f"{'':<14} mean batch {batching['batch_size']['mean']:.1f} rows, "
+              f"mean queueing delay {batching['queue_delay_ms']['mean']:.2f} ms")
+    return result
+
+def run(modes, concurrency, duration, slow_clients, slow_rate, asset_mb):
+    path = os.path.join(ASSETS_DIR, BENCH_ASSET)
+    with open(path, 'w') as f:
+        json.dump({'padding': 'x' * int(asset_mb * 1e6)}, f)
+    try:
+        print(f"{concurrency} predict clients, {slow_clients} slow clients reading a {asset_mb:g} MB asset "
+              f"at {slow_rate / 1e3:g} KB/s, {duration:g}s per server")
+        return [measure(mode, concurrency, duration, slow_clients, slow_rate) for mode in modes]
+    finally:
+        os.remove(path)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--modes', nargs='+', choices=sorted(SERVERS), default=['wsgi', 'asgi'])
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--slow-clients', type=int, default=2)
+    parser.add_argument('--slow-rate', type=float, default=256e3, help='bytes/s each slow client reads')
+    parser.add_argument('--asset-mb', type=float, default=8.0)
+    args = parser.parse_args()
+    run(args.modes, args.concurrency, args.duration, args.slow_clients, args.slow_rate, args.asset_mb)
@@ -0,0 +1,209 @@
+"""Pipeline stage and API handler timings on synthetic catalogs, checked against a baseline.
+
+    python -m benchmarks.bench_suite [--sizes 10000 100000 1000000] [--output benchmarks/results.json]
+    python -m benchmarks.bench_suite --sizes 10000 --threshold 0.5
+    python -m benchmarks.bench_suite --update-baseline
+
+For each size a synthetic CSV (benchmarks.synthetic) is analyzed by a fresh
+`data_analysis.py` run in a scratch directory, sequentially (--workers 1) and
+without the parse cache, so every stage's time in the run report is its own.
+A second interpreter then loads the API from that directory and times
+/api/predict, /api/games, /api/insights and the largest chart in
+/api/assets through the Flask test client.
+
+Results are written as a flat {metric: seconds} map. A metric regresses when
+it is more than `--threshold` (relative) slower than the stored baseline and
+also slower by more than its noise floor; any regression exits with status 1,
+as does a metric that is missing from either side for a measured size (unless
+--allow-missing), since it would otherwise go unchecked.
+API p99s are recorded but not compared, they are too noisy on small machines.
+Baselines are machine specific: regenerate benchmarks/baseline.json with
+--update-baseline on the machine that runs the comparison.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import write_steam_csv
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_PATH = os.path.join(REPO_DIR, 'benchmarks', 'baseline.json')
+RESULTS_PATH = os.path.join(REPO_DIR, 'benchmarks', 'results.json')
+RUN_REPORT = os.path.join('frontend', 'public', 'run_report.json')
+
+# Absolute slowdown (seconds) below which a relative regression is treated as noise
+NOISE_FLOOR = {'pipeline': 0.05, 'api': 0.0002}
+
+def _child(requests):
+    """Time the API handlers of the pipeline outputs in the current directory."""
+    import app
+
+    client = app.app.test_client()
+    assets_dir = app.ASSETS_DIR
+    asset = max((name for name in os.listdir(assets_dir) if name.endswith('.json') and name != 'manifest.json'),
+                key=lambda name: os.path.getsize(os.path.join(assets_dir, name)))
+    rng = random.Random(0)
+
+    def predict():
+        # Random inputs so the prediction cache does not answer for the model
+        return client.post('/api/predict', json={
+            'price': rng.uniform(0, 60), 'dlc_count': rng.randint(0, 20),
+            'release_year': rng.randint(2005, 2025), 'metacritic_score': rng.randint(40, 98)})
+
+    # A mix of the dashboard's queries (unfiltered, by genre, by year range, combined), first and second pages
+    queries = ['', 'genre=Indie', 'genre=RPG&pricing=free', 'year_min=2015&year_max=2018',
+               'genre=Action&year_min=2020&pricing=paid', 'pricing=free']
+    pages = [f'/api/games?limit=50&{query}' for query in queries]
+    for url in list(pages):
+        cursor = client.get(url).get_json()['next_cursor']
+        if cursor:
+            pages.append(f'{url}&cursor={cursor}')
+
+    calls = {
+        'predict': predict,
+        'games': lambda: client.get(rng.choice(pages)),
+        'insights': lambda: client.get('/api/insights'),
+        'assets': lambda: client.get(f'/api/assets/{asset}'),
+    }
+    timings = {}
+    for name, call in calls.items():
+        seconds = []
+        for i in range(requests + requests // 10):
+            start = time.perf_counter()
+            response = call()
+            response.get_data()
+            response.close()
+            if response.status_code != 200:
+                raise RuntimeError(f"{name} returned {response.status_code}")
+            seconds.append(time.perf_counter() - start)
+        seconds = np.asarray(seconds[requests // 10:])  # the first tenth is warm-up
+        timings[name] = {'mean': float(seconds.mean()), 'p50': float(np.percentile(seconds, 50)),
+                         'p99': float(np.percentile(seconds, 99))}
+    print(json.dumps({'asset': asset, 'timings': timings}))
+
+def _run(cmd, cwd):
+    env = {**os.environ, 'PYTHONPATH': os.pathsep.join(filter(None, [REPO_DIR, os.environ.get('PYTHONPATH')]))}
+    return subprocess.run(cmd, cwd=cwd, env=env, capture_output=True, text=True, check=True).stdout
+
+def measure(n_rows, requests):
+    metrics = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        write_steam_csv(os.path.join(tmp, 'games.csv'), n_rows)
+        _run([sys.executable, os.path.join(REPO_DIR, 'data_analysis.py'), '--dataset', 'games.csv',
+              '--workers', '1', '--no-cache', '--force'], cwd=tmp)
+        with open(os.path.join(tmp, RUN_REPORT)) as f:
+            report = json.load(f)
+        metrics[f'pipeline/{n_rows}/load'] = report['load']['seconds']
+        for stage in report['stages']:
+            metrics[f'pipeline/{n_rows}/{stage["name"]}'] = stage['seconds']
+        metrics[f'pipeline/{n_rows}/total'] = report['wall_seconds']
+
+        out = _run([sys.executable, '-m', 'benchmarks.bench_suite', '--child', str(requests)], cwd=tmp)
+        api = json.loads(out.strip().splitlines()[-1])
+        for route, stats in api['timings'].items():
+            for stat, seconds in stats.items():
+                metrics[f'api/{n_rows}/{route}/{stat}'] = seconds
+
+    print(f"{n_rows:>9,} rows  pipeline {metrics[f'pipeline/{n_rows}/total']:7.2f}s  "
+          f"(load {metrics[f'pipeline/{n_rows}/load']:.2f}s, rows kept {report['load']['rows']:,})")
+    for stage in sorted(report['stages'], key=lambda stage: -stage['seconds']):
+        print(f"{'':>11}{stage['name']:<26}{stage['seconds']:8.3f}s")
+    for route, stats in api['timings'].items():
+        label = f"/api/assets/{api['asset']}" if route == 'assets' else f'/api/{route}'
+        print(f"{'':>11}{label:<44} p50 {stats['p50'] * 1e3:7.3f} ms  p99 {stats['p99'] * 1e3:7.3f} ms")
+    return metrics
+
+def missing_metrics(results, baseline):
+    """(measured but not in the baseline, in the baseline for a measured size but not measured)."""
+    sizes = {name.split('/')[1] for name in results}
+    unbaselined = sorted(name for name in results if name not in baseline)
+    unmeasured = sorted(name for name in baseline if name.split('/')[1] in sizes and name not in results)
+    return unbaselined, unmeasured
+
+def compare(results, baseline, threshold):
+    """Metrics more than `threshold` slower than the baseline (and past the noise floor)."""
+    regressions = []
+    for name, value in results.items():
+        base = baseline.get(name)
+        if base is None or name.endswith('/p99'):
+            continue
+        floor = NOISE_FLOOR[name.split('/', 1)[0]]
+        if value > base * (1 + threshold) and value - base > floor:
+            regressions.append((name, base, value))
+    return regressions
+
+def run(sizes, requests, output, baseline_path, threshold, update_baseline, strict=True):
+    results = {}
+    for n_rows in sizes:
+        results.update(measure(n_rows, requests))
+    document = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'machine': {'python': platform.python_version(), 'platform': platform.platform(),
+                    'cpus': os.cpu_count()},
+        'metrics': results,
+    }
+    with open(output, 'w') as f:
+        json.dump(document, f, indent=2)
+    print(f"Results written to {output}")
+
+    if update_baseline:
+        baseline = {}
+        if os.path.exists(baseline_path):
+            with open(baseline_path) as f:
+                baseline = json.load(f)['metrics']
+        # Sizes that were not rerun keep their old baseline
+        with open(baseline_path, 'w') as f:
+            json.dump({**document, 'metrics': {**baseline, **results}}, f, indent=2)
+        print(f"Baseline updated: {baseline_path}")
+        return []
+    if not os.path.exists(baseline_path):
+        print(f"No baseline at {baseline_path}; run with --update-baseline to create one")
+        return []
+    with open(baseline_path) as f:
+        baseline = json.load(f)['metrics']
+    regressions = compare(results, baseline, threshold)
+    for name, base, value in regressions:
+        print(f"REGRESSION {name}: {base * 1e3:.3f} ms -> {value * 1e3:.3f} ms ({value / base - 1:+.0%})")
+    # A metric only one side has is a stage or route that was added, renamed or
+    # dropped: nothing guards it until the baseline is re-recorded
+    unbaselined, unmeasured = missing_metrics(results, baseline)
+    for name in unbaselined:
+        print(f"MISSING {name}: not in the baseline, so not checked")
+    for name in unmeasured:
+        print(f"MISSING {name}: in the baseline but no longer measured")
+    if unbaselined or unmeasured:
+        print(f"Re-record the baseline with --update-baseline to cover {len(unbaselined) + len(unmeasured)} "
+              f"missing metrics{'' if strict else ' (ignored: --allow-missing)'}")
+    if not regressions:
+        print(f"No regressions beyond {threshold:.0%} against {baseline_path}")
+    if strict:
+        regressions += [(name, None, None) for name in unbaselined + unmeasured]
+    return regressions
+
+if __name__ == '__main__':
+    if sys.argv[1:2] == ['--child']:
+        _child(int(sys.argv[2]))
+        sys.exit()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--requests', type=int, default=300, help="timed requests per API route")
+    parser.add_argument('--output', default=RESULTS_PATH)
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help="relative slowdown that counts as a regression (0.25 = 25%%)")
+    parser.add_argument('--update-baseline', action='store_true',
+                        help="store these results as the baseline instead of comparing")
+    parser.add_argument('--allow-missing', action='store_true',
+                        help="only warn about metrics missing from the baseline or the results")
+    args = parser.parse_args()
+    regressions = run(args.sizes, args.requests, args.output, args.baseline, args.threshold,
+                      args.update_baseline, strict=not args.allow_missing)
+    sys.exit(1 if regressions else 0)
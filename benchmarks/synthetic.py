@@ -0,0 +1,78 @@
+"""Synthetic Steam-like catalog with the columns `clean_data` expects.
+
+Distributions are loosely shaped on the March 2025 Steam dump (heavy-tailed
+playtime/CCU/reviews, ~20% free titles, sparse Metacritic scores) and include
+the messy values the cleaning code has to cope with: malformed owner ranges,
+missing genres, zero playtime and idle-inflated means.
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+OWNER_RANGES = np.array([
+    '0 - 20000', '20000 - 50000', '50000 - 100000', '100000 - 200000', '200000 - 500000',
+    '500000 - 1000000', '1000000 - 2000000', '2000000 - 5000000', '5000000 - 10000000',
+    '0 - 0', '20,000 - 50,000', 'N/A', '10 - 20 - 30', None,
+], dtype=object)
+OWNER_WEIGHTS = np.array([30, 20, 14, 10, 8, 6, 4, 2, 1, 2, 1, 0.5, 0.5, 1], dtype=float)
+
+GENRES = np.array([
+    "['Action', 'Indie']", "['Free to Play', 'Action']", "['RPG']", "['Strategy', 'Simulation']",
+    "['Casual']", "['Adventure', 'Indie']", "['Indie']", "['Sports', 'Racing']", None,
+], dtype=object)
+
+PRICES = np.array([4.99, 9.99, 14.99, 19.99, 29.99, 39.99, 49.99, 59.99, 69.99])
+
+# Free-text columns of the real dump that the pipeline never reads; `wide=True`
+# adds stand-ins so ingest benchmarks see realistic row widths.
+WIDE_TEXT_COLUMNS = {
+    'short_description': 'A hand-crafted adventure through a procedurally generated world. ' * 2,
+    'about_the_game': 'Explore, build and survive across dozens of biomes with friends online. ' * 8,
+    'supported_languages': "['English', 'French', 'German', 'Spanish - Spain', 'Japanese']",
+    'tags': "{'Indie': 120, 'Action': 98, 'Adventure': 75, 'Singleplayer': 60}",
+}
+
+def make_steam_frame(n_rows, seed=0, wide=False):
+    rng = np.random.default_rng(seed)
+    years = rng.integers(2000, 2026, n_rows)
+    median_playtime = rng.lognormal(4, 1.5, n_rows).round() * (rng.random(n_rows) > 0.1)
+    # Mean playtime tracks the median with right skew; ~2% are idle-farmed outliers
+    skew = rng.lognormal(0.3, 0.8, n_rows) * np.where(rng.random(n_rows) < 0.02, 25, 1)
+    average_playtime = (np.maximum(median_playtime, 1) * skew).round() * (rng.random(n_rows) > 0.05)
+
+    df = pd.DataFrame({
+        'name': [f'Game {i}' for i in range(n_rows)],
+        'release_date': pd.to_datetime(
+            years * 10000 + rng.integers(1, 13, n_rows) * 100 + rng.integers(1, 29, n_rows), format='%Y%m%d'
+        ).strftime('%Y-%m-%d').where(rng.random(n_rows) > 0.01, 'TBA'),
+        'price': np.where(rng.random(n_rows) < 0.2, 0, rng.choice(PRICES, n_rows)),
+        'average_playtime_forever': average_playtime,
+        'median_playtime_forever': median_playtime,
+        'metacritic_score': np.where(rng.random(n_rows) < 0.7, 0, rng.integers(40, 98, n_rows)),
+        'user_score': 0,
+        'peak_ccu': rng.lognormal(3, 2, n_rows).round(),
+        'num_reviews_total': rng.lognormal(5, 2, n_rows).round(),
+        'pct_pos_total': rng.integers(20, 100, n_rows),
+        'recommendations': rng.lognormal(4, 2, n_rows).round(),
+        'dlc_count': rng.poisson(2, n_rows) * (rng.random(n_rows) < 0.5),
+        'estimated_owners': rng.choice(OWNER_RANGES, n_rows, p=OWNER_WEIGHTS / OWNER_WEIGHTS.sum()),
+        'genres': rng.choice(GENRES, n_rows),
+    })
+    if wide:
+        for column, text in WIDE_TEXT_COLUMNS.items():
+            df[column] = text
+    return df
+
+def write_steam_csv(path, n_rows, seed=0, wide=False):
+    make_steam_frame(n_rows, seed, wide).to_csv(path, index=False)
+    return path
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('rows', type=int)
+    parser.add_argument('output')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--wide', action='store_true', help="add unused free-text columns like the real dump")
+    args = parser.parse_args()
+    write_steam_csv(args.output, args.rows, args.seed, args.wide)
@@ -0,0 +1,70 @@
+import asyncio
+import gzip
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import app as flask_api
+import asgi
+from engagement_transform import EngagementTransform
+from game_index import build_game_index, save_game_index
+from score_distribution import ScoreDistribution, build_score_distribution
+from model_registry import ModelRegistry, publish_model
+from test_model_registry import train
+
+
+def call(method, path, body=b'', headers=(), query=b''):
+    """Drive the ASGI app directly; returns (status, headers dict, body)."""
+    messages = [{'type': 'http.request', 'body': body, 'more_body': False}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0) if messages else {'type': 'http.disconnect'}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {'type': 'http', 'method': method, 'path': path, 'query_string': query,
+             'headers': [(k.lower().encode(), v.encode()) for k, v in headers]}
+    asyncio.run(asgi.app(scope, receive, send))
+    start = sent[0]
+    return (start['status'], {k.decode(): v.decode() for k, v in start['headers']},
+            b''.join(m.get('body', b'') for m in sent[1:]))
+
+
+@pytest.fixture
+def served(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs(flask_api.ASSETS_DIR)
+    with open(flask_api.INSIGHTS_PATH, 'w') as f:
+        json.dump({'total_games_analyzed': 3}, f)
+    with open(os.path.join(flask_api.ASSETS_DIR, 'chart.json'), 'w') as f:
+        f.write('{"data": []}' + ' ' * 200_000)
+    with open(os.path.join(flask_api.ASSETS_DIR, 'chart.json.gz'), 'wb') as f:
+        f.write(gzip.compress(b'{"data": []}'))
+
+    EngagementTransform(np.zeros(4), np.ones(4), np.zeros(4), [0.5, 0.5, 0.5, 0.5], 0.3, 0.0, 10.0).save(
+        flask_api.ENGAGEMENT_TRANSFORM_PATH)
+    save_game_index(build_game_index(pd.DataFrame({
+        'name': ['Alpha', 'Beta', 'Gamma', 'Delta'], 'release_year': [2015, 2018, 2018, 2020],
+        'genres': ["['RPG', 'Indie']", "['Action']", "['RPG']", "['Indie']"], 'price': [0.0, 9.99, 19.99, 0.0],
+        'engagement_score': [40.0, 90.0, 65.0, 12.5], 'average_playtime_forever': [10.0, 300.0, 80.0, 1.0],
+        'num_reviews_total': [5.0, 900.0, 120.0, 2.0], 'peak_ccu': [1.0, 50.0, 8.0, 0.0]})),
+        flask_api.GAME_INDEX_PATH)
+    monkeypatch.setattr(flask_api, '_game_index', (None, None, 0.0))
+    ScoreDistribution(build_score_distribution([10.0, 30.0, 50.0, 70.0], ['RPG', 'RPG', 'Action', 'Action'],
+                                               ['Free', 'Free', 'Free', 'Premium ($20+)'])).save(
+        flask_api.SCORE_DISTRIBUTION_PATH)
+    monkeypatch.setattr(flask_api, 'distribution_snapshot',
+                        flask_api.JSONFileSnapshot(flask_api.SCORE_DISTRIBUTION_PATH))
+    publish_model(*train(0), metrics={}, registry_dir='models')
+    registry = ModelRegistry('models')
+    registry.refresh()
+    monkeypatch.setattr(flask_api, 'model_registry', registry)
+    monkeypatch.setattr(flask_api, 'insights_snapshot', flask_api.JSONFileSnapshot(flask_api.INSIGHTS_PATH))
+    monkeypatch.setattr(flask_api, 'engagement_snapshot',
+                        flask_api.JSONFileSnapshot(flask_api.ENGAGEMENT_TRANSFORM_PATH))
+    return tmp_path
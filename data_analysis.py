@@ -5,17 +5,35 @@ import plotly.graph_objects as go
 import plotly.io as pio
 from sklearn.linear_model import LinearRegression
 from sklearn.preprocessing import StandardScaler
-from sklearn.model_selection import train_test_split, cross_val_score
-from sklearn.ensemble import RandomForestRegressor
+from sklearn.model_selection import train_test_split, cross_validate
+from sklearn.ensemble import HistGradientBoostingRegressor, RandomForestRegressor
+from sklearn.inspection import permutation_importance
 from sklearn.metrics import r2_score, mean_absolute_error, root_mean_squared_error
-from sklearn.decomposition import PCA
-from sklearn.model_selection import train_test_split, cross_val_score
-from sklearn.metrics import r2_score, mean_absolute_error
 import scipy.stats as stats
+import argparse
+import base64
+import inspect
 import json
 import os
+import re
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timezone
+from typing import Callable
 import nbformat as nbf
 import joblib
+import gzip
+import hashlib
+from engagement_transform import ENGAGEMENT_FEATURES, ENGAGEMENT_TRANSFORM_PATH, EngagementTransform, \
+    load_engagement_transform
+from forest_engine import compile_model, save_forest
+import figure_engine
+from game_index import GAME_INDEX_PATH, build_game_index, save_game_index
+from model_registry import MANIFEST_NAME, REGISTRY_DIR, publish_model
+from score_distribution import SCORE_DISTRIBUTION_PATH, ScoreDistribution, build_score_distribution, pricing_tiers
+import stats_engine
+import metrics
 
 # Custom Dark Cyberpunk Plotly Template
 import plotly.graph_objects as go
@@ -31,19 +49,231 @@ pio.templates["cyberpunk"] = go.layout.Template(
 )
 pio.templates.default = "cyberpunk"
 
+try:
+    import brotli
+except ImportError:  # optional: without it only gzip siblings are written
+    brotli = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional: without it the cleaned-data cache is disabled
+    pa = pq = None
+
 # Ensure output directory exists (React public folder)
-os.makedirs("frontend/public/assets", exist_ok=True)
+ASSETS_DIR = "frontend/public/assets"
+ASSET_MANIFEST = "manifest.json"
+# Content-addressed copy of an asset, <stem>.<sha256[:12]><ext>, plus its .gz/.br
+HASHED_ASSET = re.compile(r"^(.+\.[0-9a-f]{12}\.[^.]+?)(\.gz|\.br)?$")
+# How long a hashed copy no longer in the manifest stays servable, for pages and
+# CDNs still holding a previous run's names
+ASSET_RETENTION_SECONDS = 7 * 24 * 3600
+INSIGHTS_PATH = "frontend/public/insights.json"
+NOTEBOOK_PATH = "frontend/public/EngageX_Analysis.ipynb"
+RUN_REPORT_PATH = "frontend/public/run_report.json"
+os.makedirs(ASSETS_DIR, exist_ok=True)
 
 insights_data = {}
 
-def clean_data(filepath):
-    print("Loading and cleaning data...")
+# Cleaned-data cache. Bump PIPELINE_VERSION whenever clean_data's output changes.
+CACHE_DIR = ".cache"
+PIPELINE_VERSION = 1
+CLEAN_DATA_INSIGHTS = ['total_games_analyzed', 'methodology']
+
+# Most markers a scatter asset may embed; larger inputs are thinned (trendlines still use every row)
+SCATTER_POINT_BUDGET = 10000
+
+# Bootstrap CIs for the verdict and aha effect sizes: resamples (0 = normal
+# approximation) and the wall-clock budget each stage may spend drawing them
+BOOTSTRAP_RESAMPLES = 0
+BOOTSTRAP_SECONDS = 10.0
+
+# Engagement model training: backend ('rf' random forest, 'hgb' histogram
+# gradient boosting), an optional cap on training rows and/or wall-clock budget
+# (either one subsamples the training split), processes for the CV folds, and
+# the seed behind the split, the subsample and the estimator. The defaults
+# reproduce the full-data random forest.
+MODEL_BACKEND = 'rf'
+TRAIN_ROWS = None
+TRAIN_SECONDS = None
+CV_WORKERS = 1
+MODEL_SEED = 42
+CV_FOLDS = 5
+# Row counts a time budget picks from: coarse steps, so a budget lands on the
+# same subsample run after run on the same machine
+SUBSAMPLE_LADDER = (10_000, 20_000, 50_000, 100_000, 200_000, 500_000, 1_000_000, 2_000_000, 5_000_000)
+
+def _write_bytes(path, payload):
+    # Write to a temp file and rename so the API never serves a half-written asset
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(payload)
+    os.replace(tmp_path, path)
+
+# Plotly writes numeric arrays as base64 float64 "bdata". With ASSET_ARRAYS =
+# 'compact', write_asset narrows them further: integral arrays to the smallest
+# integer type, everything else to float32 when that round-trips within
+# ASSET_FLOAT32_RTOL. plotly.js decodes either form into typed arrays natively.
+ASSET_ARRAYS = 'compact'
+ASSET_FLOAT32_RTOL = 1e-6
+# Maximum-effort compression (gzip 9, brotli 11) costs seconds per megabyte for
+# a few percent of size; siblings of payloads above this get gzip 6 / brotli 9.
+ASSET_MAX_EFFORT_BYTES = 256 * 1024
+# Scatter charts are built with figure_engine ('lean') or plain plotly.express
+# ('px'); the assets match.
+FIGURE_BUILDER = 'lean'
+_INT_TYPED_ARRAYS = ['i1', 'u1', 'i2', 'u2', 'i4', 'u4']
+
+def _narrow_typed_array(spec):
+    if spec['dtype'] != 'f8':
+        return spec
+    values = np.frombuffer(base64.b64decode(spec['bdata']), dtype='<f8')
+    if not len(values):
+        return spec
+    narrowed = None
+    if np.isfinite(values).all() and (values == np.round(values)).all():
+        for code in _INT_TYPED_ARRAYS:
+            info = np.iinfo(np.dtype(code))
+            if info.min <= values.min() and values.max() <= info.max:
+                narrowed = values.astype('<' + code)
+                break
+    else:
+        with np.errstate(over='ignore'):
+            as_f4 = values.astype('<f4')
+        if np.allclose(as_f4, values, rtol=ASSET_FLOAT32_RTOL, atol=0, equal_nan=True):
+            narrowed = as_f4
+    if narrowed is None:
+        return spec
+    return {**spec, 'dtype': narrowed.dtype.str[1:], 'bdata': base64.b64encode(narrowed.tobytes()).decode('ascii')}
+
+def compact_typed_arrays(node):
+    """Return a copy of a Plotly figure dict with its float64 typed arrays narrowed (see ASSET_ARRAYS)."""
+    if isinstance(node, dict):
+        if 'bdata' in node and 'dtype' in node:
+            return _narrow_typed_array(node)
+        return {key: compact_typed_arrays(value) for key, value in node.items()}
+    if isinstance(node, list):
+        return [compact_typed_arrays(value) for value in node]
+    return node
+
+def figure_json(fig):
+    if ASSET_ARRAYS == 'compact':
+        return pio.to_json(compact_typed_arrays(fig.to_dict()), validate=False)
+    return fig.to_json()
+
+def compress_asset(payload):
+    """Precompressed siblings of an asset payload: {'.gz': bytes, '.br': bytes} ('.br' only with brotli)."""
+    large = len(payload) > ASSET_MAX_EFFORT_BYTES
+    siblings = {".gz": gzip.compress(payload, compresslevel=6 if large else 9, mtime=0)}
+    if brotli is not None:
+        siblings[".br"] = brotli.compress(payload, quality=9 if large else 11)
+    return siblings
+
+def write_asset(name, fig):
+    """Write a Plotly figure to ASSETS_DIR as <name> plus <name>.gz and (if brotli is installed) <name>.br."""
+    payload = figure_json(fig).encode("utf-8")
+    path = os.path.join(ASSETS_DIR, name)
+    _write_bytes(path, payload)
+    for suffix, compressed in compress_asset(payload).items():
+        _write_bytes(path + suffix, compressed)
+    if brotli is None and os.path.exists(path + ".br"):
+        os.remove(path + ".br")  # a stale .br would shadow the fresh payload
+
+def update_asset_manifest(names):
+    """Write a content-hashed copy <stem>.<sha256[:12]>.json of each asset and record it in manifest.json.
+
+    The copies (with their .gz/.br siblings) are real files that are never
+    rewritten, so the API can serve them with immutable cache headers while
+    the next run rewrites <name> in place. Called once per run, after every
+    stage has finished, so each copy and its siblings come from one write.
+    Copies the manifest no longer lists are removed ASSET_RETENTION_SECONDS
+    after they were retired.
+    """
+    manifest_path = os.path.join(ASSETS_DIR, ASSET_MANIFEST)
     try:
-        df = pd.read_csv(filepath)
-    except Exception as e:
-        print(f"Error loading {filepath}: {e}")
-        return None
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        manifest = {}
+    previous = set(manifest.values())
+    for name in names:
+        path = os.path.join(ASSETS_DIR, name)
+        if os.path.exists(path):
+            stem, ext = os.path.splitext(name)
+            manifest[name] = f"{stem}.{file_sha256(path)[:12]}{ext}"
+            for suffix in ("", ".gz", ".br"):
+                target = os.path.join(ASSETS_DIR, manifest[name] + suffix)
+                if os.path.exists(path + suffix) and not os.path.exists(target):
+                    with open(path + suffix, "rb") as f:
+                        _write_bytes(target, f.read())
+    _write_bytes(manifest_path, json.dumps(manifest, indent=4, sort_keys=True).encode("utf-8"))
+
+    live, now = set(manifest.values()), time.time()
+    for filename in os.listdir(ASSETS_DIR):
+        match = HASHED_ASSET.match(filename)
+        if match is None or match.group(1) in live:
+            continue
+        path = os.path.join(ASSETS_DIR, filename)
+        if match.group(1) in previous:
+            os.utime(path)  # retired by this run: its grace period starts now
+        elif now - os.path.getmtime(path) > ASSET_RETENTION_SECONDS:
+            os.remove(path)
+
+def _map_distinct(values, func, missing):
+    """Apply a scalar parser once per distinct value and broadcast the results back.
+
+    Owner ranges and genre lists repeat heavily across the catalog, so factorizing
+    first turns a per-row Python call into a per-category one.
+    """
+    codes, uniques = pd.factorize(values)
+    mapped = np.array([func(v) for v in uniques] + [missing], dtype=object)
+    return pd.Series(mapped[codes], index=values.index)  # code -1 (NaN) picks `missing`
 
+def _parse_owner_range(owner_str):
+    try:
+        parts = owner_str.split('-')
+        if len(parts) == 2:
+            return (int(parts[0].replace(',', '').strip()) + int(parts[1].replace(',', '').strip())) / 2
+    except (ValueError, TypeError, AttributeError):
+        pass
+    return 0
+
+def parse_owners_midpoint(owners):
+    """Midpoint of 'low - high' owner ranges (e.g. '20000 - 50000'); 0 when missing or malformed."""
+    return _map_distinct(owners, _parse_owner_range, 0).astype(float)
+
+def _first_genre(genres_str):
+    genres = str(genres_str).replace('[', '').replace(']', '').replace("'", '').split(',')
+    genre = genres[0].strip() if genres else "Unknown"
+    # Apply F2P alias to prevent truncation
+    if genre == "Free to Play": return "F2P"
+    return genre
+
+def extract_primary_genre(genres):
+    """First genre of a "['Action', 'Indie']"-style list string, 'Unknown' when missing."""
+    return _map_distinct(genres, _first_genre, "Unknown").astype(str)
+
+def assign_cohort(df, dlc_median, standalone_label):
+    """Free-to-Play if free, DLC-Heavy if dlc_count is above the median, else the standalone label."""
+    return np.select(
+        [df['price'] == 0, df['dlc_count'] > max(dlc_median, 0.0)],
+        ['Free-to-Play', 'DLC-Heavy'],
+        default=standalone_label
+    )
+
+# Raw-dump columns the pipeline actually reads. Streaming ingest loads only these,
+# with an explicit dtype, instead of every (mostly free-text) column of the dump.
+INGEST_NUMERIC_COLUMNS = ['price', 'average_playtime_forever', 'median_playtime_forever', 'metacritic_score',
+                          'user_score', 'peak_ccu', 'num_reviews_total', 'pct_pos_total', 'recommendations',
+                          'dlc_count']
+INGEST_TEXT_COLUMNS = ['name', 'release_date', 'estimated_owners', 'genres']
+
+def filter_rows(df):
+    """Row-local parsing and filtering. Returns (surviving rows, number of idle-inflated rows dropped).
+
+    Every step here only looks at the row itself, so running it per chunk and
+    concatenating gives the same result as running it on the whole file.
+    """
     # Parse release date and extract year
     df['release_date'] = pd.to_datetime(df['release_date'], errors='coerce')
     df['release_year'] = df['release_date'].dt.year
@@ -57,17 +287,8 @@ def clean_data(filepath):
              df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
     
     # Handle estimated_owners (convert to midpoint)
-    def parse_owners(owner_str):
-        if pd.isna(owner_str): return 0
-        try:
-             parts = owner_str.split('-')
-             if len(parts) == 2:
-                 return (int(parts[0].replace(',', '').strip()) + int(parts[1].replace(',', '').strip())) / 2
-        except:
-             pass
-        return 0
     if 'estimated_owners' in df.columns:
-        df['owners_midpoint'] = df['estimated_owners'].apply(parse_owners)
+        df['owners_midpoint'] = parse_owners_midpoint(df['estimated_owners'])
     else:
         df['owners_midpoint'] = df['recommendations'] * 10
         
@@ -78,44 +299,73 @@ def clean_data(filepath):
     
     # Check for Idle-Time Inflation (mean >> median implies extreme positive skew from botting/idling)
     df['median_playtime_forever'] = pd.to_numeric(df['median_playtime_forever'], errors='coerce').fillna(0)
-    df['idle_inflation_ratio'] = df.apply(lambda row: row['average_playtime_forever'] / row['median_playtime_forever'] if row['median_playtime_forever'] > 0 else 0, axis=1)
+    median_playtime = df['median_playtime_forever'].to_numpy(dtype=float)
+    df['idle_inflation_ratio'] = np.divide(df['average_playtime_forever'].to_numpy(dtype=float), median_playtime,
+                                           out=np.zeros(len(df)), where=median_playtime > 0)
     
     # Filter extreme outliers where mean playtime is > 10x the median (likely idle cards/achievement farming)
     idle_threshold = 10.0
     initial_len = len(df)
     df = df[df['idle_inflation_ratio'] <= idle_threshold]
-    filtered_idle = initial_len - len(df)
-    
+    return df, initial_len - len(df)
+
+def stream_rows(filepath, chunksize):
+    """Read the CSV in chunks with an explicit usecols/dtype schema, keeping only rows that survive `filter_rows`."""
+    header = pd.read_csv(filepath, nrows=0).columns
+    usecols = [c for c in INGEST_TEXT_COLUMNS + INGEST_NUMERIC_COLUMNS if c in header]
+    text_dtypes = {c: 'str' for c in INGEST_TEXT_COLUMNS if c in header}
+    numeric_dtypes = {c: 'float64' for c in INGEST_NUMERIC_COLUMNS if c in header}
+
+    def read(dtype):
+        kept, filtered_idle = [], 0
+        for chunk in pd.read_csv(filepath, usecols=usecols, dtype=dtype, chunksize=chunksize):
+            chunk, n_idle = filter_rows(chunk)
+            kept.append(chunk)
+            filtered_idle += n_idle
+        return pd.concat(kept), filtered_idle
+
+    try:
+        return read({**text_dtypes, **numeric_dtypes})
+    except ValueError:
+        # A numeric column holds junk text; let pandas infer it and coerce in filter_rows
+        print("Non-numeric values in numeric columns, re-reading with inferred numeric dtypes...")
+        return read(text_dtypes)
+
+def clean_data(filepath, chunksize=None, transform=None):
+    """Load, filter and derive the analysis columns, including `engagement_score`.
+
+    The score comes from `transform` (an EngagementTransform) when given;
+    otherwise the transform is fitted on this data. Either way it ends up in
+    `df.attrs['engagement_transform']`.
+    """
+    print("Loading and cleaning data...")
+    try:
+        if chunksize:
+            df, filtered_idle = stream_rows(filepath, chunksize)
+        else:
+            df, filtered_idle = filter_rows(pd.read_csv(filepath))
+    except Exception as e:
+        print(f"Error loading {filepath}: {e}")
+        return None
+
     # 1. Log Transform heavily skewed metrics
     df['log_playtime'] = np.log1p(df['average_playtime_forever'].clip(lower=0))
     df['log_ccu'] = np.log1p(np.maximum(df['peak_ccu'] if 'peak_ccu' in df.columns else df['recommendations'], 0))
     df['log_reviews'] = np.log1p(pd.to_numeric(df.get('num_reviews_total', 0), errors='coerce').clip(lower=0))
     df['norm_positivity'] = pd.to_numeric(df.get('pct_pos_total', 50), errors='coerce') / 100.0
 
-    # 2. Standardize features for PCA
-    pca_features = ['log_playtime', 'log_ccu', 'log_reviews', 'norm_positivity']
-    scaler = StandardScaler()
-    scaled_features = scaler.fit_transform(df[pca_features].fillna(0))
-    
-    # 3. Principal Component Analysis (PCA)
-    pca = PCA(n_components=1)
-    df['raw_score'] = pca.fit_transform(scaled_features)
-    
-    # Flip the sign of raw_score if the primary loading (playtime/ccu) is negative, ensuring higher = better
-    if pca.components_[0][0] < 0:
-        df['raw_score'] *= -1
-        pca.components_[0] *= -1
-        
-    explained_variance = pca.explained_variance_ratio_[0] * 100
-    loadings = dict(zip(pca_features, np.round(pca.components_[0], 3)))
-    
-    # 4. Scale 0-100 (Min-Max Scaling)
-    min_score = df['raw_score'].min()
-    max_score = df['raw_score'].max()
-    df['engagement_score'] = ((df['raw_score'] - min_score) / (max_score - min_score)) * 100
+    # 2-4. Standardize, project on the first principal component, scale 0-100
+    features = df[ENGAGEMENT_FEATURES].fillna(0).to_numpy()
+    if transform is None:
+        transform = EngagementTransform.fit(features)
+    df['raw_score'] = transform.raw_scores(features)
+    df['engagement_score'] = transform.score_features(features)
     
     df['is_free'] = df['price'] == 0
 
+    # Fitted transform parameters, so cached frames can be traced back to (and re-scored with) this fit
+    df.attrs['engagement_transform'] = transform.to_dict()
+
     # 5. External Sanity Validation (instead of circular hand-weighted)
     print(f"Data cleaned. {len(df)} records remaining. Excluded {filtered_idle} idle-inflated entries.")
     
@@ -126,36 +376,109 @@ def clean_data(filepath):
         
     insights_data['methodology'] = {
         'dataset_claim': "8,010 unique Steam titles analyzed across 35 structured features.",
-        'pca_variance_explained': f"{explained_variance:.1f}%",
-        'pca_loadings': loadings,
+        'pca_variance_explained': f"{transform.explained_variance_ratio * 100:.1f}%",
+        'pca_loadings': transform.loadings,
         'idle_inflation_filtered': filtered_idle,
         'robustness_check': validation_string
     }
     return df
 
-def calculate_the_verdict(df):
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def load_clean_data(filepath, chunksize=None, use_cache=True, transform=None):
+    """`clean_data` behind a Parquet cache keyed by the source file's hash and PIPELINE_VERSION.
+
+    A hit memory-maps the cached frame and restores the insights clean_data
+    would have recorded, skipping CSV parsing, date/owner derivation and the
+    PCA fit entirely. The key also names the engagement transform applied
+    (or "fit"), so frames scored with different transforms never mix.
+    """
+    if not use_cache or pq is None:
+        if use_cache:
+            print("Warning: pyarrow is not installed, so the cleaned-data cache is disabled and every run "
+                  "re-parses the CSV. Install it with `pip install -r requirements.txt`.")
+        return clean_data(filepath, chunksize=chunksize, transform=transform)
+
+    try:
+        source_hash = file_sha256(filepath)
+    except OSError as e:
+        print(f"Error loading {filepath}: {e}")
+        return None
+    mode = 'stream' if chunksize else 'full'
+    scoring = transform.version if transform is not None else 'fit'
+    cache_path = os.path.join(CACHE_DIR, f"clean_{source_hash[:16]}_v{PIPELINE_VERSION}_{mode}_{scoring}.parquet")
+
+    if os.path.exists(cache_path):
+        try:
+            table = pq.read_table(cache_path, memory_map=True)
+            meta = json.loads(table.schema.metadata[b'engagex'])
+            df = table.to_pandas()
+            df.attrs['engagement_transform'] = meta['engagement_transform']
+            insights_data.update(meta['insights'])
+            print(f"Loaded cleaned data from cache {cache_path} ({len(df)} records).")
+            return df
+        except Exception as e:
+            print(f"Ignoring unreadable cache {cache_path}: {e}")
+
+    df = clean_data(filepath, chunksize=chunksize, transform=transform)
+    if df is None:
+        return None
+    try:
+        table = pa.Table.from_pandas(df)
+        meta = {
+            'source_sha256': source_hash,
+            'pipeline_version': PIPELINE_VERSION,
+            'engagement_transform': df.attrs['engagement_transform'],
+            'insights': {key: insights_data[key] for key in CLEAN_DATA_INSIGHTS},
+        }
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}), b'engagex': json.dumps(meta)})
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        pq.write_table(table, cache_path + ".tmp")
+        os.replace(cache_path + ".tmp", cache_path)
+    except Exception as e:
+        print(f"Could not cache cleaned data: {e}")
+    return df
+
+def calculate_the_verdict(df, bootstrap_resamples=BOOTSTRAP_RESAMPLES, bootstrap_seconds=BOOTSTRAP_SECONDS):
     print("Calculating The Verdict (2010-2014 vs 2015-2025) - Null Result Hypothesis...")
-    df_pre = df[(df['release_year'] >= 2010) & (df['release_year'] <= 2014)]['engagement_score'].dropna()
-    df_post = df[(df['release_year'] >= 2015) & (df['release_year'] <= 2025)]['engagement_score'].dropna()
+    year = df['release_year']
+    period = np.select([(year >= 2010) & (year <= 2014), (year >= 2015) & (year <= 2025)], [0, 1], default=-1)
+    period_moments = stats_engine.grouped_moments(df['engagement_score'], period, n_groups=2)
+    pre, post = stats_engine.select(period_moments, 0), stats_engine.select(period_moments, 1)
     
-    pre_mean = df_pre.mean()
-    post_mean = df_post.mean()
+    pre_mean = pre.mean
+    post_mean = post.mean
     
-    pct_diff = ((post_mean - pre_mean) / pre_mean) * 100
+    pct_diff = stats_engine.percent_difference(post, pre)
     
     # Independent T-Test
-    t_stat, p_val = stats.ttest_ind(df_post, df_pre, equal_var=False)
+    t_stat, p_val = stats_engine.welch_t_test(post, pre)
     
     # Effect Size
-    d_value = cohen_d(df_post, df_pre)
+    d_value = stats_engine.cohens_d(post, pre)
     
     # Confidence Interval (95%) for difference in means
-    se_diff = np.sqrt(np.var(df_post, ddof=1)/len(df_post) + np.var(df_pre, ddof=1)/len(df_pre))
-    ci_margin_abs = 1.96 * se_diff
+    ci_margin_abs = stats_engine.normal_ci_margin(post, pre)
     ci_lower = ((post_mean - pre_mean - ci_margin_abs) / pre_mean) * 100
     ci_upper = ((post_mean - pre_mean + ci_margin_abs) / pre_mean) * 100
     
-    insights_data['the_verdict'] = {
+    extra = {}
+    if bootstrap_resamples:
+        scores = df['engagement_score'].to_numpy(dtype=float)
+        boot = stats_engine.bootstrap_two_sample(
+            scores[(period == 1) & ~np.isnan(scores)], scores[(period == 0) & ~np.isnan(scores)],
+            {'pct_diff': stats_engine.percent_difference, 'cohens_d': stats_engine.cohens_d},
+            n_resamples=bootstrap_resamples, time_budget=bootstrap_seconds)
+        ci_lower, ci_upper = boot.intervals['pct_diff']
+        extra = {'cohens_d_ci': [round(v, 3) for v in boot.intervals['cohens_d']],
+                 'ci_method': f"percentile bootstrap ({boot.n_resamples} resamples)"}
+    
+    return {'the_verdict': {
         'pct_diff': round(pct_diff, 1),
         'ci_lower': round(ci_lower, 1),
         'ci_upper': round(ci_upper, 1),
@@ -165,14 +488,56 @@ def calculate_the_verdict(df):
         't_stat': round(t_stat, 2),
         'p_val': p_val,
         'title': "The Engagement Redistribution Hypothesis",
-        'summary': f"Across {len(df)} Steam titles, aggregate engagement has remained statistically flat since 2015 (Δ = {pct_diff:+.1f}%, 95% CI [{ci_lower:+.1f}%, {ci_upper:+.1f}%], Cohen's d = {d_value:.2f}). However, beneath this stability lies a structural divergence: engagement growth is entirely concentrated in Free-to-Play and DLC-heavy ecosystems."
-    }
+        'summary': f"Across {len(df)} Steam titles, aggregate engagement has remained statistically flat since 2015 (Δ = {pct_diff:+.1f}%, 95% CI [{ci_lower:+.1f}%, {ci_upper:+.1f}%], Cohen's d = {d_value:.2f}). However, beneath this stability lies a structural divergence: engagement growth is entirely concentrated in Free-to-Play and DLC-heavy ecosystems.",
+        **extra
+    }}
+
+ENGAGEMENT_QUARTILES = ['Q1 (Low)', 'Q2 (Med-Low)', 'Q3 (Med-High)', 'Q4 (High)']
+
+def negative_review_rate(pct_pos_total):
+    return 100 - pd.to_numeric(pct_pos_total, errors='coerce').fillna(50)
+
+def engagement_quartile(scores):
+    return pd.qcut(scores, 4, labels=ENGAGEMENT_QUARTILES)
+
+def build_group_cube(df):
+    """Derive every grouped chart's keys once and aggregate them into one GroupCube.
 
-def generate_improved_plots(df):
+    Keys: release_year, audience_tier, primary_genre, engagement_quartile, the
+    cohort used by the divergence chart (titles from 2010 on) and the cohort
+    used by the survival curves (titles at least a year old). Measures:
+    engagement_score, negative_review_rate and `survives` (peak CCU above the
+    survival cohort's median, as 0/1).
+    """
+    print("Aggregating grouped statistics...")
+    bins = [0, 50000, 500000, 2000000, df['owners_midpoint'].max()]
+    labels = ['Niche (<50k)', 'Core (50k-500k)', 'Hit (500k-2M)', 'Blockbuster (>2M)']
+
+    recent = (df['release_year'] >= 2010).to_numpy()
+    recent_dlc_med = df.loc[recent, 'dlc_count'].median()
+    aged = (2025 - df['release_year'] >= 1).to_numpy()
+    aged_dlc_med = df.loc[aged, 'dlc_count'].median()
+    ccu_threshold = df.loc[aged, 'peak_ccu'].median()
+
+    keyed = df.assign(
+        audience_tier=pd.cut(df['owners_midpoint'], bins=bins, labels=labels),
+        primary_genre=extract_primary_genre(df['genres']),
+        engagement_quartile=engagement_quartile(df['engagement_score']),
+        recent_cohort=np.where(recent, assign_cohort(df, recent_dlc_med, 'Buy-to-Play (Premium standalone)'), None),
+        survival_cohort=np.where(aged, assign_cohort(df, aged_dlc_med, 'Buy-to-Play'), None),
+        negative_review_rate=negative_review_rate(df['pct_pos_total']),
+        survives=(df['peak_ccu'] > ccu_threshold).astype(float),
+    )
+    cube = stats_engine.GroupCube.build(
+        keyed, ['release_year', 'audience_tier', 'primary_genre', 'engagement_quartile', 'recent_cohort',
+                'survival_cohort'], ['engagement_score', 'negative_review_rate', 'survives'])
+    return {'group_cube': cube}
+
+def generate_improved_plots(df, group_cube):
     print("Generating Interactive Plotly Plots...")
     
     # 1. Time Series with Confidence Bands & Rolling Avg
-    yearly = df.groupby('release_year')['engagement_score'].agg(['mean', 'std', 'count']).reset_index()
+    yearly = group_cube.rollup(['release_year'], 'engagement_score')
     yearly = yearly[(yearly['release_year'] >= 2005) & (yearly['count'] >= 50)]
     yearly['rolling_mean'] = yearly['mean'].rolling(window=3, min_periods=1).mean()
     
@@ -197,8 +562,7 @@ def generate_improved_plots(df):
     fig_ts.update_layout(title="Longitudinal Analysis of Baseline Engagement Constructs",
                          xaxis_title="Release Year", yaxis_title="Engagement Score",
                          hovermode="x unified", yaxis_rangemode="tozero", margin=dict(l=40, r=40, t=60, b=40))
-    with open("frontend/public/assets/time_series.json", "w") as f:
-        f.write(fig_ts.to_json())
+    write_asset("time_series.json", fig_ts)
 
     # 2. Playtime Distribution (Log scale + Percentiles)
     fig_dist = px.histogram(df, x='average_playtime_forever', log_x=True, 
@@ -213,14 +577,10 @@ def generate_improved_plots(df):
     fig_dist.add_vline(x=p90, line_dash="dashdot", line_color="gray", annotation_text=f"90th %ile: {p90:.0f}m")
     fig_dist.update_layout(xaxis_title="Average Playtime (Minutes) - Log Scale", yaxis_title="Frequency",
                            margin=dict(l=40, r=40, t=60, b=40))
-    with open("frontend/public/assets/playtime_distribution.json", "w") as f:
-        f.write(fig_dist.to_json())
+    write_asset("playtime_distribution.json", fig_dist)
 
     # 3. Owner Range Impact Bar Chart (with CIs)
-    bins = [0, 50000, 500000, 2000000, df['owners_midpoint'].max()]
-    labels = ['Niche (<50k)', 'Core (50k-500k)', 'Hit (500k-2M)', 'Blockbuster (>2M)']
-    df['audience_tier'] = pd.cut(df['owners_midpoint'], bins=bins, labels=labels)
-    tier_grouped = df.groupby('audience_tier', observed=False)['engagement_score'].agg(['mean', 'std', 'count']).reset_index()
+    tier_grouped = group_cube.rollup(['audience_tier'], 'engagement_score')
     tier_grouped['ci'] = 1.96 * (tier_grouped['std'] / np.sqrt(tier_grouped['count']))
     
     fig_owner = px.bar(tier_grouped, x='audience_tier', y='mean', error_y='ci',
@@ -228,10 +588,94 @@ def generate_improved_plots(df):
                        color='mean', color_continuous_scale="viridis", text_auto='.1f')
     fig_owner.update_layout(xaxis_title="Audience Tier", yaxis_title="Average Engagement Score (95% CI)",
                             margin=dict(l=40, r=40, t=60, b=40))
-    with open("frontend/public/assets/owner_impact.json", "w") as f:
-        f.write(fig_owner.to_json())
+    write_asset("owner_impact.json", fig_owner)
+    return {}
+
+def _robust_z(values):
+    median = np.nanmedian(values)
+    scale = 1.4826 * np.nanmedian(np.abs(values - median)) or np.nanstd(values) or 1.0
+    return np.abs(values - median) / scale
+
+def _grid_bins(values, grid):
+    finite = np.isfinite(values)
+    if not finite.any():
+        return np.full(len(values), grid)
+    lo, hi = values[finite].min(), values[finite].max()
+    span = (hi - lo) or 1.0
+    bins = np.clip(((np.where(finite, values, lo) - lo) / span * grid).astype(int), 0, grid - 1)
+    return np.where(finite, bins, grid)  # NaNs get a bin of their own
+
+def sample_scatter_rows(df, x, y, budget, strata=None, outlier_share=0.1, grid=64, seed=0):
+    """Boolean mask selecting at most `budget` rows of `df` to draw in an x/y scatter.
+
+    Outliers (robust z-score above 3.5 on either axis, most extreme first) are
+    always kept, using up to `outlier_share` of the budget. The rest of the budget
+    is water-filled over a grid x grid binning of the plane, per `strata` group:
+    every cell keeps up to the same number of points, so sparse regions and
+    small groups survive intact and only dense cells are thinned. Seeded, so
+    reruns (and the assets' content hashes) are stable.
+    """
+    keep = np.zeros(len(df), dtype=bool)
+    if len(df) <= budget:
+        keep[:] = True
+        return keep
+    xv = pd.to_numeric(df[x], errors='coerce').to_numpy(dtype=float)
+    yv = pd.to_numeric(df[y], errors='coerce').to_numpy(dtype=float)
+
+    extremeness = np.nan_to_num(np.fmax(_robust_z(xv), _robust_z(yv)), nan=-np.inf)
+    outliers = np.argsort(-extremeness, kind='stable')[:int(budget * outlier_share)]
+    keep[outliers[extremeness[outliers] > 3.5]] = True
+
+    cell = _grid_bins(xv, grid) * (grid + 1) + _grid_bins(yv, grid)
+    if strata is not None:
+        cell = cell + (pd.factorize(df[strata])[0] + 1) * (grid + 1) ** 2
+    order = np.random.default_rng(seed).permutation(np.flatnonzero(~keep))
+    cells = cell[order]
+    rank = pd.Series(cells).groupby(cells).cumcount().to_numpy()
+    counts = np.bincount(pd.factorize(cells)[0])
+
+    # Largest per-cell cap that fits in what is left of the budget
+    remaining = budget - keep.sum()
+    lo, hi = 0, counts.max()
+    while lo < hi:
+        cap = (lo + hi + 1) // 2
+        lo, hi = (cap, hi) if np.minimum(counts, cap).sum() <= remaining else (lo, cap - 1)
+    keep[order[rank < lo]] = True
+    # Spend the rounding remainder on random cells that were capped
+    keep[order[rank == lo][:remaining - np.minimum(counts, lo).sum()]] = True
+    return keep
 
-def generate_correlation_and_scatter(df):
+def budgeted_scatter(data, x, y, point_budget, color=None, builder='px', **kwargs):
+    """`px.scatter` that embeds at most `point_budget` markers.
+
+    The figure, including any `trendline`, is built from every row of `data`;
+    only then are the marker traces thinned with `sample_scatter_rows` and the
+    (straight) trendlines cut down to their end points. Inputs within budget
+    come out exactly as plain `px.scatter` would build them. `builder='lean'`
+    returns the same figure as a `figure_engine.LeanFigure`.
+    """
+    if len(data) <= point_budget:
+        if builder == 'lean':
+            return figure_engine.scatter(data, x=x, y=y, color=color, **kwargs)
+        return px.scatter(data, x=x, y=y, color=color, **kwargs)
+    keep = sample_scatter_rows(data, x, y, point_budget, strata=color)
+    if builder == 'lean':
+        fig = figure_engine.scatter(data, x=x, y=y, color=color, keep=keep, **kwargs)
+    else:
+        fig = px.scatter(data.assign(_row=np.arange(len(data))), x=x, y=y, color=color,
+                         custom_data=['_row'], **kwargs)
+        for trace in fig.data:
+            if trace.customdata is not None:
+                rows = keep[np.asarray(trace.customdata)[:, 0].astype(int)]
+                trace.update(x=np.asarray(trace.x)[rows], y=np.asarray(trace.y)[rows], customdata=None)
+            elif trace.mode == 'lines' and len(trace.x) > 2:
+                # px sorts trendline points by x, so the end points carry the whole line
+                trace.update(x=np.asarray(trace.x)[[0, -1]], y=np.asarray(trace.y)[[0, -1]])
+    fig.update_layout(title_text=f"{fig.layout.title.text}<br><sup>Showing {keep.sum():,} of {len(data):,} "
+                                 f"titles (outliers kept); trendlines fit on all</sup>")
+    return fig
+
+def generate_correlation_and_scatter(df, group_cube, point_budget=SCATTER_POINT_BUDGET):
     print("Generating Heatmaps and Regressions (Plotly)...")
     
     # 4. Correlation Heatmap
@@ -242,24 +686,26 @@ def generate_correlation_and_scatter(df):
     fig_corr = px.imshow(corr_df, text_auto=".2f", aspect="auto", color_continuous_scale="rdbu_r",
                          title="Multivariate Feature Correlation Matrix")
     fig_corr.update_layout(margin=dict(l=40, r=40, t=60, b=40))
-    with open("frontend/public/assets/correlation_heatmap.json", "w") as f:
-        f.write(fig_corr.to_json())
+    write_asset("correlation_heatmap.json", fig_corr)
     
     # 5. Segmented Pricing Analysis
-    df['pricing_tier'] = np.where(df['is_free'], 'Free', np.where(df['price'] < 20, 'Low-cost (<$20)', 'Premium ($20+)'))
-    fig_price = px.scatter(df[df['price'] <= 100], x='price', y='engagement_score', color='pricing_tier',
-                           trendline="ols", title="Pricing vs Engagement Relationship by Tier",
-                           opacity=0.3, color_discrete_sequence=px.colors.qualitative.Set2)
+    # Just the plotted columns: filtering the whole frame would copy every column
+    priced = df.loc[df['price'] <= 100, ['price', 'engagement_score']]
+    priced = priced.assign(pricing_tier=pricing_tiers(priced['price']))
+    fig_price = budgeted_scatter(priced, x='price', y='engagement_score', color='pricing_tier',
+                                 point_budget=point_budget, builder=FIGURE_BUILDER, trendline="ols",
+                                 title="Pricing vs Engagement Relationship by Tier",
+                                 opacity=0.3, color_discrete_sequence=px.colors.qualitative.Set2)
     fig_price.update_layout(xaxis_title="Initial Price Point ($)", yaxis_title="Calculated Engagement Score",
                             yaxis_rangemode="tozero", margin=dict(l=40, r=40, t=60, b=40))
-    with open("frontend/public/assets/pricing_regression.json", "w") as f:
-        f.write(fig_price.to_json())
+    write_asset("pricing_regression.json", fig_price)
     
     # 6. DLC Impact Scatter
-    dlc_filtered = df[df['dlc_count'] <= df['dlc_count'].quantile(0.99)]
-    fig_dlc = px.scatter(dlc_filtered, x='dlc_count', y='engagement_score', trendline="ols",
-                         title="Ecosystem Expansion: DLC Count vs Core Retention",
-                         color_discrete_sequence=['#38bdf8'], opacity=0.3, trendline_color_override="#f472b6")
+    dlc_filtered = df.loc[df['dlc_count'] <= df['dlc_count'].quantile(0.99), ['dlc_count', 'engagement_score']]
+    fig_dlc = budgeted_scatter(dlc_filtered, x='dlc_count', y='engagement_score', point_budget=point_budget,
+                               builder=FIGURE_BUILDER, trendline="ols",
+                               title="Ecosystem Expansion: DLC Count vs Core Retention",
+                               color_discrete_sequence=['#38bdf8'], opacity=0.3, trendline_color_override="#f472b6")
     fig_dlc.update_layout(xaxis_title="Total Distributed DLC Packages", yaxis_title="Engagement Score",
                           yaxis_rangemode="tozero", margin=dict(l=40, r=40, t=60, b=40))
                           
@@ -276,26 +722,14 @@ def generate_correlation_and_scatter(df):
         font=dict(family="monospace", size=11, color="#38bdf8"), align="left"
     )
 
-    with open("frontend/public/assets/dlc_impact.json", "w") as f:
-        f.write(fig_dlc.to_json())
+    write_asset("dlc_impact.json", fig_dlc)
     
-    insights_data['dlc_insight'] = f"OLS Regression: β = {slope:.3f} ± {ci_margin:.3f} per DLC (95% CI) | R² = {r_value**2:.3f} | p = {p_value:.2e}"
+    fragment = {}
+    fragment['dlc_insight'] = f"OLS Regression: β = {slope:.3f} ± {ci_margin:.3f} per DLC (95% CI) | R² = {r_value**2:.3f} | p = {p_value:.2e}"
     
     # 7. Genre analysis (with CIs)
-    def extract_first_genre(genres_str):
-        if pd.isna(genres_str): return "Unknown"
-        genres = str(genres_str).replace('[', '').replace(']', '').replace("'", '').split(',')
-        genre = genres[0].strip() if genres else "Unknown"
-        # Apply F2P alias to prevent truncation
-        if genre == "Free to Play": return "F2P"
-        return genre
-        
-    df['primary_genre'] = df['genres'].apply(extract_first_genre)
-    genre_stats = df.groupby('primary_genre').agg(
-        mean_score=('engagement_score', 'mean'),
-        std_score=('engagement_score', 'std'),
-        count=('engagement_score', 'count')
-    ).reset_index()
+    genre_stats = group_cube.rollup(['primary_genre'], 'engagement_score').rename(
+        columns={'mean': 'mean_score', 'std': 'std_score'})
     genre_stats['ci'] = 1.96 * (genre_stats['std_score'] / np.sqrt(genre_stats['count']))
     top_genres = genre_stats[genre_stats['count'] >= 50].sort_values(by='mean_score', ascending=False).head(15)
     
@@ -304,24 +738,19 @@ def generate_correlation_and_scatter(df):
                        color='mean_score', color_continuous_scale="magma")
     fig_genre.update_layout(xaxis_title="Mean Engagement Score (95% CI)", yaxis_title="",
                             yaxis={'categoryorder':'total ascending'}, margin=dict(l=40, r=40, t=60, b=40))
-    with open("frontend/public/assets/genre_performance.json", "w") as f:
-        f.write(fig_genre.to_json())
+    write_asset("genre_performance.json", fig_genre)
     
-    insights_data['top_genres'] = top_genres['primary_genre'].tolist()
+    fragment['top_genres'] = top_genres['primary_genre'].tolist()
 
     # 8. Fatigue Analysis (Engagement Intensity and Community Volatility)
     # Replaced polynomial regression with honest Quartile analysis
-    df['negative_review_rate'] = 100 - pd.to_numeric(df['pct_pos_total'], errors='coerce').fillna(50)
-    
-    df['engagement_quartile'] = pd.qcut(df['engagement_score'], 4, labels=['Q1 (Low)', 'Q2 (Med-Low)', 'Q3 (Med-High)', 'Q4 (High)'])
-    fatigue_stats = df.dropna(subset=['negative_review_rate']).groupby('engagement_quartile', observed=False).agg(
-        mean_neg=('negative_review_rate', 'mean'),
-        std_neg=('negative_review_rate', 'std'),
-        count=('negative_review_rate', 'count')
-    ).reset_index()
+    fatigue_stats = group_cube.rollup(['engagement_quartile'], 'negative_review_rate').rename(
+        columns={'mean': 'mean_neg', 'std': 'std_neg'})
     fatigue_stats['ci'] = 1.96 * (fatigue_stats['std_neg'] / np.sqrt(fatigue_stats['count']))
     
-    # Kruskal-Wallis H-test
+    # Kruskal-Wallis H-test (rank-based, so it needs the rows rather than the cube)
+    df = df.assign(negative_review_rate=negative_review_rate(df['pct_pos_total']),
+                   engagement_quartile=engagement_quartile(df['engagement_score']))
     q_groups = [df[df['engagement_quartile'] == q]['negative_review_rate'].dropna() for q in fatigue_stats['engagement_quartile']]
     h_stat, p_val_kw = stats.kruskal(*q_groups)
     
@@ -336,35 +765,20 @@ def generate_correlation_and_scatter(df):
                              
     fig_fatigue.update_layout(xaxis_title="Engagement Score Quartile", yaxis_title="Mean Negative Review Rate (%)",
                               yaxis_rangemode="tozero", margin=dict(l=40, r=40, t=60, b=40))
-    with open("frontend/public/assets/fatigue_analysis.json", "w") as f:
-        f.write(fig_fatigue.to_json())
+    write_asset("fatigue_analysis.json", fig_fatigue)
         
-    insights_data['ethical_insight'] = {
+    fragment['ethical_insight'] = {
         'h_stat': round(h_stat, 2),
         'p_val': f"{p_val_kw:.4e}",
         'eta2': round(eta2, 3),
         'text': f"Kruskal-Wallis analysis across engagement quartiles yields H({k_groups-1})={h_stat:.1f}, p={p_val_kw:.2e}. The effect size (η²={eta2:.3f}) is extremely small. While Q4 titles see slightly higher volatility, the data firmly rejects the dramatic 'inevitable fatigue' narrative. Community sentiment remains remarkably stable across all engagement intensities."
     }
+    return fragment
 
-def cohen_d(x, y):
-    nx = len(x)
-    ny = len(y)
-    dof = nx + ny - 2
-    return (np.mean(x) - np.mean(y)) / np.sqrt(((nx-1)*np.std(x, ddof=1) ** 2 + (ny-1)*np.std(y, ddof=1) ** 2) / dof)
-
-def generate_cohort_divergence(df):
+def generate_cohort_divergence(group_cube):
     print("Generating Cohort Divergence (Aha Moment)...")
-    df_cohort = df[(df['release_year'] >= 2010)].copy()
-    dlc_med = df_cohort['dlc_count'].median()
-    
-    def get_cohort(row):
-        if row['price'] == 0: return 'Free-to-Play'
-        if row['dlc_count'] > max(dlc_med, 0.0): return 'DLC-Heavy'
-        return 'Buy-to-Play (Premium standalone)'
-        
-    df_cohort['cohort'] = df_cohort.apply(get_cohort, axis=1)
-    
-    cohort_stats = df_cohort.groupby(['release_year', 'cohort'])['engagement_score'].agg(['mean', 'std', 'count']).reset_index()
+    cohort_stats = group_cube.rollup(['release_year', 'recent_cohort'], 'engagement_score').rename(
+        columns={'recent_cohort': 'cohort'})
     cohort_stats = cohort_stats[cohort_stats['count'] >= 10] # Require minimum sample size
     cohort_stats['ci'] = 1.96 * (cohort_stats['std'] / np.sqrt(cohort_stats['count']))
     
@@ -375,8 +789,7 @@ def generate_cohort_divergence(df):
     fig_cohort.update_layout(xaxis_title="Release Year", yaxis_title="Mean Engagement Score (95% CI)",
                              yaxis_rangemode="tozero", hovermode="x unified", margin=dict(l=40, r=40, t=60, b=40))
     
-    with open("frontend/public/assets/cohort_divergence.json", "w") as f:
-        f.write(fig_cohort.to_json())
+    write_asset("cohort_divergence.json", fig_cohort)
         
     # Calculate slopes for F2P vs B2P
     slopes = {}
@@ -386,39 +799,29 @@ def generate_cohort_divergence(df):
             slope, intercept, r_val, p_val, std_err = stats.linregress(c_data['release_year'], c_data['mean'])
             slopes[c] = {'slope': slope, 'r2': r_val**2, 'p_val': p_val, 'stderr': std_err}
             
-    insights_data['cohort_slopes'] = {
+    return {'cohort_slopes': {
         'f2p_slope': round(slopes.get('Free-to-Play', {}).get('slope', 0), 2),
         'f2p_r2': round(slopes.get('Free-to-Play', {}).get('r2', 0), 2),
         'f2p_pval': f"{slopes.get('Free-to-Play', {}).get('p_val', 1.0):.4f}",
         'b2p_slope': round(slopes.get('Buy-to-Play (Premium standalone)', {}).get('slope', 0), 2),
         'b2p_r2': round(slopes.get('Buy-to-Play (Premium standalone)', {}).get('r2', 0), 2),
         'b2p_pval': f"{slopes.get('Buy-to-Play (Premium standalone)', {}).get('p_val', 1.0):.4f}",
-    }
+    }}
 
-def generate_survival_curves(df):
+def generate_survival_curves(group_cube):
     print("Generating Survival Decay Curves...")
-    # Age = proxy for time
-    df['age_years'] = 2025 - df['release_year']
-    
-    df_cohort = df[df['age_years'] >= 1].copy()
-    dlc_med = df_cohort['dlc_count'].median()
-    ccu_threshold = df_cohort['peak_ccu'].median()
-    
-    def get_cohort(row):
-        if row['price'] == 0: return 'Free-to-Play'
-        if row['dlc_count'] > max(dlc_med, 0.0): return 'DLC-Heavy'
-        return 'Buy-to-Play'
-        
-    df_cohort['cohort'] = df_cohort.apply(get_cohort, axis=1)
+    # Age = proxy for time; `survives` sums to the titles whose peak CCU beats the cohort median
+    survival = group_cube.rollup(['release_year', 'survival_cohort'], 'survives')
+    survival = survival.assign(age_years=2025 - survival['release_year'])
     
     survival_data = []
     for age in [1, 3, 5, 7, 10]:
-        age_cohort = df_cohort[df_cohort['age_years'] == age]
+        age_cohort = survival[survival['age_years'] == age]
         for c in ['Free-to-Play', 'DLC-Heavy', 'Buy-to-Play']:
-            c_data = age_cohort[age_cohort['cohort'] == c]
-            if len(c_data) > 0:
-                survivors = len(c_data[c_data['peak_ccu'] > ccu_threshold])
-                rate = (survivors / len(c_data)) * 100
+            c_data = age_cohort[age_cohort['survival_cohort'] == c]
+            if c_data['count'].sum() > 0:
+                survivors = int(c_data['sum'].sum())
+                rate = (survivors / int(c_data['count'].sum())) * 100
             else:
                 rate = np.nan
             survival_data.append({'Age (Years)': age, 'Cohort': c, 'Survival Rate (%)': rate})
@@ -440,8 +843,7 @@ def generate_survival_curves(df):
         font=dict(size=10, color="#00ffcc"), ax=-40, ay=-30
     )
     
-    with open("frontend/public/assets/survival_curves.json", "w") as f:
-        f.write(fig_surv.to_json())
+    write_asset("survival_curves.json", fig_surv)
         
     half_lives = {}
     for c in ['Free-to-Play', 'DLC-Heavy', 'Buy-to-Play']:
@@ -456,10 +858,10 @@ def generate_survival_curves(df):
             
     c_table = []
     for c in ['Free-to-Play', 'DLC-Heavy', 'Buy-to-Play']:
-        c_data = df_cohort[(df_cohort['age_years'] >= 5) & (df_cohort['cohort'] == c)]
-        if len(c_data) > 0:
-            surv = len(c_data[c_data['peak_ccu'] > ccu_threshold])
-            dead = len(c_data) - surv
+        c_data = survival[(survival['age_years'] >= 5) & (survival['survival_cohort'] == c)]
+        if c_data['count'].sum() > 0:
+            surv = int(c_data['sum'].sum())
+            dead = int(c_data['count'].sum()) - surv
             c_table.append([surv, dead])
             
     if len(c_table) == 3:
@@ -467,33 +869,44 @@ def generate_survival_curves(df):
     else:
         chi2_stat, p_val = 0, 1.0
         
-    insights_data['survival_stats'] = {
+    return {'survival_stats': {
         'half_lives': half_lives,
         'chi2': round(chi2_stat, 1),
         'p_val': f"{p_val:.2e}"
-    }
+    }}
 
-def find_aha_moment_stats(df):
+def find_aha_moment_stats(df, bootstrap_resamples=BOOTSTRAP_RESAMPLES, bootstrap_seconds=BOOTSTRAP_SECONDS):
     print("Calculating Statistical Insights...")
     
     indie_games = df[(df['price'] > 0) & (df['price'] <= 20)]['engagement_score'].dropna()
     premium_games = df[df['price'] >= 40]['engagement_score'].dropna()
+    indie, premium = stats_engine.moments(indie_games), stats_engine.moments(premium_games)
     
     # Perform independent T-Test
-    t_stat, p_val = stats.ttest_ind(indie_games, premium_games, equal_var=False)
+    t_stat, p_val = stats_engine.welch_t_test(indie, premium)
     
     # Effect Size
-    d_value = cohen_d(premium_games, indie_games)
+    d_value = stats_engine.cohens_d(premium, indie)
     
     # Confidence Interval (95%) for difference in means
-    se_diff = np.sqrt(np.var(premium_games, ddof=1)/len(premium_games) + np.var(indie_games, ddof=1)/len(indie_games))
-    ci_margin = 1.96 * se_diff
-    diff_mean = premium_games.mean() - indie_games.mean()
+    ci_margin = stats_engine.normal_ci_margin(premium, indie)
+    diff_mean = stats_engine.mean_difference(premium, indie)
+    ci_lower, ci_upper = diff_mean - ci_margin, diff_mean + ci_margin
+    
+    indie_mean = indie.mean
+    premium_mean = premium.mean
     
-    indie_mean = indie_games.mean()
-    premium_mean = premium_games.mean()
+    diff_pct = stats_engine.percent_difference(premium, indie)
     
-    diff_pct = ((premium_mean - indie_mean) / indie_mean) * 100
+    extra = {}
+    if bootstrap_resamples:
+        boot = stats_engine.bootstrap_two_sample(
+            premium_games, indie_games,
+            {'mean_diff': stats_engine.mean_difference, 'cohens_d': stats_engine.cohens_d},
+            n_resamples=bootstrap_resamples, time_budget=bootstrap_seconds)
+        ci_lower, ci_upper = boot.intervals['mean_diff']
+        extra = {'cohens_d_ci': [round(v, 3) for v in boot.intervals['cohens_d']],
+                 'ci_method': f"percentile bootstrap ({boot.n_resamples} resamples)"}
     
     if abs(d_value) < 0.2:
         interpretation = "Negligible"
@@ -512,18 +925,103 @@ def find_aha_moment_stats(df):
                   f"but the actual effect size (Cohen's d = {d_value:.2f}) is '{interpretation}'. "
                   f"Raw initial purchase price is an extremely weak structural predictor of sustained attention.")
                   
-    insights_data['aha_moment'] = aha_string
-    insights_data['aha_stats'] = {
+    return {'aha_moment': aha_string, 'aha_stats': {
         'indie_mean': round(indie_mean, 2),
         'premium_mean': round(premium_mean, 2),
         'p_value': f"{p_val:.4e}",
         'cohens_d': round(d_value, 2),
         'effect_size': interpretation,
-        'ci_lower': round(diff_mean - ci_margin, 2),
-        'ci_upper': round(diff_mean + ci_margin, 2)
+        'ci_lower': round(ci_lower, 2),
+        'ci_upper': round(ci_upper, 2),
+        **extra
+    }}
+
+def make_regressor(backend, seed, n_jobs=-1):
+    if backend == 'hgb':
+        return HistGradientBoostingRegressor(random_state=seed)
+    return RandomForestRegressor(n_estimators=100, random_state=seed, n_jobs=n_jobs, max_depth=10)
+
+def budget_train_rows(X, y, backend, seed, budget_seconds, cv_workers=CV_WORKERS, pilot_rows=5000):
+    """Most training rows (all, or a SUBSAMPLE_LADDER step) whose CV and final fit should fit the budget.
+
+    Times one fit on a `pilot_rows` sample and extrapolates as n log n, with
+    the folds running `cv_workers` at a time.
+    """
+    n = len(X)
+    start = time.perf_counter()
+    pilot = np.random.default_rng(seed).choice(n, min(n, pilot_rows), replace=False)
+    make_regressor(backend, seed).fit(X[pilot], y[pilot])
+    per_row_log = (time.perf_counter() - start) / (len(pilot) * np.log(max(len(pilot), 2)))
+    rounds = -(-CV_FOLDS // max(cv_workers, 1))
+
+    def predicted_seconds(rows):
+        fold_rows = rows * (CV_FOLDS - 1) / CV_FOLDS
+        return per_row_log * (rounds * fold_rows * np.log(fold_rows) + rows * np.log(rows))
+
+    remaining = budget_seconds - (time.perf_counter() - start)
+    if predicted_seconds(n) <= remaining:
+        return n
+    fitting = [rows for rows in SUBSAMPLE_LADDER if rows < n and predicted_seconds(rows) <= remaining]
+    return fitting[-1] if fitting else min(n, SUBSAMPLE_LADDER[0])
+
+def train_engagement_model(X_train, y_train, backend=MODEL_BACKEND, train_rows=TRAIN_ROWS,
+                           train_seconds=TRAIN_SECONDS, cv_workers=CV_WORKERS, seed=MODEL_SEED):
+    """Cross-validate and fit the engagement model on scaled training rows.
+
+    Returns (model, report): CV scores, the rows used out of those available
+    and the seconds spent. Folds run on a process pool when `cv_workers` > 1;
+    the scores do not depend on it. Subsampled rows depend only on `seed` and
+    the row count, which the report records, so a budgeted run can be
+    repeated exactly with `train_rows`.
+    """
+    X_train, y_train = np.asarray(X_train), np.asarray(y_train)
+    start = time.perf_counter()
+    n_available = len(X_train)
+    if train_seconds:
+        budget_rows = budget_train_rows(X_train, y_train, backend, seed, train_seconds, cv_workers)
+        train_rows = min(train_rows or budget_rows, budget_rows)
+    if train_rows and train_rows < n_available:
+        keep = np.sort(np.random.default_rng(seed).choice(n_available, train_rows, replace=False))
+        X_train, y_train = X_train[keep], y_train[keep]
+
+    cv_start = time.perf_counter()
+    # One process per fold already; the forest inside each keeps to one core
+    cv_model = make_regressor(backend, seed, n_jobs=1 if cv_workers > 1 else -1)
+    cv_scores = cross_validate(cv_model, X_train, y_train, cv=CV_FOLDS, scoring='r2', n_jobs=cv_workers)['test_score']
+    fit_start = time.perf_counter()
+    model = make_regressor(backend, seed)
+    model.fit(X_train, y_train)
+    end = time.perf_counter()
+    return model, {
+        'backend': backend,
+        'seed': seed,
+        'cv_scores': cv_scores,
+        'n_train': len(X_train),
+        'n_train_available': n_available,
+        'cv_workers': cv_workers,
+        'cv_seconds': fit_start - cv_start,
+        'fit_seconds': end - fit_start,
+        'train_seconds': end - start,
     }
 
-def robust_ml_prediction(df):
+def feature_importance_ci(model, X_test, y_test, seed, max_rows=20_000, repeats=10):
+    """(mean importances, 95% CI half-widths, axis label, method) for the importance chart."""
+    if hasattr(model, 'estimators_'):
+        # Impurity importances of the individual trees
+        importances = np.array([estimator.feature_importances_ for estimator in model.estimators_])
+        ci = 1.96 * (importances.std(axis=0) / np.sqrt(len(model.estimators_)))
+        return importances.mean(axis=0), ci, "Gini Importance", "Bootstrap"
+    # Boosted trees have no per-tree importances; permute each feature on held-out rows instead
+    rows = np.random.default_rng(seed).permutation(len(X_test))[:max_rows]
+    result = permutation_importance(model, X_test[rows], np.asarray(y_test)[rows], n_repeats=repeats,
+                                    random_state=seed)
+    ci = 1.96 * result.importances_std / np.sqrt(repeats)
+    return result.importances_mean, ci, "Permutation Importance (R² drop)", f"{repeats} Permutations"
+
+MODEL_NAMES = {'rf': 'Random Forest Regressor', 'hgb': 'Histogram Gradient Boosting Regressor'}
+
+def robust_ml_prediction(df, backend=MODEL_BACKEND, train_rows=TRAIN_ROWS, train_seconds=TRAIN_SECONDS,
+                         cv_workers=CV_WORKERS, seed=MODEL_SEED):
     print("Running Robust ML Model and generating evaluation metrics...")
     
     features = ['price', 'dlc_count', 'release_year']
@@ -538,36 +1036,52 @@ def robust_ml_prediction(df):
     y = y[mask]
 
     # Train-test split
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=seed)
     
     scaler = StandardScaler()
     X_train_scaled = scaler.fit_transform(X_train)
     X_test_scaled = scaler.transform(X_test)
     
-    model = RandomForestRegressor(n_estimators=100, random_state=42, n_jobs=-1, max_depth=10)
-    
-    # Cross Validation
-    cv_scores = cross_val_score(model, X_train_scaled, y_train, cv=5, scoring='r2')
-    
-    model.fit(X_train_scaled, y_train)
+    model, training = train_engagement_model(X_train_scaled, y_train, backend, train_rows, train_seconds,
+                                             cv_workers, seed)
+    cv_scores = training['cv_scores']
     y_pred = model.predict(X_test_scaled)
     
-    # Export model and scaler for the Engagement Calculator
-    joblib.dump(model, 'rf_model.joblib')
-    joblib.dump(scaler, 'rf_scaler.joblib')
-    
     r2 = r2_score(y_test, y_pred)
     mae = mean_absolute_error(y_test, y_pred)
     rmse = root_mean_squared_error(y_test, y_pred)
-    
-    # Extract bootstrapped feature importance CIs
-    importances = []
-    for estimator in model.estimators_:
-        importances.append(estimator.feature_importances_)
-    importances = np.array(importances)
-    mean_imp = importances.mean(axis=0)
-    std_imp = importances.std(axis=0)
-    ci_imp = 1.96 * (std_imp / np.sqrt(len(model.estimators_)))
+    print(f"Trained {MODEL_NAMES[backend]} on {training['n_train']:,} of {training['n_train_available']:,} rows "
+          f"in {training['train_seconds']:.1f}s (CV {training['cv_seconds']:.1f}s on {cv_workers} process(es), "
+          f"fit {training['fit_seconds']:.1f}s): test R² {r2:.4f}, CV R² {cv_scores.mean():.4f} "
+          f"± {cv_scores.std():.4f}, MAE {mae:.2f}")
+
+    # Export model and scaler for the Engagement Calculator
+    joblib.dump(model, 'rf_model.joblib')
+    joblib.dump(scaler, 'rf_scaler.joblib')
+    # Flat node arrays with the scaler folded in, for low-latency API inference
+    forest = compile_model(model, scaler)
+    save_forest(forest, 'rf_forest.joblib')
+    # Versioned copy for the API's model registry, which hot-swaps to it
+    version = publish_model(model, scaler, forest, metrics={
+        'r2_score': round(r2, 4),
+        'cv_mean_r2': round(cv_scores.mean(), 4),
+        'cv_std_r2': round(cv_scores.std(), 4),
+        'mae': round(mae, 2),
+        'rmse': round(rmse, 2),
+        'features': features,
+        'n_train': training['n_train'],
+        'n_train_available': training['n_train_available'],
+        'n_test': len(X_test),
+        'backend': backend,
+        'seed': seed,
+        'train_seconds': round(training['train_seconds'], 2),
+        'cv_seconds': round(training['cv_seconds'], 2),
+        'fit_seconds': round(training['fit_seconds'], 2),
+    })
+    print(f"Published model version {version} to {REGISTRY_DIR}/")
+    
+    # Feature importances with 95% CIs
+    mean_imp, ci_imp, importance_label, ci_method = feature_importance_ci(model, X_test_scaled, y_test, seed)
     
     importance_df = pd.DataFrame({
         'Feature': features,
@@ -585,25 +1099,28 @@ def robust_ml_prediction(df):
     importance_df['Feature_Label'] = importance_df['Feature'].map(feature_label_map)
 
     fig_feat = px.bar(importance_df, x='Importance', y='Feature_Label', orientation='h', error_x='CI',
-                      title="Random Forest Feature Importances (95% CI via Bootstrap)",
+                      title=f"{MODEL_NAMES[backend].removesuffix(' Regressor')} Feature Importances (95% CI via {ci_method})",
                       color='Importance', color_continuous_scale="viridis")
-    fig_feat.update_layout(xaxis_title="Gini Importance", yaxis_title="",
+    fig_feat.update_layout(xaxis_title=importance_label, yaxis_title="",
                            margin=dict(l=40, r=40, t=60, b=40))
-    with open("frontend/public/assets/feature_importance.json", "w") as f:
-        f.write(fig_feat.to_json())
+    write_asset("feature_importance.json", fig_feat)
     
-    insights_data['ml_insights'] = {
+    return {'ml_insights': {
         'top_feature': importance_df.iloc[-1]['Feature'],
         'r2_score': round(r2, 4),
         'cv_mean_r2': round(cv_scores.mean(), 4),
         'mae': round(mae, 2),
         'rmse': round(rmse, 2),
-        'model_name': 'Random Forest Regressor'
-    }
+        'model_name': MODEL_NAMES[backend],
+        'n_train': training['n_train'],
+        'n_train_available': training['n_train_available'],
+        'train_seconds': round(training['train_seconds'], 2),
+    }}
 
 def generate_top_20(df):
     print("Generating Top 20 array...")
-    top_20 = df.sort_values(by='engagement_score', ascending=False).head(20)
+    # Top-k selection, not a sort of the whole catalog; the chart reuses it
+    top_20 = df.nlargest(20, 'engagement_score')
     # create safe list of dicts
     top_list = top_20[['name', 'release_year', 'engagement_score', 'average_playtime_forever', 'num_reviews_total']].copy()
     
@@ -611,8 +1128,39 @@ def generate_top_20(df):
     top_list['name'] = top_list['name'].str.replace("Tom Clancy's Rainbow Six® Siege", "Rainbow Six® Siege", regex=False)
     
     top_list['engagement_score'] = top_list['engagement_score'].round(1)
+
+    # Generate Top 20 Plotly Horizontal Bar Chart
+    # Plotly puts the first item at the bottom of the y-axis, so the chart lists them in reverse
+    top_20_df = top_20.iloc[::-1].copy()
     
-    insights_data['top_20_games'] = top_list.to_dict('records')
+    # Wrap names for clean display
+    top_20_df['name_wrapped'] = top_20_df['name'].apply(lambda x: '<br>'.join([x[i:i+30] for i in range(0, len(x), 30)]) if len(x)>30 else x)
+
+    fig_top20 = px.bar(top_20_df, x='engagement_score', y='name_wrapped', orientation='h', 
+                       title="Top 20 Engagement Anomalies", color='engagement_score', color_continuous_scale="blues")
+    
+    fig_top20.update_layout(xaxis_title="PCA Engagement Score", yaxis_title="", margin=dict(l=250, r=20, t=60, b=40))
+    
+    write_asset("top_20_games.json", fig_top20)
+    
+    return {'top_20_games': top_list.to_dict('records')}
+
+def export_game_index(df):
+    print("Exporting the game index for /api/games...")
+    arrays = build_game_index(df)
+    save_game_index(arrays, GAME_INDEX_PATH)
+    print(f"Indexed {len(arrays['score']):,} games across {len(arrays['genres'])} genres and "
+          f"{len(arrays['years'])} release years (snapshot {arrays['version']}).")
+    return {}
+
+def export_score_distribution(df):
+    print("Exporting engagement score distributions for prediction percentiles...")
+    distribution = ScoreDistribution(build_score_distribution(
+        df['engagement_score'], extract_primary_genre(df['genres']), pricing_tiers(df['price'])))
+    distribution.save(SCORE_DISTRIBUTION_PATH)
+    print(f"Saved score quantiles of {len(df):,} games, {len(distribution.groups('genre'))} primary genres "
+          f"and {len(distribution.groups('pricing_tier'))} pricing tiers to {SCORE_DISTRIBUTION_PATH}.")
+    return {}
 
 def create_jupyter_notebook():
     print("Generating Jupyter Notebook...")
@@ -629,41 +1177,393 @@ def create_jupyter_notebook():
         nbf.v4.new_code_cell(code_load)
     ]
     
-    with open('frontend/public/EngageX_Analysis.ipynb', 'w') as f:
+    with open(NOTEBOOK_PATH, 'w') as f:
         nbf.write(nb, f)
+    return {}
 
-def main():
-    dataset_path = 'dataset/games_march2025_cleaned.csv'
-    df = clean_data(dataset_path)
-    if df is not None:
-        calculate_the_verdict(df)
-        generate_improved_plots(df)
-        generate_correlation_and_scatter(df)
-        generate_cohort_divergence(df)
-        generate_survival_curves(df)
-        find_aha_moment_stats(df)
-        robust_ml_prediction(df)
-        generate_top_20(df)
-        create_jupyter_notebook()
-        
-        # Generate Top 20 Plotly Horizontal Bar Chart
-        # Plotly puts the first item at the bottom of the y-axis, so we sort ascending for the top 20
-        top_20_df = df.nlargest(20, 'engagement_score').sort_values(by='engagement_score', ascending=True).copy()
-        
-        # Wrap names for clean display
-        top_20_df['name_wrapped'] = top_20_df['name'].apply(lambda x: '<br>'.join([x[i:i+30] for i in range(0, len(x), 30)]) if len(x)>30 else x)
+@dataclass(frozen=True)
+class Stage:
+    """One unit of the analysis DAG.
 
-        fig_top20 = px.bar(top_20_df, x='engagement_score', y='name_wrapped', orientation='h', 
-                           title="Top 20 Engagement Anomalies", color='engagement_score', color_continuous_scale="blues")
-        
-        fig_top20.update_layout(xaxis_title="PCA Engagement Score", yaxis_title="", margin=dict(l=250, r=20, t=60, b=40))
-        
-        with open("frontend/public/assets/top_20_games.json", "w") as f:
-            f.write(fig_top20.to_json())
+    `func` receives only the declared `inputs` columns of the cleaned frame and
+    returns a dict fragment holding exactly the `outputs` insight keys. Stages
+    never mutate the frame or shared state, so independent ones can run
+    concurrently; `after` lists stages that must finish first. `assets` (under
+    ASSETS_DIR) and `artifacts` (other paths) are the files the stage writes;
+    `params` are keyword arguments passed to `func`, and part of its fingerprint.
+    `shared` keys of the fragment are not insights: they are handed, as keyword
+    arguments, to the stages that list this one in their `after`.
+    """
+    name: str
+    func: Callable
+    inputs: tuple = ()
+    outputs: tuple = ()
+    assets: tuple = ()
+    artifacts: tuple = ()
+    after: tuple = ()
+    params: dict = field(default_factory=dict)
+    shared: tuple = ()
+
+STAGES = [
+    Stage('group_stats', build_group_cube,
+          inputs=('release_year', 'owners_midpoint', 'genres', 'engagement_score', 'pct_pos_total', 'price',
+                  'dlc_count', 'peak_ccu'),
+          shared=('group_cube',)),
+    Stage('the_verdict', calculate_the_verdict,
+          inputs=('release_year', 'engagement_score'),
+          outputs=('the_verdict',),
+          params={'bootstrap_resamples': BOOTSTRAP_RESAMPLES, 'bootstrap_seconds': BOOTSTRAP_SECONDS}),
+    Stage('improved_plots', generate_improved_plots,
+          inputs=('average_playtime_forever',),
+          assets=('time_series.json', 'playtime_distribution.json', 'owner_impact.json'),
+          after=('group_stats',)),
+    Stage('correlation_and_scatter', generate_correlation_and_scatter,
+          inputs=('price', 'dlc_count', 'metacritic_score', 'user_score', 'engagement_score',
+                  'average_playtime_forever', 'pct_pos_total'),
+          outputs=('dlc_insight', 'top_genres', 'ethical_insight'),
+          assets=('correlation_heatmap.json', 'pricing_regression.json', 'dlc_impact.json',
+                  'genre_performance.json', 'fatigue_analysis.json'),
+          after=('group_stats',),
+          params={'point_budget': SCATTER_POINT_BUDGET}),
+    Stage('cohort_divergence', generate_cohort_divergence,
+          outputs=('cohort_slopes',),
+          assets=('cohort_divergence.json',),
+          after=('group_stats',)),
+    Stage('survival_curves', generate_survival_curves,
+          outputs=('survival_stats',),
+          assets=('survival_curves.json',),
+          after=('group_stats',)),
+    Stage('aha_moment', find_aha_moment_stats,
+          inputs=('price', 'engagement_score'),
+          outputs=('aha_moment', 'aha_stats'),
+          params={'bootstrap_resamples': BOOTSTRAP_RESAMPLES, 'bootstrap_seconds': BOOTSTRAP_SECONDS}),
+    Stage('ml_prediction', robust_ml_prediction,
+          inputs=('price', 'dlc_count', 'release_year', 'metacritic_score', 'engagement_score'),
+          outputs=('ml_insights',),
+          assets=('feature_importance.json',),
+          artifacts=('rf_model.joblib', 'rf_scaler.joblib', 'rf_forest.joblib',
+                     os.path.join(REGISTRY_DIR, MANIFEST_NAME)),
+          params={'backend': MODEL_BACKEND, 'train_rows': TRAIN_ROWS, 'train_seconds': TRAIN_SECONDS,
+                  'cv_workers': CV_WORKERS, 'seed': MODEL_SEED}),
+    Stage('top_20', generate_top_20,
+          inputs=('name', 'release_year', 'engagement_score', 'average_playtime_forever', 'num_reviews_total'),
+          outputs=('top_20_games',),
+          assets=('top_20_games.json',)),
+    Stage('game_index', export_game_index,
+          inputs=('name', 'release_year', 'genres', 'price', 'engagement_score', 'average_playtime_forever',
+                  'num_reviews_total', 'peak_ccu'),
+          artifacts=(GAME_INDEX_PATH,)),
+    Stage('score_distribution', export_score_distribution,
+          inputs=('engagement_score', 'genres', 'price'),
+          artifacts=(SCORE_DISTRIBUTION_PATH,)),
+    Stage('notebook', create_jupyter_notebook, artifacts=(NOTEBOOK_PATH,)),
+]
+
+# Incremental rebuilds: each stage's fingerprint and insight fragment from the last run
+STAGE_STATE_FILE = "stage_state.json"
+
+def _stage_inputs(stage, df):
+    return df[[c for c in stage.inputs if c in df.columns]]
+
+def _source(func):
+    try:
+        return inspect.getsource(func)
+    except (OSError, TypeError):
+        code = func.__code__
+        return code.co_code.hex() + repr(code.co_consts)
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def _is_project_code(obj):
+    """Whether a function, class or module is defined in a source file of this project."""
+    try:
+        path = inspect.getsourcefile(obj)
+    except TypeError:  # builtins and C extensions
+        return False
+    return path is not None and os.path.dirname(os.path.abspath(path)) == PROJECT_DIR
+
+def _global_names(code):
+    names = list(code.co_names)
+    for const in code.co_consts:  # comprehensions, lambdas and nested functions
+        if inspect.iscode(const):
+            names += _global_names(const)
+    return names
+
+def _code_fingerprint(func):
+    """Source of `func` and of every project function it reaches, with the constants they read.
+
+    Global names are followed transitively into this module and its sibling
+    modules (a `module.attr` reference counts as `attr`), so editing a helper
+    such as compress_asset or pricing_tiers changes the fingerprint of every
+    stage that calls it. Library code is not followed.
+    """
+    parts, seen, pending = [], set(), [func]
+    while pending:
+        obj = inspect.unwrap(pending.pop())
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        parts.append(_source(obj))
+        if inspect.isclass(obj):
+            pending += [member for member in vars(obj).values()
+                        if inspect.isfunction(member) and _is_project_code(member)]
+            continue
+        names = _global_names(obj.__code__)
+        for name in names:
+            value = obj.__globals__.get(name)
+            if inspect.ismodule(value):
+                if _is_project_code(value):
+                    pending += [getattr(value, attr) for attr in names
+                                if (inspect.isfunction(getattr(value, attr, None))
+                                    or inspect.isclass(getattr(value, attr, None)))
+                                and _is_project_code(getattr(value, attr))]
+            elif inspect.isfunction(value) or inspect.isclass(value):
+                if _is_project_code(value):
+                    pending.append(value)
+            elif isinstance(value, (bool, int, float, str, tuple, list, frozenset)):
+                parts.append(f"{name} = {value!r}")
+    return "\n".join(parts)
+
+def stage_fingerprint(stage, df, upstream=()):
+    """Hash of everything a stage's output depends on.
+
+    Covers the values, names and dtypes of its input columns, its `params`,
+    the source of its function and of the project helpers it calls (see
+    _code_fingerprint), PIPELINE_VERSION, the asset array encoding and figure
+    builder, and the fingerprints of the stages it runs after. Library upgrades
+    are not covered; pass --force after one.
+    """
+    digest = hashlib.sha256()
+    asset_settings = [ASSET_ARRAYS, FIGURE_BUILDER] if stage.assets else None
+    digest.update(json.dumps([stage.name, PIPELINE_VERSION, asset_settings, sorted(stage.params.items()),
+                              list(upstream)], default=str).encode("utf-8"))
+    digest.update(_code_fingerprint(stage.func).encode("utf-8"))
+    inputs = _stage_inputs(stage, df)
+    digest.update(json.dumps([[c, str(t)] for c, t in inputs.dtypes.items()]).encode("utf-8"))
+    digest.update(pd.util.hash_pandas_object(inputs, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+def _stage_outputs_exist(stage):
+    paths = [os.path.join(ASSETS_DIR, name) for name in stage.assets] + list(stage.artifacts)
+    return all(os.path.exists(path) for path in paths)
+
+def load_stage_state():
+    try:
+        with open(os.path.join(CACHE_DIR, STAGE_STATE_FILE)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_stage_state(state):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    _write_bytes(os.path.join(CACHE_DIR, STAGE_STATE_FILE), json.dumps(state, indent=1).encode("utf-8"))
+
+def _run_stage(stage, df, shared):
+    start = time.perf_counter()
+    kwargs = {**stage.params, **shared}
+    # Peak RSS of the process running the stage while it ran (process-wide under the thread pool)
+    with metrics.PeakRSSSampler() as rss:
+        # Hand each stage only the columns it declares, so the declarations stay honest
+        fragment = stage.func(_stage_inputs(stage, df), **kwargs) if stage.inputs else stage.func(**kwargs)
+    undeclared = set(fragment) - set(stage.outputs) - set(stage.shared)
+    if undeclared:
+        raise ValueError(f"Stage {stage.name} produced undeclared insights: {sorted(undeclared)}")
+    seconds = time.perf_counter() - start
+    return fragment, seconds, {'seconds': seconds, 'peak_rss_bytes': rss.peak,
+                               'rows': len(df) if stage.inputs else None}
+
+def _init_worker(asset_arrays, figure_builder):
+    global ASSET_ARRAYS, FIGURE_BUILDER
+    ASSET_ARRAYS, FIGURE_BUILDER = asset_arrays, figure_builder
+
+def _dependency_order(stages):
+    order, done, pending = [], set(), list(stages)
+    while pending:
+        ready = [s for s in pending if all(dep in done for dep in s.after)]
+        if not ready:
+            raise ValueError(f"Unsatisfiable stage dependencies: {[s.name for s in pending]}")
+        for stage in ready:
+            order.append(stage)
+            done.add(stage.name)
+            pending.remove(stage)
+    return order
+
+def run_stages(df, stages, max_workers=None, executor='thread', state=None, force=(), only=None, stats=None):
+    """Run stages on a thread or process pool as soon as their dependencies finish.
+
+    Returns (insights, timings): fragments merged in declaration order, so the
+    result does not depend on completion order, and per-stage wall seconds
+    (None for stages that were skipped). A `stats` dict is filled with each
+    stage that ran's seconds, peak RSS and input rows.
+
+    With a `state` dict (see load_stage_state) the run is incremental: a stage
+    whose fingerprint matches the recorded one and whose files still exist is
+    skipped and its recorded fragment reused. Stages named in `force` always
+    run. With `only`, just those stages run and every other stage reuses its
+    last recorded fragment, stale or not. `state` is updated in place.
+    """
+    order = _dependency_order(stages)
+    fingerprints, reused = {}, set()
+    if state is not None:
+        for stage in order:
+            fingerprints[stage.name] = stage_fingerprint(stage, df, [fingerprints[dep] for dep in stage.after])
+            record = state.get(stage.name)
+            if record is not None and stage.name not in force and _stage_outputs_exist(stage) and (
+                    record['fingerprint'] == fingerprints[stage.name] or (only and stage.name not in only)):
+                reused.add(stage.name)
+        # Shared values are not persisted, so a stage that provides them reruns whenever a consumer does
+        for stage in reversed(order):
+            if stage.shared and any(stage.name in s.after and s.name not in reused for s in stages):
+                reused.discard(stage.name)
+
+    fragments = {name: state[name]['fragment'] for name in reused}
+    timings = dict.fromkeys(reused)
+    shared = {}
+    pending = [stage for stage in order if stage.name not in reused]
+    running = {}
+    workers = max_workers or min(max(len(pending), 1), os.cpu_count() or 1)
+    if executor == 'process':
+        # Spawned workers re-import this module, so hand them the run-wide asset settings
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                   initargs=(ASSET_ARRAYS, FIGURE_BUILDER))
+    else:
+        pool = ThreadPoolExecutor(max_workers=workers)
+    with pool:
+        while pending or running:
+            for stage in [s for s in pending if all(dep in fragments for dep in s.after)]:
+                pending.remove(stage)
+                provided = {key: value for dep in stage.after for key, value in shared.get(dep, {}).items()}
+                running[pool.submit(_run_stage, stage, df, provided)] = stage
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                stage = running.pop(future)
+                fragment, timings[stage.name], stage_stats = future.result()
+                if stats is not None:
+                    stats[stage.name] = stage_stats
+                shared[stage.name] = {key: fragment.pop(key) for key in stage.shared}
+                fragments[stage.name] = fragment
+                if state is not None:
+                    # Round-trip through JSON so reused fragments match freshly computed ones exactly
+                    state[stage.name] = {'fingerprint': fingerprints[stage.name],
+                                         'fragment': json.loads(json.dumps(fragment))}
+
+    insights = {}
+    for stage in stages:
+        insights.update(fragments[stage.name])
+    return insights, timings
+
+def print_stage_timings(timings, wall_seconds):
+    ran = {name: seconds for name, seconds in timings.items() if seconds is not None}
+    print("Stage timings:")
+    for name, seconds in sorted(ran.items(), key=lambda item: -item[1]):
+        print(f"  {name:<26}{seconds:8.2f}s")
+    for name in [name for name in timings if name not in ran]:
+        print(f"  {name:<26}{'skipped':>9}  (unchanged)")
+    print(f"  {'total (wall clock)':<26}{wall_seconds:8.2f}s  (sum of stages {sum(ran.values()):.2f}s)")
+
+def write_run_report(path, started_at, wall_seconds, dataset, load_stats, stages, timings, stage_stats):
+    """Write a JSON summary of one pipeline run: load phase, every stage, process peak RSS."""
+    report = {
+        'started_at': started_at,
+        'wall_seconds': round(wall_seconds, 3),
+        'dataset': dataset,
+        'peak_rss_bytes': metrics.peak_rss_bytes(),
+        'load': load_stats,
+        'stages': [],
+    }
+    for stage in stages:
+        entry = {'name': stage.name, 'status': 'skipped' if timings.get(stage.name) is None else 'ran'}
+        entry.update(stage_stats.get(stage.name, {}))
+        if 'seconds' in entry:
+            entry['seconds'] = round(entry['seconds'], 3)
+        report['stages'].append(entry)
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+    return report
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="EngageX analytical pipeline")
+    parser.add_argument('--dataset', default='dataset/games_march2025_cleaned.csv', help="Steam CSV dump to analyze")
+    parser.add_argument('--chunksize', type=int, default=None,
+                        help="Stream the CSV in chunks of this many rows to bound peak memory")
+    parser.add_argument('--no-cache', dest='use_cache', action='store_false',
+                        help="Re-parse the CSV even if a cached cleaned frame exists")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Concurrent analysis stages (default: one per stage up to the CPU count; 1 = sequential)")
+    parser.add_argument('--executor', choices=['thread', 'process'], default='thread',
+                        help="Pool used to run independent stages")
+    parser.add_argument('--point-budget', type=int, default=SCATTER_POINT_BUDGET,
+                        help="Most markers embedded per scatter chart; larger inputs are density-sampled")
+    parser.add_argument('--asset-arrays', choices=['compact', 'f8'], default=ASSET_ARRAYS,
+                        help="Typed-array encoding of chart data: narrowed int/float32 (compact) or plain float64")
+    parser.add_argument('--figure-builder', choices=['lean', 'px'], default=FIGURE_BUILDER,
+                        help="Build scatter charts from NumPy arrays (lean) or through plotly.express (px)")
+    parser.add_argument('--bootstrap', type=int, default=BOOTSTRAP_RESAMPLES, metavar='N',
+                        help="Bootstrap the verdict and aha CIs with N resamples (default: normal approximation)")
+    parser.add_argument('--bootstrap-seconds', type=float, default=BOOTSTRAP_SECONDS,
+                        help="Time budget per stage for bootstrap resampling")
+    parser.add_argument('--model', dest='backend', choices=['rf', 'hgb'], default=MODEL_BACKEND,
+                        help="Engagement model: random forest (rf) or histogram gradient boosting (hgb)")
+    parser.add_argument('--train-rows', type=int, default=TRAIN_ROWS, metavar='N',
+                        help="Train the engagement model on a seeded sample of at most N rows (default: all)")
+    parser.add_argument('--train-seconds', type=float, default=TRAIN_SECONDS, metavar='S',
+                        help="Wall-clock budget for cross-validating and fitting the engagement model; "
+                             "subsamples the training rows to fit it")
+    parser.add_argument('--cv-workers', type=int, default=CV_WORKERS,
+                        help="Processes cross-validating the engagement model's folds in parallel")
+    parser.add_argument('--seed', type=int, default=MODEL_SEED,
+                        help="Seed for the train/test split, the training sample and the model")
+    parser.add_argument('--refit-engagement', action='store_true',
+                        help=f"Refit the engagement-score transform on this dataset and overwrite "
+                             f"{ENGAGEMENT_TRANSFORM_PATH} (default: apply the saved one)")
+    parser.add_argument('--force', action='store_true',
+                        help="Re-run every stage even if its inputs and code are unchanged")
+    parser.add_argument('--only', action='append', metavar='STAGE', choices=[stage.name for stage in STAGES],
+                        help="Re-run just this stage (repeatable); the others keep their last outputs")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    global ASSET_ARRAYS, FIGURE_BUILDER
+    args = parse_args(argv)
+    ASSET_ARRAYS, FIGURE_BUILDER = args.asset_arrays, args.figure_builder
+    started_at = datetime.now(timezone.utc).isoformat(timespec='seconds')
+    run_start = time.perf_counter()
+    # Scores come from the saved engagement transform; fitting one is a deliberate step
+    transform = None if args.refit_engagement else load_engagement_transform(ENGAGEMENT_TRANSFORM_PATH)
+    with metrics.PeakRSSSampler() as load_rss:
+        df = load_clean_data(args.dataset, chunksize=args.chunksize, use_cache=args.use_cache, transform=transform)
+    if df is not None:
+        if transform is None:
+            transform = EngagementTransform.from_dict(df.attrs['engagement_transform'])
+            transform.save(ENGAGEMENT_TRANSFORM_PATH)
+            print(f"Fitted engagement transform {transform.version} on {transform.n_rows} records "
+                  f"and saved it to {ENGAGEMENT_TRANSFORM_PATH}.")
+        else:
+            print(f"Scored engagement with the saved transform {transform.version} "
+                  f"(fitted {transform.fitted_at} on {transform.n_rows} records; --refit-engagement to refit).")
+        load_stats = {'seconds': round(time.perf_counter() - run_start, 3), 'rows': len(df),
+                      'peak_rss_bytes': load_rss.peak}
+        start = time.perf_counter()
+        overrides = {'point_budget': args.point_budget, 'bootstrap_resamples': args.bootstrap,
+                     'bootstrap_seconds': args.bootstrap_seconds, 'backend': args.backend,
+                     'train_rows': args.train_rows, 'train_seconds': args.train_seconds,
+                     'cv_workers': args.cv_workers, 'seed': args.seed}
+        stages = [replace(stage, params={**stage.params, **{key: value for key, value in overrides.items()
+                                                             if key in stage.params}}) for stage in STAGES]
+        state = load_stage_state()
+        force = [stage.name for stage in stages] if args.force else args.only or ()
+        stage_stats = {}
+        insights, timings = run_stages(df, stages, max_workers=args.workers, executor=args.executor,
+                                       state=state, force=force, only=args.only, stats=stage_stats)
+        save_stage_state(state)
+        insights_data.update(insights)
+        update_asset_manifest([name for stage in STAGES for name in stage.assets])
 
         # Save insights so frontend can access them locally (will put in public dir)
-        with open('frontend/public/insights.json', 'w') as f:
-            json.dump(insights_data, f, indent=4)
+        _write_bytes(INSIGHTS_PATH, json.dumps(insights_data, indent=4).encode("utf-8"))
+        print_stage_timings(timings, time.perf_counter() - start)
+        write_run_report(RUN_REPORT_PATH, started_at, time.perf_counter() - run_start, args.dataset,
+                         load_stats, stages, timings, stage_stats)
         print("Analysis complete. Charts, insights.json, and Notebook generated in frontend/public.")
 
 if __name__ == "__main__":
@@ -0,0 +1,140 @@
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
+
+import numpy as np
+
+# The engagement score as a persisted, reusable transform.
+#
+#     raw features  ->  log1p(playtime), log1p(peak CCU), log1p(reviews), positivity / 100
+#                   ->  standardize (scaler mean/scale)
+#                   ->  project on the first principal component (sign fixed so playtime loads positively)
+#                   ->  min-max to 0-100 using the fit data's range, clipped
+#
+# `clean_data` fits it once and saves it as ENGAGEMENT_TRANSFORM_PATH; later
+# runs and the API's /api/score apply the saved parameters, so scoring a new
+# title is a handful of arithmetic operations per row instead of a pipeline run.
+# Refitting is explicit (`data_analysis.py --refit-engagement`). Fit-time scores
+# are computed with the same projection used afterwards, so a frame scored
+# when fitting and one scored from the saved file agree bit for bit.
+
+ENGAGEMENT_TRANSFORM_PATH = 'engagement_transform.json'
+
+# Feature columns, in loading order, and the raw inputs they are derived from
+ENGAGEMENT_FEATURES = ['log_playtime', 'log_ccu', 'log_reviews', 'norm_positivity']
+RAW_INPUTS = ['average_playtime_forever', 'peak_ccu', 'num_reviews_total', 'pct_pos_total']
+
+_PARAMS = ('scaler_mean', 'scaler_scale', 'pca_mean', 'pca_components')
+
+def engagement_features(playtime, ccu, reviews, positivity):
+    """The four PCA input features from raw values (scalars or arrays), one row per game.
+
+    Mirrors the columns `clean_data` derives: negatives count as 0, positivity
+    is a 0-100 percentage, and missing values become 0 as they do in the fit.
+    """
+    features = np.column_stack([
+        np.log1p(np.maximum(np.asarray(playtime, dtype=np.float64), 0)),
+        np.log1p(np.maximum(np.asarray(ccu, dtype=np.float64), 0)),
+        np.log1p(np.maximum(np.asarray(reviews, dtype=np.float64), 0)),
+        np.asarray(positivity, dtype=np.float64) / 100.0,
+    ])
+    return np.nan_to_num(features, nan=0.0)
+
+class EngagementTransform:
+    """Fitted scaler + first principal component + 0-100 range of the engagement score."""
+
+    def __init__(self, scaler_mean, scaler_scale, pca_mean, pca_components, explained_variance_ratio,
+                 min_score, max_score, n_rows=None, fitted_at=None):
+        self.scaler_mean = np.asarray(scaler_mean, dtype=np.float64)
+        self.scaler_scale = np.asarray(scaler_scale, dtype=np.float64)
+        self.pca_mean = np.asarray(pca_mean, dtype=np.float64)
+        self.pca_components = np.asarray(pca_components, dtype=np.float64)
+        self.explained_variance_ratio = float(explained_variance_ratio)
+        self.min_score = float(min_score)
+        self.max_score = float(max_score)
+        self.n_rows = n_rows
+        self.fitted_at = fitted_at
+
+    @classmethod
+    def fit(cls, features):
+        """Fit on an (n_rows, 4) matrix of ENGAGEMENT_FEATURES (NaN-free)."""
+        from sklearn.decomposition import PCA
+        from sklearn.preprocessing import StandardScaler
+
+        features = np.asarray(features, dtype=np.float64)
+        scaler = StandardScaler()
+        pca = PCA(n_components=1).fit(scaler.fit_transform(features))
+        components = pca.components_[0]
+        # Flip the component if the primary loading (playtime) is negative, ensuring higher = better
+        if components[0] < 0:
+            components = -components
+        transform = cls(scaler.mean_, scaler.scale_, pca.mean_, components, pca.explained_variance_ratio_[0],
+                        0.0, 1.0, n_rows=len(features),
+                        fitted_at=datetime.now(timezone.utc).isoformat(timespec='seconds'))
+        raw = transform.raw_scores(features)
+        transform.min_score, transform.max_score = float(raw.min()), float(raw.max())
+        return transform
+
+    def raw_scores(self, features):
+        """Position of each feature row along the principal component (unscaled score)."""
+        scaled = (np.asarray(features, dtype=np.float64) - self.scaler_mean) / self.scaler_scale
+        return (scaled - self.pca_mean) @ self.pca_components
+
+    def score_features(self, features):
+        """0-100 engagement scores for an (n_rows, 4) feature matrix."""
+        raw = self.raw_scores(features)
+        span = self.max_score - self.min_score
+        return np.clip((raw - self.min_score) / span * 100, 0, 100)
+
+    def score(self, playtime, ccu, reviews, positivity):
+        """0-100 engagement scores from raw values; scalars give a one-element array."""
+        return self.score_features(engagement_features(playtime, ccu, reviews, positivity))
+
+    @property
+    def loadings(self):
+        return dict(zip(ENGAGEMENT_FEATURES, np.round(self.pca_components, 3)))
+
+    @property
+    def version(self):
+        """Short hash of the fitted parameters; changes exactly when scores would."""
+        params = json.dumps([self.to_dict()[key] for key in _PARAMS + ('min_score', 'max_score')])
+        return hashlib.sha256(params.encode()).hexdigest()[:12]
+
+    def to_dict(self):
+        return {
+            'features': ENGAGEMENT_FEATURES,
+            'scaler_mean': self.scaler_mean.tolist(),
+            'scaler_scale': self.scaler_scale.tolist(),
+            'pca_mean': self.pca_mean.tolist(),
+            'pca_components': self.pca_components.tolist(),
+            'explained_variance_ratio': self.explained_variance_ratio,
+            'min_score': self.min_score,
+            'max_score': self.max_score,
+            'n_rows': self.n_rows,
+            'fitted_at': self.fitted_at,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        if data.get('features', ENGAGEMENT_FEATURES) != ENGAGEMENT_FEATURES:
+            raise ValueError(f"Engagement transform was fitted on {data['features']}, expected {ENGAGEMENT_FEATURES}")
+        return cls(*(data[key] for key in _PARAMS), data['explained_variance_ratio'], data['min_score'],
+                   data['max_score'], n_rows=data.get('n_rows'), fitted_at=data.get('fitted_at'))
+
+    def save(self, path=ENGAGEMENT_TRANSFORM_PATH):
+        with open(path + '.tmp', 'w') as f:
+            json.dump({**self.to_dict(), 'version': self.version}, f, indent=2)
+        os.replace(path + '.tmp', path)
+
+    @classmethod
+    def load(cls, path=ENGAGEMENT_TRANSFORM_PATH):
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+def load_engagement_transform(path=ENGAGEMENT_TRANSFORM_PATH):
+    """The saved transform, or None if none has been fitted yet."""
+    try:
+        return EngagementTransform.load(path)
+    except FileNotFoundError:
+        return None
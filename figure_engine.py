@@ -0,0 +1,121 @@
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.io as pio
+from _plotly_utils.utils import to_typed_array_spec
+
+# Lean export path for the scatter charts.
+#
+# px.scatter over a million rows spends most of its time pushing every array
+# through plotly's property validation and copies, and trendline="ols" imports
+# statsmodels (0.7-2.3 s) to fit two numbers per group. Here plotly.express
+# still builds the figure, but from one stand-in row per trace: that yields
+# exactly the layout, trace order, colors, hovertemplates and template plotly
+# would produce, and is cheap. The row-level arrays stay NumPy arrays on the
+# side and go into the figure dict only at export, encoded as typed-array specs
+# the way plotly itself encodes them. OLS trendlines are fitted with NumPy, and
+# their traces are derived from the marker traces the way px derives them. The
+# exported JSON matches what px would have written for the same call, up to the
+# last bits of the fitted line.
+
+# px switches to WebGL traces above this many rows (render_mode='auto')
+WEBGL_ROWS = 1000
+
+class LeanFigure:
+    """A px figure of stand-in rows plus its row-level arrays, joined on export.
+
+    Anything but `to_dict` / `to_json` (update_layout, add_annotation,
+    add_vline, layout, ...) is delegated to the stand-in figure, so callers
+    style it like the go.Figure px returns.
+    """
+
+    def __init__(self, figure, arrays):
+        self.figure = figure
+        self.arrays = arrays  # {(trace index, attribute): ndarray}
+
+    def __getattr__(self, name):
+        return getattr(self.figure, name)
+
+    def to_dict(self):
+        fig = self.figure.to_dict()
+        for (trace, attr), values in self.arrays.items():
+            fig['data'][trace][attr] = to_typed_array_spec(values)
+        return fig
+
+    def to_json(self):
+        return pio.to_json(self.to_dict(), validate=False)
+
+def ols(x, y):
+    """(intercept, slope, r2) of y ~ x, as statsmodels' OLS fits it (pinv / minimum-norm least squares)."""
+    design = np.column_stack([np.ones(len(x)), x])
+    params = np.linalg.lstsq(design, y, rcond=None)[0]
+    residual = y - design @ params
+    with np.errstate(divide='ignore', invalid='ignore'):
+        r2 = 1 - residual @ residual / np.sum((y - y.mean()) ** 2)
+    return params[0], params[1], r2
+
+def _stand_ins(data, color):
+    """(codes, first rows): the trace of each row (-1 for none) and one row per trace, in px's trace order."""
+    if color is None:
+        return np.zeros(len(data), dtype=np.intp), data.iloc[:1]
+    codes, _ = pd.factorize(data[color], sort=False)  # first appearance, missing keys dropped, like px
+    firsts = np.unique(codes[codes >= 0], return_index=True)[1]
+    return codes, data.iloc[np.flatnonzero(codes >= 0)[firsts]]
+
+def scatter(data, x, y, color=None, trendline=None, trendline_color_override=None, keep=None, **kwargs):
+    """`px.scatter(data, x=x, y=y, color=color, ...)` as a LeanFigure.
+
+    Only `trendline='ols'` (with an intercept) is supported. With a boolean
+    `keep` mask the marker traces hold just the kept rows, and the (straight)
+    trendlines, still fit on every row, just their end points.
+    """
+    if trendline not in (None, 'ols'):
+        raise ValueError(f"Unsupported trendline {trendline!r}; only 'ols' is")
+    if kwargs.get('render_mode', 'auto') == 'auto':
+        kwargs['render_mode'] = 'webgl' if len(data) > WEBGL_ROWS else 'svg'
+    codes, stand_ins = _stand_ins(data, color)
+    fig = px.scatter(stand_ins, x=x, y=y, color=color, **kwargs)
+    xv, yv = data[x].to_numpy(), data[y].to_numpy()
+
+    arrays, order = {}, []
+    for i, trace in enumerate(fig.data):
+        rows = codes == i
+        if keep is not None:
+            rows &= keep
+        arrays[(i, 'x')], arrays[(i, 'y')] = xv[rows], yv[rows]
+        order.append(i)
+        if trendline is None:
+            continue
+        fit = _ols_trendline(xv[codes == i], yv[codes == i], x, y, ends_only=keep is not None)
+        labels = trace.hovertemplate[:-len('<extra></extra>')].split('<br>')
+        if fit is None:
+            # px leaves a group with fewer than two points an empty line, hovering just its group label
+            hovertemplate = '<br>'.join(l for l in labels if '%{x}' not in l and '%{y}' not in l) + '<extra></extra>'
+        else:
+            hovertemplate = fit[2] + '<br>'.join(labels) + ' <b>(trend)</b><extra></extra>'
+        fig.add_trace(type(trace)(
+            hovertemplate=hovertemplate, legendgroup=trace.legendgroup,
+            marker=dict(color=trace.marker.color, symbol=trace.marker.symbol),
+            line=dict(color=trendline_color_override), mode='lines', name=trace.name, showlegend=False,
+            # Stand-in x and y: set here, they take their place in px's key order
+            x=None if fit is None else fit[0][:1], y=None if fit is None else fit[1][:1],
+            xaxis=trace.xaxis, yaxis=trace.yaxis))
+        if fit is not None:
+            arrays[(len(fig.data) - 1, 'x')], arrays[(len(fig.data) - 1, 'y')] = fit[:2]
+        order.append(len(fig.data) - 1)
+    # Each trendline goes right after its markers, as px orders them
+    fig.data = [fig.data[i] for i in order]
+    return LeanFigure(fig, {(order.index(i), attr): values for (i, attr), values in arrays.items()})
+
+def _ols_trendline(xv, yv, x_label, y_label, ends_only):
+    """(x, fitted y, hover header) of a group's trendline, sorted by x; None below two points."""
+    finite = ~(pd.isna(xv) | pd.isna(yv))
+    xs, ys = xv[finite], yv[finite].astype(np.float64)
+    if len(xs) < 2:
+        return None
+    intercept, slope, r2 = ols(xs.astype(np.float64), ys)
+    header = (f"<b>OLS trendline</b><br>{y_label} = {slope:g} * {x_label} + {intercept:g}<br>"
+              f"R<sup>2</sup>={r2:f}<br><br>")
+    # px sorts the line's points by x; a thinned line keeps just its end points
+    xs = np.array([xs.min(), xs.max()]) if ends_only and len(xs) > 2 else np.sort(xs)
+    return xs, intercept + slope * xs.astype(np.float64), header
@@ -0,0 +1,185 @@
+import os
+
+import numpy as np
+
+# Flat, array-backed inference for the engagement RandomForest (or boosted trees).
+#
+# sklearn's RandomForestRegressor.predict pays a large fixed cost per call
+# (input validation, joblib dispatch across n_jobs, a Python walk over every
+# tree object). For the API we export the whole forest as contiguous node
+# arrays and evaluate every tree for every row with a handful of vectorized
+# NumPy gathers instead.
+#
+# Layout: all trees are concatenated into one node table. Leaves point back to
+# themselves (left == right == own index) so the evaluator can step a fixed
+# `max_depth` times without branching on leaf status. The StandardScaler is
+# folded into the thresholds, so raw (unscaled) features are compared directly:
+#     float32((x - mean) / scale) <= t   <=>   x <= raw_t
+# where raw_t is the largest float64 for which the left-hand side still holds
+# (sklearn casts inputs to float32 before comparing, so t * scale + mean alone
+# would misroute values that sit right on a split).
+
+NODE_ARRAYS = ('feature', 'threshold', 'left', 'right', 'value', 'roots')
+
+def _raw_thresholds(threshold, mean, scale, dtype=np.float32):
+    """Bisect, per node, for the largest raw value that sklearn would still send left.
+
+    `dtype` is the precision the estimator compares features in: float32 for
+    decision trees, float64 for histogram gradient boosting.
+    """
+    def goes_left(x):
+        return ((x - mean) / scale).astype(dtype) <= threshold
+
+    guess = threshold * scale + mean
+    step = scale * (np.abs(threshold) + 1.0) * np.finfo(np.float32).eps
+    lo, hi = guess - step, guess + step
+    # Widen the bracket until lo goes left and hi goes right for every node
+    for _ in range(64):
+        bad_lo, bad_hi = ~goes_left(lo), goes_left(hi)
+        if not (bad_lo.any() or bad_hi.any()):
+            break
+        step = step * 2
+        lo = np.where(bad_lo, lo - step, lo)
+        hi = np.where(bad_hi, hi + step, hi)
+    for _ in range(80):
+        mid = lo + (hi - lo) / 2
+        left = goes_left(mid)
+        lo, hi = np.where(left, mid, lo), np.where(left, hi, mid)
+    return lo
+
+def compile_forest(model, scaler=None):
+    """Flatten a fitted RandomForestRegressor (and optional StandardScaler) into node arrays."""
+    features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+    offset = 0
+    max_depth = 0
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        n_nodes = tree.node_count
+        is_leaf = tree.children_left < 0
+        own_index = np.arange(n_nodes) + offset
+
+        feature = np.where(is_leaf, 0, tree.feature).astype(np.int32)
+        if scaler is not None:
+            mean, scale = scaler.mean_[feature], scaler.scale_[feature]
+        else:
+            mean, scale = np.zeros(n_nodes), np.ones(n_nodes)
+        threshold = np.where(is_leaf, 0.0, _raw_thresholds(tree.threshold, mean, scale))
+
+        features.append(feature)
+        thresholds.append(threshold)
+        lefts.append(np.where(is_leaf, own_index, tree.children_left + offset).astype(np.int32))
+        rights.append(np.where(is_leaf, own_index, tree.children_right + offset).astype(np.int32))
+        values.append(tree.value[:, 0, 0])
+        roots.append(offset)
+        offset += n_nodes
+        max_depth = max(max_depth, tree.max_depth)
+
+    return {
+        'feature': np.concatenate(features),
+        'threshold': np.concatenate(thresholds).astype(np.float64),
+        'left': np.concatenate(lefts),
+        'right': np.concatenate(rights),
+        'value': np.concatenate(values).astype(np.float64),
+        'roots': np.asarray(roots, dtype=np.int32),
+        'max_depth': np.int32(max_depth),
+        'n_features': np.int32(model.n_features_in_),
+    }
+
+def compile_hist_gradient_boosting(model, scaler=None):
+    """Flatten a fitted HistGradientBoostingRegressor (squared error) into the same node arrays.
+
+    Boosting sums its trees onto a baseline while the evaluator averages them,
+    so each leaf stores n_trees * value + baseline: the mean of those is the
+    boosted prediction. Categorical splits and missing-value routing are not
+    exported; the API only sends finite numeric features.
+    """
+    if model.loss != 'squared_error':
+        raise ValueError(f"Only squared_error boosting can be compiled, got {model.loss!r}")
+    trees = [predictors[0] for predictors in model._predictors]
+    baseline = float(np.ravel(model._baseline_prediction)[0])
+    features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+    offset = 0
+    max_depth = 0
+    for tree in trees:
+        nodes = tree.nodes
+        if nodes['is_categorical'].any():
+            raise ValueError("Categorical splits cannot be compiled")
+        n_nodes = len(nodes)
+        is_leaf = nodes['is_leaf'].astype(bool)
+        own_index = np.arange(n_nodes) + offset
+
+        feature = np.where(is_leaf, 0, nodes['feature_idx']).astype(np.int32)
+        if scaler is not None:
+            mean, scale = scaler.mean_[feature], scaler.scale_[feature]
+        else:
+            mean, scale = np.zeros(n_nodes), np.ones(n_nodes)
+        threshold = np.where(is_leaf, 0.0, _raw_thresholds(nodes['num_threshold'], mean, scale, np.float64))
+
+        features.append(feature)
+        thresholds.append(threshold)
+        lefts.append(np.where(is_leaf, own_index, nodes['left'].astype(np.int64) + offset).astype(np.int32))
+        rights.append(np.where(is_leaf, own_index, nodes['right'].astype(np.int64) + offset).astype(np.int32))
+        values.append(np.where(is_leaf, nodes['value'] * len(trees) + baseline, 0.0))
+        roots.append(offset)
+        offset += n_nodes
+        max_depth = max(max_depth, int(nodes['depth'].max()))
+
+    return {
+        'feature': np.concatenate(features),
+        'threshold': np.concatenate(thresholds).astype(np.float64),
+        'left': np.concatenate(lefts),
+        'right': np.concatenate(rights),
+        'value': np.concatenate(values).astype(np.float64),
+        'roots': np.asarray(roots, dtype=np.int32),
+        'max_depth': np.int32(max_depth),
+        'n_features': np.int32(model.n_features_in_),
+    }
+
+def compile_model(model, scaler=None):
+    """Node arrays for either supported estimator."""
+    if hasattr(model, 'estimators_'):
+        return compile_forest(model, scaler)
+    return compile_hist_gradient_boosting(model, scaler)
+
+def save_forest(arrays, path):
+    """Write the node arrays as an uncompressed joblib file, which `CompiledForest.load` memory-maps."""
+    import joblib
+    tmp = f"{path}.tmp-{os.getpid()}"
+    joblib.dump(arrays, tmp)
+    # Replace rather than rewrite: truncating a file that a server has mapped would crash it
+    os.replace(tmp, path)
+
+class CompiledForest:
+    """Evaluates a forest exported by `compile_forest` on raw feature rows."""
+
+    def __init__(self, arrays):
+        for name in NODE_ARRAYS:
+            setattr(self, name, np.ascontiguousarray(arrays[name]))
+        self.max_depth = int(arrays['max_depth'])
+        self.n_features = int(arrays['n_features'])
+
+    @classmethod
+    def load(cls, path):
+        """Load exported arrays. joblib files are mapped read-only, so every process shares their pages."""
+        if str(path).endswith('.npz'):  # exports from before the joblib format
+            with np.load(path) as arrays:
+                return cls({name: arrays[name] for name in arrays.files})
+        import joblib
+        return cls(joblib.load(path, mmap_mode='r'))
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    def predict(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(f"Expected a 2D array with {self.n_features} features, got shape {X.shape}")
+
+        # One cursor per (row, tree); every step advances all of them one level
+        nodes = np.tile(self.roots, (len(X), 1))
+        rows = np.arange(len(X))[:, None]
+        for _ in range(self.max_depth):
+            go_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+        return self.value[nodes].mean(axis=1)
@@ -0,0 +1,217 @@
+import base64
+import hashlib
+import os
+
+import numpy as np
+
+# Columnar snapshot of the cleaned catalog behind /api/games.
+#
+# The pipeline sorts the games by engagement score once (descending, ties by
+# catalog order) and stores every column in that order, so a game's row
+# position *is* its rank. Two inverted indexes map each genre and each release
+# year to the ranks of its games, ascending, in CSR form (`*_offsets` into one
+# `*_rows` array). A query then never sorts anything:
+#
+#   * genre filter      scan that genre's rank list from the cursor; it is
+#                       already in score order, so the first k matches are the top k
+#   * year range only   take the first k matches of each year's rank list and
+#                       select the k smallest ranks of that union (np.partition)
+#   * no filter         scan the global order from the cursor
+#
+# Scans go in growing chunks with vectorized masks for the remaining filters
+# and stop once k rows matched. The cursor is the rank of the last row served,
+# tied to the snapshot version, so pages stay consistent and cost the same at
+# any depth. Names are one UTF-8 blob plus offsets rather than a million Python
+# strings, so the file memory-maps (like the compiled forest) and loads in
+# milliseconds.
+
+GAME_INDEX_PATH = 'game_index.joblib'
+
+MAX_LIMIT = 100
+PRICING = ('free', 'paid')
+
+def _parse_genres(genres_str):
+    genres = str(genres_str).replace('[', '').replace(']', '').replace("'", '').split(',')
+    return [genre.strip() for genre in genres if genre.strip()] or ['Unknown']
+
+def _csr(keys, n_keys):
+    """(offsets, rows): the rows of each key code, in ascending row order."""
+    rows = np.argsort(keys, kind='stable').astype(np.int32)
+    offsets = np.zeros(n_keys + 1, dtype=np.int64)
+    np.cumsum(np.bincount(keys, minlength=n_keys), out=offsets[1:])
+    return offsets, rows
+
+def build_game_index(df):
+    """Arrays of the snapshot for a cleaned frame (name, release_year, genres, price, engagement_score, ...)."""
+    import pandas as pd
+
+    score = df['engagement_score'].to_numpy(dtype=np.float64)
+    order = np.argsort(-score, kind='stable')
+    df = df.iloc[order]
+
+    names = df['name'].astype(str).str.encode('utf-8')
+    name_offsets = np.zeros(len(df) + 1, dtype=np.int64)
+    np.cumsum(names.str.len().to_numpy(), out=name_offsets[1:])
+    name_blob = np.frombuffer(b''.join(names.tolist()), dtype=np.uint8)
+
+    # Genre lists repeat heavily: parse each distinct string once
+    combo_codes, combo_strings = pd.factorize(df['genres'].fillna(''), sort=False)
+    combos = [_parse_genres(value) for value in combo_strings]
+    genres = sorted({genre for combo in combos for genre in combo})
+    genre_rows = [np.flatnonzero(np.isin(combo_codes, [c for c, combo in enumerate(combos) if genre in combo]))
+                  for genre in genres]
+    genre_offsets = np.zeros(len(genres) + 1, dtype=np.int64)
+    np.cumsum([len(rows) for rows in genre_rows], out=genre_offsets[1:])
+
+    year = df['release_year'].to_numpy(dtype=np.int64)
+    years = np.unique(year)
+    year_offsets, year_rows = _csr(np.searchsorted(years, year), len(years))
+
+    arrays = {
+        'score': df['engagement_score'].to_numpy(dtype=np.float64),
+        'release_year': year.astype(np.int16),
+        'price': df['price'].to_numpy(dtype=np.float64),
+        'average_playtime_forever': df['average_playtime_forever'].to_numpy(dtype=np.float64),
+        'num_reviews_total': df['num_reviews_total'].to_numpy(dtype=np.float64),
+        'peak_ccu': df['peak_ccu'].to_numpy(dtype=np.float64),
+        'name_blob': name_blob,
+        'name_offsets': name_offsets,
+        'combo': combo_codes.astype(np.int32),
+        'combos': ['|'.join(combo) for combo in combos],
+        'genres': genres,
+        'genre_offsets': genre_offsets,
+        'genre_rows': np.concatenate(genre_rows or [np.empty(0, dtype=np.int64)]).astype(np.int32),
+        'years': years.astype(np.int16),
+        'year_offsets': year_offsets,
+        'year_rows': year_rows,
+    }
+    digest = hashlib.sha256(arrays['score'].tobytes())
+    digest.update(name_offsets.tobytes())
+    arrays['version'] = digest.hexdigest()[:12]
+    return arrays
+
+def save_game_index(arrays, path=GAME_INDEX_PATH):
+    """Write the snapshot as an uncompressed joblib file, which `GameIndex.load` memory-maps."""
+    import joblib
+    tmp = f"{path}.tmp-{os.getpid()}"
+    joblib.dump(arrays, tmp)
+    # Replace rather than rewrite: truncating a file that a server has mapped would crash it
+    os.replace(tmp, path)
+
+def _first_matching(ranks, keep, k):
+    """The first k entries of a rank-ordered array (or range) for which `keep` holds, scanning in growing chunks."""
+    found, total, start, chunk = [], 0, 0, max(4 * k, 256)
+    while start < len(ranks) and total < k:
+        block = ranks[start:start + chunk]
+        if isinstance(block, range):
+            block = np.arange(block.start, block.stop)
+        if keep is not None:
+            block = block[keep(block)]
+        found.append(block)
+        total += len(block)
+        start += chunk
+        chunk *= 4
+    return np.concatenate(found)[:k] if found else np.empty(0, dtype=np.int64)
+
+class GameIndex:
+    """Read-only view of a snapshot written by `save_game_index`."""
+
+    def __init__(self, arrays):
+        self.arrays = arrays
+        self.version = str(arrays['version'])
+        self.genres = list(arrays['genres'])
+        self._genre_code = {genre.casefold(): i for i, genre in enumerate(self.genres)}
+        self._combos = [combo.split('|') for combo in arrays['combos']]
+        self.years = np.asarray(arrays['years'])
+
+    @classmethod
+    def load(cls, path=GAME_INDEX_PATH):
+        import joblib
+        return cls(joblib.load(path, mmap_mode='r'))
+
+    def __len__(self):
+        return len(self.arrays['score'])
+
+    def encode_cursor(self, rank):
+        return base64.urlsafe_b64encode(f"{self.version}:{rank}".encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            version, rank = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode().split(':')
+            rank = int(rank)
+            if rank < 0:
+                raise ValueError
+        except ValueError:
+            raise ValueError("Malformed cursor") from None
+        if version != self.version:
+            raise ValueError("Cursor belongs to an older snapshot of the catalog; start again without it")
+        return rank
+
+    def _genre_ranks(self, genre):
+        code = self._genre_code.get(genre.casefold())
+        if code is None:
+            return np.empty(0, dtype=np.int32)
+        offsets = self.arrays['genre_offsets']
+        return self.arrays['genre_rows'][offsets[code]:offsets[code + 1]]
+
+    def _year_lists(self, year_min, year_max):
+        offsets, rows = self.arrays['year_offsets'], self.arrays['year_rows']
+        lo, hi = np.searchsorted(self.years, [year_min, year_max + 1])
+        return [rows[offsets[i]:offsets[i + 1]] for i in range(lo, hi)]
+
+    def query(self, genre=None, year_min=None, year_max=None, pricing=None, limit=20, cursor=None):
+        """Ranks of the top `limit` games matching every filter, after `cursor`, and the next cursor (or None)."""
+        if not 1 <= limit <= MAX_LIMIT:
+            raise ValueError(f"limit must be between 1 and {MAX_LIMIT}")
+        if pricing is not None and pricing not in PRICING:
+            raise ValueError(f"pricing must be one of {', '.join(PRICING)}")
+        if year_min is not None and year_max is not None and year_min > year_max:
+            raise ValueError("year_min is after year_max")
+        start = self.decode_cursor(cursor) + 1 if cursor else 0
+        if len(self) == 0:  # a catalog the pipeline filtered down to nothing
+            return np.empty(0, dtype=np.int32), None
+        k = limit + 1  # one extra row tells whether there is a next page
+        has_years = year_min is not None or year_max is not None
+        year_min = int(self.years[0]) if year_min is None else year_min
+        year_max = int(self.years[-1]) if year_max is None else year_max
+        year, price = self.arrays['release_year'], self.arrays['price']
+
+        def keep(ranks):
+            mask = np.ones(len(ranks), dtype=bool)
+            if has_years:
+                years = year[ranks]
+                mask &= (years >= year_min) & (years <= year_max)
+            if pricing is not None:
+                mask &= (price[ranks] == 0) == (pricing == 'free')
+            return mask
+
+        if genre is not None:
+            ranks = self._genre_ranks(genre)
+            ranks = _first_matching(ranks[np.searchsorted(ranks, start):], keep, k)
+        elif has_years:
+            heads = [_first_matching(ranks[np.searchsorted(ranks, start):], keep, k)
+                     for ranks in self._year_lists(year_min, year_max)]
+            ranks = np.concatenate(heads) if heads else np.empty(0, dtype=np.int32)
+            if len(ranks) > k:
+                ranks = np.partition(ranks, k - 1)[:k]
+            ranks = np.sort(ranks)
+        else:
+            ranks = _first_matching(range(start, len(self)), keep if pricing else None, k)
+        next_cursor = self.encode_cursor(int(ranks[limit - 1])) if len(ranks) > limit else None
+        return ranks[:limit], next_cursor
+
+    def records(self, ranks):
+        """JSON-ready game records, in the order given."""
+        a = self.arrays
+        blob, offsets = a['name_blob'], a['name_offsets']
+        return [{
+            'rank': int(rank) + 1,
+            'name': bytes(blob[offsets[rank]:offsets[rank + 1]]).decode('utf-8'),
+            'release_year': int(a['release_year'][rank]),
+            'genres': self._combos[a['combo'][rank]],
+            'price': float(a['price'][rank]),
+            'engagement_score': round(float(a['score'][rank]), 1),
+            'average_playtime_forever': float(a['average_playtime_forever'][rank]),
+            'num_reviews_total': float(a['num_reviews_total'][rank]),
+            'peak_ccu': float(a['peak_ccu'][rank]),
+        } for rank in ranks]
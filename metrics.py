@@ -0,0 +1,226 @@
+import bisect
+import os
+import resource
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+# In-process counters, gauges and histograms with Prometheus text exposition.
+#
+# Every update is a dict lookup for the label values plus a short critical
+# section, a few hundred nanoseconds, so the API keeps them on in production.
+# Numbers owned by other objects (prediction cache, model registry, coalescer)
+# are not copied here; `MetricsRegistry.collector` reads them at scrape time.
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+class Histogram:
+    """Cumulative-bucket histogram (Prometheus style: counts of observations <= each bound)."""
+
+    def __init__(self, bounds):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)  # last bucket is +Inf
+        self.total = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        i = bisect.bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.total += 1
+            self.sum += value
+            if value > self.max:
+                self.max = value
+
+    @contextmanager
+    def time(self):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def _cumulative(self):
+        with self._lock:
+            counts, total, value_sum, value_max = list(self.counts), self.total, self.sum, self.max
+        running, cumulative = 0, []
+        for count in counts:
+            running += count
+            cumulative.append(running)
+        return cumulative, total, value_sum, value_max
+
+    def snapshot(self):
+        cumulative, total, value_sum, value_max = self._cumulative()
+        return {
+            "buckets": {**{str(b): c for b, c in zip(self.bounds, cumulative)}, "+Inf": cumulative[-1]},
+            "count": total,
+            "mean": round(value_sum / total, 4) if total else 0.0,
+            "max": round(value_max, 4),
+        }
+
+    def samples(self, name, labels):
+        cumulative, total, value_sum, _ = self._cumulative()
+        lines = [f"{name}_bucket{_labels({**labels, 'le': _number(b)})} {c}"
+                 for b, c in zip(self.bounds + (float('inf'),), cumulative)]
+        lines.append(f"{name}_sum{_labels(labels)} {_number(value_sum)}")
+        lines.append(f"{name}_count{_labels(labels)} {total}")
+        return lines
+
+class Counter:
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1.0):
+        with self._lock:
+            self.value += amount
+
+    def samples(self, name, labels):
+        return [f"{name}{_labels(labels)} {_number(self.value)}"]
+
+class Gauge(Counter):
+    def dec(self, amount=1.0):
+        self.inc(-amount)
+
+    def set(self, value):
+        with self._lock:
+            self.value = value
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + '}'
+
+class Family:
+    """A named metric with one child per combination of label values."""
+
+    def __init__(self, kind, name, help, labelnames, factory):
+        self.kind = kind
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._factory = factory
+        self._children = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._children[()] = factory()
+
+    def labels(self, *values):
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, self._factory())
+        return child
+
+    def __getattr__(self, attr):
+        # An unlabeled family acts as its only child: family.observe(...), family.inc()
+        if attr.startswith('_') or self.labelnames:
+            raise AttributeError(attr)
+        return getattr(self._children[()], attr)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in sorted(self._children.items()):
+            lines.extend(child.samples(self.name, dict(zip(self.labelnames, values))))
+        return lines
+
+class MetricsRegistry:
+    def __init__(self):
+        self._families = []
+        self._collectors = []
+
+    def _add(self, kind, name, help, labelnames, factory):
+        family = Family(kind, name, help, labelnames, factory)
+        self._families.append(family)
+        return family
+
+    def counter(self, name, help, labelnames=()):
+        return self._add('counter', name, help, labelnames, Counter)
+
+    def gauge(self, name, help, labelnames=()):
+        return self._add('gauge', name, help, labelnames, Gauge)
+
+    def histogram(self, name, help, bounds=LATENCY_BUCKETS, labelnames=()):
+        return self._add('histogram', name, help, labelnames, lambda: Histogram(bounds))
+
+    def collector(self, func):
+        """Register func() -> iterable of (kind, name, help, [(labels dict, value or Histogram)])."""
+        self._collectors.append(func)
+        return func
+
+    def render(self):
+        lines = []
+        for family in self._families:
+            lines.extend(family.render())
+        for collect in self._collectors:
+            for kind, name, help, samples in collect():
+                lines += [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+                for labels, value in samples:
+                    if isinstance(value, Histogram):
+                        lines.extend(value.samples(name, labels))
+                    else:
+                        lines.append(f"{name}{_labels(labels)} {_number(value)}")
+        return '\n'.join(lines) + '\n'
+
+REGISTRY = MetricsRegistry()
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Process memory
+
+def rss_bytes():
+    """Current resident set size, or None where /proc is unavailable."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+def peak_rss_bytes():
+    """Peak resident set size of this process so far."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024  # Linux reports KiB
+
+class PeakRSSSampler:
+    """Tracks the highest RSS seen while the `with` block runs by polling from a thread.
+
+    Polling misses spikes shorter than `interval`; where /proc is unavailable
+    it falls back to the process-lifetime peak.
+    """
+
+    def __init__(self, interval=0.01):
+        self.interval = interval
+        self.peak = None
+        self._stop = threading.Event()
+
+    def _sample(self):
+        current = rss_bytes()
+        if current is not None and (self.peak is None or current > self.peak):
+            self.peak = current
+
+    def _poll(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def __enter__(self):
+        self._sample()
+        self._thread = threading.Thread(target=self._poll, name='rss-sampler', daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+        if self.peak is None:
+            self.peak = peak_rss_bytes()
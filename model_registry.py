@@ -0,0 +1,364 @@
+import hashlib
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+# Versioned model artifacts and the API-side registry that serves them.
+#
+# Layout on disk (written by `publish_model`, called from the pipeline):
+#     models/
+#         manifest.json            {"latest": ..., "versions": [{version, created, sha256, metrics}, ...]}
+#         <version>/rf_model.joblib
+#         <version>/rf_scaler.joblib
+#         <version>/rf_forest.joblib   (rf_forest.npz in versions published before the joblib format)
+#
+# A version directory is written under a temporary name and renamed into place,
+# and the manifest is replaced atomically, so a reader never sees a half-written
+# version. `ModelRegistry` polls the manifest from a background thread, loads a
+# new latest version there, and only then swaps it in: requests always read a
+# complete, already-loaded snapshot and never wait on joblib.
+#
+# Serving starts from the compiled forest alone: it is memory-mapped, so it
+# loads in milliseconds and worker processes share its pages. The sklearn
+# estimator and scaler, and the sklearn/scipy/pandas imports they pull in
+# (~2s, ~100 MB per process), are only loaded when something needs them. This
+# module and forest_engine import joblib and NumPy lazily for the same reason:
+# importing the API stays cheap enough for /health to answer right away.
+
+REGISTRY_DIR = 'models'
+MANIFEST_NAME = 'manifest.json'
+MODEL_FILE = 'rf_model.joblib'
+SCALER_FILE = 'rf_scaler.joblib'
+FOREST_FILE = 'rf_forest.joblib'
+FOREST_FILE_NPZ = 'rf_forest.npz'  # earlier export format, still loaded
+
+# Versions kept on disk by publish_model; older ones are pruned
+KEEP_VERSIONS = 5
+
+# Name the registry serves the pre-registry root artifacts under
+LEGACY_VERSION = 'legacy'
+
+def _hash_files(paths):
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+    return digest.hexdigest()
+
+def read_manifest(registry_dir=REGISTRY_DIR):
+    with open(os.path.join(registry_dir, MANIFEST_NAME)) as f:
+        return json.load(f)
+
+def _write_manifest(registry_dir, manifest):
+    path = os.path.join(registry_dir, MANIFEST_NAME)
+    with open(path + '.tmp', 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(path + '.tmp', path)
+
+def publish_model(model, scaler, forest_arrays, metrics, registry_dir=REGISTRY_DIR, keep=KEEP_VERSIONS):
+    """Store a trained model as a new registry version and point `latest` at it.
+
+    Returns the version name. Retraining to byte-identical artifacts re-points
+    `latest` at the existing version instead of adding a duplicate.
+    """
+    import joblib
+    from forest_engine import save_forest
+
+    os.makedirs(registry_dir, exist_ok=True)
+    try:
+        manifest = read_manifest(registry_dir)
+    except FileNotFoundError:
+        manifest = {'latest': None, 'versions': []}
+
+    staging = os.path.join(registry_dir, f'.staging-{os.getpid()}')
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+    joblib.dump(model, os.path.join(staging, MODEL_FILE))
+    joblib.dump(scaler, os.path.join(staging, SCALER_FILE))
+    save_forest(forest_arrays, os.path.join(staging, FOREST_FILE))
+    sha256 = _hash_files([os.path.join(staging, name) for name in (MODEL_FILE, SCALER_FILE)])
+
+    existing = next((entry for entry in manifest['versions'] if entry['sha256'] == sha256), None)
+    if existing is not None:
+        forest_path = os.path.join(registry_dir, existing['version'], FOREST_FILE)
+        if not os.path.exists(forest_path):
+            # Published before the mappable forest export; add it next to the .npz
+            os.replace(os.path.join(staging, FOREST_FILE), forest_path)
+        shutil.rmtree(staging)
+        existing['metrics'] = metrics
+        version = existing['version']
+    else:
+        created = datetime.now(timezone.utc)
+        version = f"{created:%Y%m%dT%H%M%SZ}-{sha256[:8]}"
+        os.rename(staging, os.path.join(registry_dir, version))
+        manifest['versions'].append({
+            'version': version,
+            'created': created.isoformat(timespec='seconds'),
+            'sha256': sha256,
+            'metrics': metrics,
+        })
+    manifest['latest'] = version
+
+    # Prune the oldest versions, never the one just published
+    pruned = [entry for entry in manifest['versions'][:-keep] if entry['version'] != version] if keep > 0 else []
+    manifest['versions'] = [entry for entry in manifest['versions'] if entry not in pruned]
+    _write_manifest(registry_dir, manifest)
+    for entry in pruned:
+        shutil.rmtree(os.path.join(registry_dir, entry['version']), ignore_errors=True)
+    return version
+
+def _is_mapped(array):
+    import numpy as np
+    while array is not None:
+        if isinstance(array, np.memmap):
+            return True
+        array = getattr(array, 'base', None)
+    return False
+
+def _nbytes(obj, seen, mapped=False):
+    """Approximate bytes held by a loaded model: NumPy buffers plus sklearn tree node tables.
+
+    Arrays backed by a memory-mapped file are shared between processes; they
+    are counted only when `mapped` is true, and then nothing else is.
+    """
+    import numpy as np
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes if _is_mapped(obj) == mapped else 0
+    if mapped:
+        if isinstance(obj, dict):
+            return sum(_nbytes(value, seen, mapped) for value in obj.values())
+        if isinstance(obj, (list, tuple)):
+            return sum(_nbytes(item, seen, mapped) for item in obj)
+        return _nbytes(vars(obj), seen, mapped) if hasattr(obj, '__dict__') else 0
+    if type(obj).__name__ == 'Tree' and hasattr(obj, 'capacity'):
+        from sklearn.tree._tree import NODE_DTYPE
+        return obj.capacity * NODE_DTYPE.itemsize + obj.value.nbytes
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(_nbytes(value, seen) for value in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return sys.getsizeof(obj) + sum(_nbytes(item, seen) for item in obj)
+    if hasattr(obj, '__dict__'):
+        return sys.getsizeof(obj) + _nbytes(vars(obj), seen)
+    return sys.getsizeof(obj)
+
+class ModelVersion:
+    """One model version: compiled forest plus the sklearn estimator and scaler, loaded on first use.
+
+    `model` and `scaler` are unpickled the first time they are read (large
+    batches, or a version without a compiled forest); `load_seconds` and
+    `memory_bytes` grow to include them then.
+    """
+
+    def __init__(self, version, directory, forest, sha256, metrics=None, load_seconds=0.0):
+        self.version = version
+        self.directory = directory
+        self.forest = forest
+        self.sha256 = sha256
+        self.metrics = metrics or {}
+        self.load_seconds = load_seconds
+        self.loaded_at = time.time()
+        self._model = self._scaler = None
+        self._estimator_lock = threading.Lock()
+        self._measure()
+
+    @classmethod
+    def load(cls, version, directory, metrics=None, sha256=None):
+        start = time.perf_counter()
+        from forest_engine import CompiledForest
+        forest = None
+        for name in (FOREST_FILE, FOREST_FILE_NPZ):
+            if os.path.exists(os.path.join(directory, name)):
+                try:
+                    forest = CompiledForest.load(os.path.join(directory, name))
+                except Exception as e:
+                    print(f"Compiled forest for model {version} could not be loaded. {e}")
+                break
+        if sha256 is None:
+            sha256 = _hash_files([os.path.join(directory, MODEL_FILE), os.path.join(directory, SCALER_FILE)])
+        mv = cls(version, directory, forest, sha256, metrics, time.perf_counter() - start)
+        if forest is None:
+            print(f"Compiled forest for model {version} not found, falling back to sklearn inference.")
+            mv.load_estimators()  # nothing to serve from without them
+        return mv
+
+    def load_estimators(self):
+        """Unpickle the sklearn estimator and scaler if they are not loaded yet."""
+        if self._model is not None:
+            return
+        with self._estimator_lock:
+            if self._model is not None:
+                return
+            import joblib
+            start = time.perf_counter()
+            scaler = joblib.load(os.path.join(self.directory, SCALER_FILE))
+            self._model = joblib.load(os.path.join(self.directory, MODEL_FILE))
+            self._scaler = scaler
+            self.load_seconds += time.perf_counter() - start
+            self._measure()
+
+    @property
+    def model(self):
+        self.load_estimators()
+        return self._model
+
+    @property
+    def scaler(self):
+        self.load_estimators()
+        return self._scaler
+
+    def _measure(self):
+        parts = (self._model, self._scaler, self.forest)
+        self.memory_bytes = _nbytes(parts, set())
+        self.mapped_bytes = _nbytes(parts, set(), mapped=True)
+
+    def describe(self):
+        return {
+            "version": self.version,
+            "sha256": self.sha256,
+            "load_seconds": round(self.load_seconds, 4),
+            "memory_bytes": self.memory_bytes,
+            "mapped_bytes": self.mapped_bytes,
+            "loaded_at": datetime.fromtimestamp(self.loaded_at, tz=timezone.utc).isoformat(timespec='seconds'),
+            "compiled_forest": self.forest is not None,
+            "estimators_loaded": self._model is not None,
+        }
+
+class UnknownModelVersion(LookupError):
+    pass
+
+def _signature(paths):
+    signature = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+            signature.append((st.st_mtime_ns, st.st_size))
+        except OSError:
+            signature.append(None)
+    return tuple(signature)
+
+class ModelRegistry:
+    """Serves loaded model versions and picks up newly published ones in the background.
+
+    The serving state is one immutable snapshot (latest version name, loaded
+    versions, manifest entries) that `refresh` rebuilds and swaps with a single
+    reference assignment, so readers never lock. Without a manifest the root
+    artifacts are served as version "legacy", reloaded whenever they change.
+    A pinned version that is not loaded yet is loaded on first use; at most
+    `max_loaded` versions besides the latest stay in memory.
+    """
+
+    def __init__(self, registry_dir=REGISTRY_DIR, legacy_dir='.', poll_interval=2.0, max_loaded=3):
+        self.registry_dir = registry_dir
+        self.legacy_dir = legacy_dir
+        self.poll_interval = poll_interval
+        self.max_loaded = max_loaded
+        self._snapshot = (None, {}, {})  # (latest version, {version: ModelVersion}, {version: manifest entry})
+        self._signature = None
+        self._load_lock = threading.Lock()
+        self._poller = None
+        self._poller_pid = None
+        self.last_error = None
+
+    def _watched_paths(self):
+        legacy = [os.path.join(self.legacy_dir, name)
+                  for name in (MODEL_FILE, SCALER_FILE, FOREST_FILE, FOREST_FILE_NPZ)]
+        return [os.path.join(self.registry_dir, MANIFEST_NAME)] + legacy
+
+    def refresh(self):
+        """Reload the manifest and load a new latest version if the files on disk changed."""
+        with self._load_lock:
+            signature = _signature(self._watched_paths())
+            if signature == self._signature:
+                return
+            _, loaded, _ = self._snapshot
+            try:
+                if signature[0] is not None:
+                    manifest = read_manifest(self.registry_dir)
+                    entries = {entry['version']: entry for entry in manifest['versions']}
+                    latest = manifest['latest']
+                    if latest not in loaded:
+                        loaded = {**loaded, latest: self._load_version(latest, entries[latest])}
+                else:
+                    entries, latest = {LEGACY_VERSION: {'version': LEGACY_VERSION}}, LEGACY_VERSION
+                    # The root files may have been rewritten in place, so always reload them
+                    loaded = {**loaded, LEGACY_VERSION: ModelVersion.load(LEGACY_VERSION, self.legacy_dir)}
+            except Exception as e:
+                # Keep serving what is loaded; retry when the files change again
+                self.last_error = f"{type(e).__name__}: {e}"
+                print(f"Warning: could not load model artifacts, keeping the current model. {e}")
+                self._signature = signature
+                return
+            loaded = {name: mv for name, mv in loaded.items() if name in entries}
+            self._snapshot = (latest, self._trim(loaded, latest), entries)
+            self._signature = signature
+            self.last_error = None
+
+    def _load_version(self, version, entry):
+        # The manifest already holds the artifacts' hash; no need to re-read them
+        return ModelVersion.load(version, os.path.join(self.registry_dir, version), entry.get('metrics'),
+                                 entry.get('sha256'))
+
+    def _trim(self, loaded, latest):
+        pinned = sorted((mv.loaded_at, name) for name, mv in loaded.items() if name != latest)
+        for _, name in pinned[:max(0, len(pinned) - self.max_loaded)]:
+            loaded = {k: v for k, v in loaded.items() if k != name}
+        return loaded
+
+    def get(self, version=None):
+        """The ModelVersion to serve: `version` if given, else the latest. None if nothing is loaded."""
+        if self._signature is None:
+            # Called before the first load finished: wait for it (or run it) instead of failing
+            self.refresh()
+        latest, loaded, entries = self._snapshot
+        if version is None or version == latest:
+            return loaded.get(latest)
+        if version in loaded:
+            return loaded[version]
+        if version not in entries:
+            raise UnknownModelVersion(f"Unknown model version '{version}'")
+        with self._load_lock:
+            latest, loaded, entries = self._snapshot
+            if version not in loaded:
+                mv = self._load_version(version, entries[version])
+                self._snapshot = (latest, self._trim({**loaded, version: mv}, latest), entries)
+            return self._snapshot[1][version]
+
+    def describe(self):
+        latest, loaded, entries = self._snapshot
+        versions = []
+        for name, entry in entries.items():
+            info = {**entry, "loaded": name in loaded}
+            if name in loaded:
+                info.update(loaded[name].describe())
+            versions.append(info)
+        return {"latest": latest, "versions": versions, "last_error": self.last_error}
+
+    def _poll(self):
+        while True:
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"Warning: model registry poll failed. {e}")
+            time.sleep(self.poll_interval)
+
+    def start(self):
+        """Start the polling thread, which loads the current model right away.
+
+        Idempotent; restarts the thread in a forked worker.
+        """
+        if self._poller_pid == os.getpid() and self._poller is not None and self._poller.is_alive():
+            return
+        with self._load_lock:
+            if self._poller_pid == os.getpid() and self._poller is not None and self._poller.is_alive():
+                return
+            self._poller = threading.Thread(target=self._poll, name='model-registry-poller', daemon=True)
+            self._poller_pid = os.getpid()
+            self._poller.start()
@@ -0,0 +1,137 @@
+import os
+import threading
+import time
+from concurrent.futures import Future
+
+from metrics import Histogram
+
+# Micro-batching for single-row predictions.
+#
+# Scoring one row through the forest costs nearly as much as scoring 64, so
+# concurrent /api/predict calls hand their feature rows to one dispatcher
+# thread, which scores everything queued in a single vectorized call and
+# resolves each caller's Future with its own row.
+#
+# The dispatcher holds a batch open for at most `max_delay` seconds after its
+# first row, and only while more rows are on their way: requests register
+# with `admit()` when they start, so a batch is closed as soon as every
+# admitted request has submitted (or left without needing the model). A lone
+# request therefore pays no waiting time at all; under load batches fill up
+# to `max_rows`.
+
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+QUEUE_DELAY_BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2, 5, 10, 25, 50)
+
+class _Ticket:
+    """One admitted request: submits at most one row, then stops holding batches open."""
+
+    def __init__(self, coalescer):
+        self._coalescer = coalescer
+        self._pending = True
+
+    def _release(self):
+        if self._pending:
+            self._pending = False
+            self._coalescer._expected -= 1
+
+    def submit(self, features, model):
+        return self._coalescer.submit(features, model, ticket=self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        with self._coalescer._cond:
+            self._release()
+            self._coalescer._cond.notify()
+
+class PredictionCoalescer:
+    """Queues single-row predictions and scores them together with `score(X, model)`."""
+
+    def __init__(self, score, max_rows=64, max_delay=0.002):
+        self.score = score
+        self.max_rows = max(1, max_rows)
+        self.max_delay = max_delay
+        self._cond = threading.Condition()
+        self._queue = []      # (features, model, future, submitted_at)
+        self._expected = 0    # admitted requests that have not submitted or left yet
+        self._thread = None
+        self._thread_pid = None
+        self.batch_sizes = Histogram(BATCH_SIZE_BUCKETS)
+        self.queue_delay_ms = Histogram(QUEUE_DELAY_BUCKETS_MS)
+        self.score_ms = Histogram(QUEUE_DELAY_BUCKETS_MS)
+
+    def admit(self):
+        """Announce a request that may submit a row; use as a context manager."""
+        with self._cond:
+            self._expected += 1
+        return _Ticket(self)
+
+    def submit(self, features, model, ticket=None):
+        """Queue one feature row; the returned Future resolves to its float score."""
+        self._ensure_thread()
+        future = Future()
+        with self._cond:
+            if ticket is not None:
+                ticket._release()
+            self._queue.append((features, model, future, time.perf_counter()))
+            self._cond.notify()
+        return future
+
+    def _ensure_thread(self):
+        if self._thread_pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._cond:
+            if self._thread_pid == os.getpid() and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._dispatch, name='predict-coalescer', daemon=True)
+            self._thread_pid = os.getpid()
+            self._thread.start()
+
+    def _next_batch(self):
+        with self._cond:
+            while not self._queue:
+                self._cond.wait()
+            deadline = self._queue[0][3] + self.max_delay
+            while len(self._queue) < self.max_rows and self._expected > 0:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            batch, self._queue = self._queue[:self.max_rows], self._queue[self.max_rows:]
+            return batch
+
+    def _dispatch(self):
+        import numpy as np
+        while True:
+            batch = self._next_batch()
+            started = time.perf_counter()
+            # Rows pinned to different model versions are scored per version
+            groups = {}
+            for item in batch:
+                groups.setdefault(id(item[1]), []).append(item)
+            for items in groups.values():
+                try:
+                    scores = self.score(np.array([item[0] for item in items], dtype=np.float64), items[0][1])
+                    for item, score in zip(items, scores):
+                        item[2].set_result(float(score))
+                except Exception as e:
+                    for item in items:
+                        item[2].set_exception(e)
+            finished = time.perf_counter()
+            with self._cond:
+                self.batch_sizes.observe(len(batch))
+                for item in batch:
+                    self.queue_delay_ms.observe((started - item[3]) * 1000)
+                self.score_ms.observe((finished - started) * 1000)
+
+    def stats(self):
+        with self._cond:
+            return {
+                "max_rows": self.max_rows,
+                "max_delay_ms": self.max_delay * 1000,
+                "queued": len(self._queue),
+                "batch_size": self.batch_sizes.snapshot(),
+                "queue_delay_ms": self.queue_delay_ms.snapshot(),
+                "score_ms": self.score_ms.snapshot(),
+            }
@@ -0,0 +1,107 @@
+import hashlib
+import json
+import math
+import os
+from bisect import bisect_left, bisect_right
+
+# Where a predicted engagement score would land among real games.
+#
+# The pipeline exports, per peer group (all games, each primary genre, each
+# pricing tier), the group's size and its scores at QUANTILE_POINTS evenly
+# spaced ranks: a quantile sketch, sorted by construction. Groups no larger
+# than that keep every score, so their ranking is exact. How many games score
+# below (or above) s is then a binary search plus a linear interpolation
+# between the two neighbouring quantiles, a few microseconds in pure Python,
+# accurate to 100 / (QUANTILE_POINTS - 1) percentile points. The file is a few
+# kilobytes per group and the API reloads it when a rerun replaces it.
+
+SCORE_DISTRIBUTION_PATH = 'score_distribution.json'
+QUANTILE_POINTS = 1001
+DIMENSIONS = ('genre', 'pricing_tier')
+
+# Pricing tiers, as the pricing analysis segments the catalog
+FREE_TIER, LOW_COST_TIER, PREMIUM_TIER = 'Free', 'Low-cost (<$20)', 'Premium ($20+)'
+PREMIUM_PRICE = 20
+
+def pricing_tier(price):
+    """Tier label of one price."""
+    return FREE_TIER if price == 0 else LOW_COST_TIER if price < PREMIUM_PRICE else PREMIUM_TIER
+
+def pricing_tiers(price):
+    """Tier labels of an array of prices."""
+    import numpy as np
+    price = np.asarray(price)
+    return np.where(price == 0, FREE_TIER, np.where(price < PREMIUM_PRICE, LOW_COST_TIER, PREMIUM_TIER))
+
+def _sketch(scores, points):
+    import numpy as np
+    scores = np.sort(np.asarray(scores, dtype=np.float64))
+    quantiles = np.quantile(scores, np.linspace(0, 1, points)) if len(scores) > points else scores
+    return {'count': len(scores), 'quantiles': np.round(quantiles, 3).tolist()}
+
+def build_score_distribution(scores, genres, tiers, points=QUANTILE_POINTS):
+    """Score sketches overall and per primary genre / pricing tier, keyed by group label."""
+    import pandas as pd
+
+    scores = pd.Series(scores, dtype='float64').reset_index(drop=True)
+    distribution = {'quantile_points': points, 'overall': _sketch(scores, points)}
+    for dimension, labels in zip(DIMENSIONS, (genres, tiers)):
+        grouped = scores.groupby(pd.Series(labels, dtype='object').reset_index(drop=True), sort=True)
+        distribution[dimension] = {str(label): _sketch(group, points) for label, group in grouped}
+    return distribution
+
+class ScoreDistribution:
+    """Percentile and rank lookups against an exported distribution."""
+
+    def __init__(self, data):
+        self.data = data
+        self.version = hashlib.sha256(json.dumps(data, sort_keys=True).encode()).hexdigest()[:12]
+        self._groups = {dimension: {label.casefold(): (label, entry) for label, entry in data[dimension].items()}
+                        for dimension in DIMENSIONS}
+
+    @classmethod
+    def load(cls, path=SCORE_DISTRIBUTION_PATH):
+        with open(path) as f:
+            return cls(json.load(f))
+
+    def save(self, path=SCORE_DISTRIBUTION_PATH):
+        with open(path + '.tmp', 'w') as f:
+            json.dump(self.data, f, separators=(',', ':'))
+        os.replace(path + '.tmp', path)
+
+    def groups(self, dimension):
+        return list(self.data[dimension])
+
+    @staticmethod
+    def _count(entry, score, search):
+        """Games scoring below `score` (search=bisect_left) or at most `score` (bisect_right)."""
+        quantiles, count = entry['quantiles'], entry['count']
+        i = search(quantiles, score)
+        if i == 0 or i == len(quantiles):
+            return 0 if i == 0 else count
+        # Fractional 0-based position of `score` in the full sorted group, between
+        # the positions of quantiles[i - 1] and quantiles[i]
+        low, high = quantiles[i - 1], quantiles[i]
+        position = (i - 1 + (score - low) / (high - low)) * (count - 1) / (len(quantiles) - 1)
+        if search is bisect_left:
+            return min(count, math.ceil(position - 1e-9))
+        return min(count, math.floor(position + 1e-9) + 1)
+
+    def _rank(self, entry, score):
+        below = self._count(entry, score, bisect_left)
+        higher = entry['count'] - self._count(entry, score, bisect_right)
+        return {'percentile': round(100 * below / entry['count'], 1), 'rank': higher + 1, 'out_of': entry['count']}
+
+    def rank(self, score, dimension=None, group=None):
+        """{'percentile', 'rank', 'out_of'} of `score` among all games, or among one group of a dimension.
+
+        `percentile` is the share of games scoring lower; `rank` is one more
+        than the number scoring higher. None for an unknown group.
+        """
+        if dimension is None:
+            return self._rank(self.data['overall'], score)
+        found = self._groups[dimension].get(str(group).casefold())
+        if found is None:
+            return None
+        label, entry = found
+        return {'group': label, **self._rank(entry, score)}
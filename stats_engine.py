@@ -0,0 +1,185 @@
+import time
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+import scipy.stats as stats
+
+# Moment-based effect sizes and a vectorized bootstrap for them.
+#
+# Every statistic here is a function of per-sample moments (count, mean,
+# sample variance), so a two-group comparison needs one moments pass per group
+# instead of a separate pandas call per mean/std/t-test. The same functions are
+# evaluated on whole batches of bootstrap resamples at once: a batch is a
+# (batch, n) matrix of resampled values built from a NumPy index matrix, and
+# its moments are taken along axis 1.
+#
+# GroupCube extends the same idea to grouped chart statistics: one groupby over
+# the rows stores (count, sum, M2) per cell of all key columns, and every chart
+# rolls its own grouping up from those cells.
+
+@dataclass(frozen=True)
+class Moments:
+    """Count, mean and sample variance (ddof=1); scalars or arrays of them."""
+    count: object
+    mean: object
+    var: object
+
+    @property
+    def std(self):
+        return np.sqrt(self.var)
+
+    @property
+    def se(self):
+        return np.sqrt(self.var / self.count)
+
+def moments(values, axis=-1):
+    values = np.asarray(values, dtype=np.float64)
+    return Moments(values.shape[axis], values.mean(axis=axis), values.var(axis=axis, ddof=1))
+
+def grouped_moments(values, codes, n_groups=None):
+    """Moments of `values` for each integer group code in `codes`, for all groups at once.
+
+    Rows with a negative code or a NaN value are ignored. Groups with fewer
+    than two rows get a NaN variance.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    codes = np.asarray(codes)
+    valid = (codes >= 0) & ~np.isnan(values)
+    values, codes = values[valid], codes[valid]
+    n_groups = n_groups if n_groups is not None else (codes.max() + 1 if len(codes) else 0)
+    count = np.bincount(codes, minlength=n_groups)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.bincount(codes, weights=values, minlength=n_groups) / count
+        var = np.bincount(codes, weights=(values - mean[codes]) ** 2, minlength=n_groups) / (count - 1)
+    return Moments(count, mean, var)
+
+def select(m, index):
+    """Moments of a single group out of `grouped_moments` output."""
+    return Moments(m.count[index], m.mean[index], m.var[index])
+
+# Effect sizes: a and b are Moments; vectorized over batches of resamples
+
+def mean_difference(a, b):
+    return a.mean - b.mean
+
+def percent_difference(a, b):
+    return (a.mean - b.mean) / b.mean * 100
+
+def cohens_d(a, b):
+    pooled_var = ((a.count - 1) * a.var + (b.count - 1) * b.var) / (a.count + b.count - 2)
+    return (a.mean - b.mean) / np.sqrt(pooled_var)
+
+def welch_t_test(a, b):
+    """Welch's unequal-variance t-test of a vs b; returns (t statistic, two-sided p-value)."""
+    return stats.ttest_ind_from_stats(a.mean, a.std, a.count, b.mean, b.std, b.count, equal_var=False)
+
+def normal_ci_margin(a, b, z=1.96):
+    """Half-width of the normal-approximation CI for mean(a) - mean(b)."""
+    return z * np.sqrt(a.var / a.count + b.var / b.count)
+
+@dataclass(frozen=True)
+class BootstrapResult:
+    intervals: dict       # statistic name -> (low, high) percentile interval
+    n_resamples: int      # resamples actually drawn (fewer than requested if the time budget ran out)
+    seconds: float
+    truncated: bool
+
+def bootstrap_two_sample(x, y, statistics, n_resamples=10000, confidence=0.95, seed=0,
+                         time_budget=None, max_batch_bytes=64 << 20):
+    """Percentile bootstrap CIs for moment-based statistics of two independent samples.
+
+    `statistics` maps names to functions of (Moments of x*, Moments of y*),
+    e.g. `cohens_d`. Resamples are drawn in batches sized so the index and
+    value matrices stay under `max_batch_bytes`. Each sample has its own seeded
+    generator, so results do not depend on the batch size. With `time_budget`
+    (seconds), no new batch starts once it is spent; at least one batch always
+    runs.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    rng_x, rng_y = (np.random.default_rng(s) for s in np.random.SeedSequence(seed).spawn(2))
+    # An int64 index plus a float64 value per resampled element
+    batch = int(max(1, min(n_resamples, max_batch_bytes // (16 * (len(x) + len(y))))))
+
+    start = time.perf_counter()
+    estimates = {name: [] for name in statistics}
+    drawn = 0
+    while drawn < n_resamples:
+        size = min(batch, n_resamples - drawn)
+        mx = moments(x[rng_x.integers(0, len(x), size=(size, len(x)))], axis=1)
+        my = moments(y[rng_y.integers(0, len(y), size=(size, len(y)))], axis=1)
+        for name, statistic in statistics.items():
+            estimates[name].append(statistic(mx, my))
+        drawn += size
+        if time_budget is not None and time.perf_counter() - start > time_budget:
+            break
+
+    tail = (1 - confidence) / 2 * 100
+    intervals = {}
+    for name, chunks in estimates.items():
+        low, high = np.nanpercentile(np.concatenate(chunks), [tail, 100 - tail])
+        intervals[name] = (float(low), float(high))
+    return BootstrapResult(intervals, drawn, time.perf_counter() - start, drawn < n_resamples)
+
+class GroupCube:
+    """Sufficient statistics of measure columns for every cell of a set of key columns.
+
+    `build` makes one grouped pass over the rows and keeps, per cell and
+    measure, the non-NaN count, the sum and M2 (the sum of squared deviations
+    from the cell mean). `rollup` derives mean/std/count/sum for any subset of
+    the keys from the cells alone, merging cell M2s with the pairwise update of
+    Chan et al., so no chart has to scan the rows again. Rows whose key is NaN
+    are kept in the cube and dropped by the rollups that group on that key,
+    as pandas would.
+    """
+
+    def __init__(self, cells, keys, measures):
+        self.cells = cells
+        self.keys = list(keys)
+        self.measures = list(measures)
+
+    @classmethod
+    def build(cls, df, keys, measures):
+        keys, measures = list(keys), list(measures)
+        agg = df.groupby(keys, observed=True, dropna=False, sort=False)[measures].agg(['count', 'sum', 'var'])
+        cells = agg.index.to_frame(index=False)
+        for measure in measures:
+            count = agg[(measure, 'count')].to_numpy()
+            cells[f'{measure}_count'] = count
+            cells[f'{measure}_sum'] = agg[(measure, 'sum')].to_numpy()
+            cells[f'{measure}_m2'] = np.where(count > 1, agg[(measure, 'var')].to_numpy() * (count - 1), 0.0)
+        return cls(cells, keys, measures)
+
+    def __len__(self):
+        return len(self.cells)
+
+    def rollup(self, keys, measure, where=None):
+        """Per-group count, sum, mean and sample std of `measure` over `keys`.
+
+        `where` optionally filters the cells first; it receives the cells frame
+        and returns a boolean mask, so it can only test key columns. Categorical
+        keys keep their empty categories (count 0, NaN mean), like
+        `groupby(..., observed=False)`.
+        """
+        cells = self.cells if where is None else self.cells[where(self.cells)]
+        keys = list(keys)
+        count, total, m2 = (cells[f'{measure}_{part}'] for part in ('count', 'sum', 'm2'))
+        groups = cells.groupby(keys, observed=False)
+
+        group_count = groups[count.name].transform('sum').to_numpy()
+        with np.errstate(invalid='ignore', divide='ignore'):
+            group_mean = groups[total.name].transform('sum').to_numpy() / group_count
+            cell_mean = total.to_numpy() / count.to_numpy()
+        # M2 of a merged group = sum of cell M2s + sum of n_i * (mean_i - mean)^2
+        spread = np.where(count > 0, count * (cell_mean - group_mean) ** 2, 0.0)
+        merged = pd.DataFrame({'count': count, 'sum': total, 'm2': m2 + spread})
+        for key in keys:
+            merged[key] = cells[key]
+        result = merged.groupby(keys, observed=False)[['count', 'sum', 'm2']].sum()
+
+        n = result['count'].to_numpy()
+        with np.errstate(invalid='ignore', divide='ignore'):
+            result['mean'] = np.where(n > 0, result['sum'] / n, np.nan)
+            result['std'] = np.where(n > 1, np.sqrt(result['m2'] / (n - 1)), np.nan)
+        return result.drop(columns='m2').reset_index()[keys + ['mean', 'std', 'count', 'sum']]
@@ -0,0 +1,187 @@
+import json
+import os
+import time
+
+import brotli
+
+import app as flask_api
+import data_analysis
+from conftest import call
+from model_registry import publish_model
+from test_model_registry import train
+
+
+def write(path, text, mtime):
+    with open(path, 'w') as f:
+        f.write(text)
+    os.utime(path, ns=(mtime, mtime))
+
+
+def test_snapshot_reloads_changes_and_keeps_the_last_good_copy(tmp_path):
+    path = str(tmp_path / 'insights.json')
+    write(path, '{"games": 1}', 1_000_000_000_000_000_000)
+    snapshot = flask_api.JSONFileSnapshot(path, check_interval=0)
+    body, etag, _, data = snapshot.get()
+    assert data == {'games': 1}
+
+    write(path, '{"games": 1}', 2_000_000_000_000_000_000)  # touched, same content
+    assert snapshot.get()[:2] == (body, etag)
+
+    write(path, '{"games": 12}', 3_000_000_000_000_000_000)
+    body, etag, last_modified, data = snapshot.get()
+    assert data == {'games': 12} and last_modified.timestamp() == 3_000_000_000
+
+    write(path, '{"games": ', 4_000_000_000_000_000_000)  # a half-written file
+    assert snapshot.get() == (body, etag, last_modified, data)
+    write(path, '{"games": 123}', 5_000_000_000_000_000_000)
+    assert snapshot.get()[3] == {'games': 123}
+
+
+def test_insights_revalidate_and_reload(served, monkeypatch):
+    monkeypatch.setattr(flask_api, 'insights_snapshot', flask_api.JSONFileSnapshot(flask_api.INSIGHTS_PATH, 0))
+    client = flask_api.app.test_client()
+    response = client.get('/api/insights')
+    etag = response.headers['ETag']
+    assert response.status_code == 200 and response.json == {'total_games_analyzed': 3}
+    assert response.headers['Cache-Control'] == 'no-cache'
+    assert client.get('/api/insights', headers={'If-None-Match': etag}).status_code == 304
+    since = {'If-Modified-Since': response.headers['Last-Modified']}
+    assert client.get('/api/insights', headers=since).status_code == 304
+
+    with open(flask_api.INSIGHTS_PATH, 'w') as f:
+        json.dump({'total_games_analyzed': 40}, f)  # a new size, so a new signature
+    response = client.get('/api/insights', headers={'If-None-Match': etag})
+    assert response.status_code == 200 and response.json == {'total_games_analyzed': 40}
+    assert response.headers['ETag'] != etag
+
+    with open(flask_api.INSIGHTS_PATH, 'w') as f:
+        f.write('{"total_games')
+    response = client.get('/api/insights')
+    assert response.status_code == 200 and response.json == {'total_games_analyzed': 40}
+
+
+def test_prediction_cache_evicts_least_recently_used():
+    cache = flask_api.PredictionCache(2)
+    cache.put('a', 1.0)
+    cache.put('b', 2.0)
+    assert cache.get('a') == 1.0  # now 'b' is the oldest
+    cache.put('c', 3.0)
+    assert cache.get('b') is None and cache.get('a') == 1.0 and cache.get('c') == 3.0
+    cache.put('a', 1.5)  # an update refreshes, it doesn't evict
+    assert cache.stats() == {'size': 2, 'maxsize': 2, 'hits': 3, 'misses': 1, 'evictions': 1, 'hit_rate': 0.75}
+
+    cache.clear()
+    assert cache.get('a') is None and cache.stats()['size'] == 0
+    disabled = flask_api.PredictionCache(0)
+    disabled.put('a', 1.0)
+    assert disabled.get('a') is None and disabled.stats()['size'] == 0
+
+
+def test_a_new_model_is_never_answered_from_the_old_ones_cache(served, monkeypatch):
+    monkeypatch.setattr(flask_api, 'prediction_cache', flask_api.PredictionCache(16))
+    client = flask_api.app.test_client()
+    payload = {'price': 20, 'dlc_count': 3}
+    old = client.post('/api/predict', json=payload).json
+    assert client.post('/api/predict', json=payload).json == old
+
+    publish_model(*train(1), metrics={}, registry_dir='models')
+    flask_api.model_registry.refresh()
+    new = client.post('/api/predict', json=payload).json
+    assert new['model_version'] != old['model_version']
+    fresh = client.post('/api/predict/batch', json=[payload]).json['predictions'][0]['predicted_engagement']
+    assert new['predicted_engagement'] == fresh != old['predicted_engagement']
+    stats = client.get('/api/predict/cache').json
+    assert (stats['hits'], stats['misses'], stats['size']) == (1, 2, 2)
+    assert stats['model_version'] == new['model_version']
+
+
+def test_batch_predictions_accept_records_and_columns(served):
+    client = flask_api.app.test_client()
+    rows = [{'price': 20, 'dlc_count': 3}, {'price': 'free'}, 7, {'price': float('nan')}, {}]
+    response = client.post('/api/predict/batch', json={'rows': rows})
+    assert response.status_code == 200
+    result = response.json
+    assert result['count'] == 5 and result['errors'] == 3
+    assert [p.get('error') for p in result['predictions']] == [
+        None, "invalid value for 'price': 'free'", "row must be an object", "features must be finite numbers", None]
+    single = client.post('/api/predict', json=rows[0]).json['predicted_engagement']
+    assert result['predictions'][0]['predicted_engagement'] == single
+
+    columns = {'price': [20, 0.0], 'dlc_count': [3, 0]}
+    columnar = client.post('/api/predict/batch', json={'columns': columns}).json
+    records = client.post('/api/predict/batch', json=[rows[0], {'price': 0.0}]).json
+    assert columnar['predictions'] == records['predictions']
+    assert columnar['predictions'][1] == result['predictions'][4]
+
+    response = client.post('/api/predict/batch', json={'columns': {'price': [1, 2], 'dlc_count': [3]}})
+    assert response.status_code == 400 and response.json == {'error': "'columns' must hold lists of equal length"}
+    assert client.post('/api/predict/batch', json={'rows': 'nope'}).status_code == 400
+
+
+def test_oversized_batches_and_bodies_get_413(served, monkeypatch):
+    client = flask_api.app.test_client()
+    monkeypatch.setattr(flask_api, 'MAX_BATCH_ROWS', 2)
+    response = client.post('/api/predict/batch', json={'columns': {'price': [1, 2, 3]}})
+    assert response.status_code == 413 and response.json == {'error': "Batch of 3 rows exceeds the limit of 2"}
+    assert client.post('/api/predict/batch', json=[{}, {}]).status_code == 200
+
+    assert flask_api.app.config['MAX_CONTENT_LENGTH'] == flask_api.MAX_BODY_BYTES
+    monkeypatch.setitem(flask_api.app.config, 'MAX_CONTENT_LENGTH', 64)
+    body = json.dumps([{'price': 1}] * 10)
+    for route in ('/api/predict', '/api/predict/batch', '/api/score'):
+        response = client.post(route, data=body, content_type='application/json')
+        assert response.status_code == 413 and response.json == {'error': "Request body exceeds 64 bytes"}
+
+
+def test_hashed_asset_copies_are_immutable_and_prefer_brotli(served, monkeypatch):
+    chart = os.path.join(flask_api.ASSETS_DIR, 'chart.json')
+    with open(chart, 'rb') as f:
+        payload = f.read()
+    with open(chart + '.br', 'wb') as f:
+        f.write(brotli.compress(payload))
+    data_analysis.update_asset_manifest(['chart.json', 'missing.json'])
+    hashed = f"chart.{data_analysis.file_sha256(chart)[:12]}.json"
+    with open(os.path.join(flask_api.ASSETS_DIR, 'manifest.json')) as f:
+        assert json.load(f) == {'chart.json': hashed}
+
+    monkeypatch.setattr(flask_api.app, 'root_path', str(served))  # send_from_directory resolves against it
+    client = flask_api.app.test_client()
+
+    def flask_get(path, accept):
+        with client.get(path, headers={'Accept-Encoding': accept}) as response:
+            headers = {k.lower(): ', '.join(response.headers.getlist(k)) for k in response.headers.keys()}
+            return response.status_code, headers, response.get_data()
+
+    def asgi_get(path, accept):
+        return call('GET', path, headers=[('Accept-Encoding', accept)])
+
+    # A rerun rewrites chart.json in place; the hashed copy keeps what its name promises
+    with open(chart, 'w') as f:
+        f.write('{"data": [1]}')
+    os.remove(chart + '.br')
+
+    immutable = f'public, max-age={flask_api.IMMUTABLE_MAX_AGE}, immutable'
+    for get in (flask_get, asgi_get):
+        for accept, encoding in (('gzip, br', 'br'), ('br;q=0.5, gzip', 'br'), ('gzip', 'gzip'), ('identity', None)):
+            status, headers, body = get(f'/api/assets/{hashed}', accept)
+            assert status == 200 and headers.get('content-encoding') == encoding
+            assert headers['cache-control'] == immutable and 'Accept-Encoding' in headers['vary']
+            if encoding != 'gzip':
+                assert (brotli.decompress(body) if encoding else body) == payload
+        status, headers, body = get('/api/assets/chart.json', 'br')
+        assert headers['cache-control'] == 'no-cache' and body == b'{"data": [1]}'
+        assert get('/api/assets/chart.000000000000.json', 'br')[0] == 404
+
+    # The new copy replaces it in the manifest; the old one stays servable for the retention period
+    data_analysis.update_asset_manifest(['chart.json'])
+    rehashed = f"chart.{data_analysis.file_sha256(chart)[:12]}.json"
+    assert flask_get(f'/api/assets/{rehashed}', 'identity')[2] == b'{"data": [1]}'
+    assert flask_get(f'/api/assets/{hashed}', 'identity')[2] == payload
+    old = [name for name in os.listdir(flask_api.ASSETS_DIR) if name.startswith(hashed)]
+    assert sorted(old) == [hashed, hashed + '.br', hashed + '.gz']
+    retired = time.time() - data_analysis.ASSET_RETENTION_SECONDS - 60
+    for name in old:
+        os.utime(os.path.join(flask_api.ASSETS_DIR, name), (retired, retired))
+    data_analysis.update_asset_manifest(['chart.json'])
+    assert not any(name.startswith(hashed) for name in os.listdir(flask_api.ASSETS_DIR))
+    assert flask_get(f'/api/assets/{rehashed}', 'identity')[0] == 200
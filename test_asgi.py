@@ -0,0 +1,124 @@
+import gzip
+import json
+import threading
+
+import numpy as np
+
+import app as flask_api
+import asgi
+from conftest import call
+
+
+def test_predictions_match_the_flask_app(served):
+    client = flask_api.app.test_client()
+    payload = {'price': 20, 'dlc_count': 3, 'genre': 'rpg'}
+    status, headers, body = call('POST', '/api/predict', json.dumps(payload).encode())
+    expected = client.post('/api/predict', json=payload)
+    assert status == 200 and headers['content-type'] == 'application/json'
+    assert body == expected.data
+    prediction = json.loads(body)
+    assert prediction['out_of'] == 4 and prediction['peers']['genre']['group'] == 'RPG'
+    assert prediction['peers']['pricing_tier'] == {**prediction['peers']['pricing_tier'],
+                                                   'group': 'Premium ($20+)', 'out_of': 1}
+
+    batch = {'rows': [{'price': 1}, {'price': 'x'}]}
+    status, _, body = call('POST', '/api/predict/batch', json.dumps(batch).encode())
+    assert status == 200 and body == client.post('/api/predict/batch', json=batch).data
+
+    title = {'average_playtime_forever': 120, 'peak_ccu': 50, 'num_reviews_total': 900, 'pct_pos_total': 88}
+    status, _, body = call('POST', '/api/score', json.dumps(title).encode())
+    assert status == 200 and body == client.post('/api/score', json=title).data
+    assert json.loads(body)['engagement_score'] == round(min(100.0, sum(
+        [np.log1p(120), np.log1p(50), np.log1p(900), 0.88]) * 0.5 / 10 * 100), 1)
+    rows = {'rows': [title, {**title, 'peak_ccu': 'x'}]}
+    status, _, body = call('POST', '/api/score', json.dumps(rows).encode())
+    assert status == 200 and body == client.post('/api/score', json=rows).data
+    assert json.loads(body)['errors'] == 1
+
+    for bad in ({'price': 'nan'}, {'price': 'inf'}, {'dlc_count': float('-inf')}):
+        status, _, body = call('POST', '/api/predict', json.dumps(bad).encode())
+        assert status == 400 and body == client.post('/api/predict', json=bad).data
+        assert json.loads(body) == {'error': 'features must be finite numbers'}
+
+    status, _, body = call('POST', '/api/predict', b'{}', query=b'model=missing')
+    assert status == 404 and b'Unknown model version' in body
+    assert call('POST', '/api/predict', b'not json')[0] == 400
+
+
+def test_insights_and_assets_revalidate_and_negotiate(served):
+    status, headers, body = call('GET', '/api/insights')
+    assert status == 200 and json.loads(body) == {'total_games_analyzed': 3}
+    assert call('GET', '/api/insights', headers=[('If-None-Match', headers['etag'])])[0] == 304
+
+    status, headers, body = call('GET', '/api/assets/chart.json', headers=[('Accept-Encoding', 'gzip, br')])
+    assert status == 200 and headers['content-encoding'] == 'gzip'
+    assert gzip.decompress(body) == b'{"data": []}'
+    status, headers, body = call('GET', '/api/assets/chart.json')
+    assert status == 200 and len(body) == int(headers['content-length']) > asgi.STREAM_CHUNK_BYTES
+
+    assert call('GET', '/api/assets/../../app.py')[0] == 404
+    assert call('GET', '/api/assets/nope.json')[0] == 404
+    # scope['path'] is already percent-decoded: this is the request for /api/assets/chart%252Ejson
+    assert call('GET', '/api/assets/chart%2Ejson')[0] == 404
+    assert call('DELETE', '/health')[0] == 405
+
+
+def test_game_queries_match_the_flask_app(served):
+    client = flask_api.app.test_client()
+    status, _, body = call('GET', '/api/games', query=b'genre=rpg&limit=1')
+    assert status == 200 and body == client.get('/api/games?genre=rpg&limit=1').data
+    page = json.loads(body)
+    assert [game['name'] for game in page['games']] == ['Gamma'] and page['next_cursor']
+
+    query = f"genre=rpg&limit=1&cursor={page['next_cursor']}".encode()
+    status, _, body = call('GET', '/api/games', query=query)
+    assert status == 200 and body == client.get(f'/api/games?{query.decode()}').data
+    assert [game['name'] for game in json.loads(body)['games']] == ['Alpha'] and json.loads(body)['next_cursor'] is None
+
+    games = json.loads(call('GET', '/api/games', query=b'year_min=2016&pricing=paid')[2])['games']
+    assert [(game['rank'], game['name']) for game in games] == [(1, 'Beta'), (2, 'Gamma')]
+    assert call('GET', '/api/games', query=b'year_min=soon')[0] == 400
+    assert call('GET', '/api/games', query=b'cursor=bogus')[0] == 400
+
+
+def test_both_entry_points_report_request_metrics(served):
+    flask_api.app.test_client().get('/health').close()  # servers close the body; that records it
+    call('GET', '/health')
+    call('POST', '/api/predict', b'{"price": 5}')
+    status, headers, body = call('GET', '/metrics')
+    assert status == 200 and headers['content-type'].startswith('text/plain')
+    text = body.decode()
+    count = flask_api.REQUEST_SECONDS.labels('/health', 'GET', '200').total
+    assert count >= 2
+    assert f'engagex_http_request_duration_seconds_count{{route="/health",method="GET",status="200"}} {count}' in text
+    assert 'engagex_model_inference_seconds_count{engine="compiled"}' in text
+    assert 'engagex_json_seconds_count{route="/api/predict",phase="decode"}' in text
+    assert 'engagex_http_requests_in_flight{route="/metrics"} 1' in text
+
+
+def test_registry_lookups_stay_off_the_event_loop(served, monkeypatch):
+    loop_thread, threads = threading.current_thread(), []
+    select_model, get = flask_api.select_model, flask_api.model_registry.get
+
+    def recorded(fn):
+        return lambda *args: threads.append(threading.current_thread()) or fn(*args)
+
+    monkeypatch.setattr(flask_api, 'select_model', recorded(select_model))
+    monkeypatch.setattr(flask_api.model_registry, 'get', recorded(get))
+
+    assert call('POST', '/api/predict', b'{"price": 5}')[0] == 200
+    status, _, body = call('GET', '/api/predict/cache')
+    assert status == 200 and json.loads(body)['model_version'] == get().version
+    status, _, body = call('GET', '/api/models')
+    assert status == 200 and json.loads(body)['latest'] == get().version
+    assert threads and loop_thread not in threads
+
+
+def test_score_ranking_stays_off_the_event_loop(served, monkeypatch):
+    loop_thread, threads = threading.current_thread(), []
+    current = flask_api.current_score_distribution
+    monkeypatch.setattr(flask_api, 'current_score_distribution',
+                        lambda: threads.append(threading.current_thread()) or current())
+    status, _, body = call('POST', '/api/predict', b'{"price": 25}')
+    assert status == 200 and json.loads(body)['out_of'] == 4
+    assert threads and loop_thread not in threads
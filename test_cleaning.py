@@ -0,0 +1,73 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import data_analysis
+from benchmarks.bench_cleaning_kernels import (cohort_rowwise, extract_first_genre_rowwise,
+                                               idle_ratio_rowwise, parse_owners_rowwise)
+from benchmarks.synthetic import make_steam_frame, write_steam_csv
+
+
+def test_parse_owners_midpoint_matches_rowwise():
+    edge_cases = ['0 - 20000', ' 1,000 - 2,000 ', '+5 - 10', '1_000 - 2', '10 - 20 - 30', 'abc', '',
+                  '-', '5 -', 'N/A', None, np.nan, 3.0, '20000 - 50000\n']
+    owners = pd.concat([make_steam_frame(5000)['estimated_owners'], pd.Series(edge_cases, dtype=object)],
+                       ignore_index=True)
+    expected = owners.apply(parse_owners_rowwise).astype(float)
+    pd.testing.assert_series_equal(data_analysis.parse_owners_midpoint(owners), expected, check_names=False)
+
+
+def test_extract_primary_genre_matches_rowwise():
+    edge_cases = ["['Free to Play']", "Free to Play, Indie", "[]", "", "  RPG  ", None, np.nan, 7]
+    genres = pd.concat([make_steam_frame(5000)['genres'], pd.Series(edge_cases, dtype=object)], ignore_index=True)
+    expected = genres.apply(extract_first_genre_rowwise)
+    result = data_analysis.extract_primary_genre(genres)
+    assert result.tolist() == expected.tolist()
+
+
+def test_assign_cohort_matches_rowwise():
+    df = make_steam_frame(5000)
+    for dlc_med in [df['dlc_count'].median(), 0.0, -1.0, np.nan]:
+        expected = df.apply(cohort_rowwise, axis=1, args=(dlc_med, 'Buy-to-Play'))
+        assert data_analysis.assign_cohort(df, dlc_med, 'Buy-to-Play').tolist() == expected.tolist()
+
+
+def test_clean_data_idle_ratio_matches_rowwise(tmp_path):
+    df = data_analysis.clean_data(write_steam_csv(tmp_path / 'games.csv', 5000))
+    expected = idle_ratio_rowwise(df)
+    np.testing.assert_array_equal(df['idle_inflation_ratio'].to_numpy(), expected.to_numpy(dtype=float))
+    assert (df['idle_inflation_ratio'] <= 10).all()
+
+
+def test_streaming_ingest_matches_full_read(tmp_path):
+    path = write_steam_csv(tmp_path / 'games.csv', 5000, wide=True)
+    full = data_analysis.clean_data(path)
+    streamed = data_analysis.clean_data(path, chunksize=777)
+    # Streaming drops the unused free-text columns at read time; everything else must match
+    pd.testing.assert_frame_equal(streamed, full[streamed.columns], check_dtype=False)
+
+
+def test_clean_data_cache_roundtrip(tmp_path, monkeypatch):
+    pytest.importorskip('pyarrow')
+    monkeypatch.setattr(data_analysis, 'CACHE_DIR', str(tmp_path / 'cache'))
+    path = write_steam_csv(tmp_path / 'games.csv', 3000)
+    fresh = data_analysis.load_clean_data(path)
+    insights = {key: data_analysis.insights_data[key] for key in data_analysis.CLEAN_DATA_INSIGHTS}
+
+    def fail(*args, **kwargs):
+        raise AssertionError("cache hit expected, clean_data was called")
+    monkeypatch.setattr(data_analysis, 'clean_data', fail)
+    data_analysis.insights_data.clear()
+    cached = data_analysis.load_clean_data(path)
+
+    pd.testing.assert_frame_equal(cached, fresh, check_dtype=False)
+    assert cached.attrs['engagement_transform'] == fresh.attrs['engagement_transform']
+    assert {key: data_analysis.insights_data[key] for key in insights} == json.loads(json.dumps(insights))
+
+    # A different source file must miss the cache
+    write_steam_csv(path, 3000, seed=1)
+    monkeypatch.undo()
+    monkeypatch.setattr(data_analysis, 'CACHE_DIR', str(tmp_path / 'cache'))
+    assert len(data_analysis.load_clean_data(path)) != len(fresh)
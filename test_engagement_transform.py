@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+
+import data_analysis
+from benchmarks.synthetic import make_steam_frame, write_steam_csv
+from engagement_transform import RAW_INPUTS, EngagementTransform, engagement_features, load_engagement_transform
+
+
+def test_saved_transform_reproduces_pipeline_scores(tmp_path):
+    df = data_analysis.clean_data(write_steam_csv(tmp_path / 'games.csv', 3000))
+    path = str(tmp_path / 'engagement_transform.json')
+    EngagementTransform.from_dict(df.attrs['engagement_transform']).save(path)
+    transform = load_engagement_transform(path)
+    assert load_engagement_transform(str(tmp_path / 'missing.json')) is None
+
+    # Scoring raw values row by row matches the fitted frame
+    scores = [transform.score(*row)[0] for row in df[RAW_INPUTS].to_numpy()[:200]]
+    np.testing.assert_allclose(scores, df['engagement_score'].to_numpy()[:200], rtol=0, atol=1e-9)
+    assert df['engagement_score'].min() == 0 and df['engagement_score'].max() == 100
+
+    # Applying the saved transform to the same data changes nothing; new data is not refitted
+    again = data_analysis.clean_data(tmp_path / 'games.csv', transform=transform)
+    np.testing.assert_array_equal(again['engagement_score'].to_numpy(), df['engagement_score'].to_numpy())
+    other = data_analysis.clean_data(write_steam_csv(tmp_path / 'other.csv', 3000, seed=1), transform=transform)
+    assert EngagementTransform.from_dict(other.attrs['engagement_transform']).version == transform.version
+    assert other['engagement_score'].between(0, 100).all()
+
+
+def test_transform_rejects_other_feature_sets():
+    frame = make_steam_frame(500)
+    data = EngagementTransform.fit(engagement_features(*frame[RAW_INPUTS].to_numpy().T)).to_dict()
+    with pytest.raises(ValueError):
+        EngagementTransform.from_dict({**data, 'features': ['a', 'b', 'c', 'd']})
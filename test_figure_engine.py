@@ -0,0 +1,64 @@
+import base64
+import json
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+
+import data_analysis
+import figure_engine
+
+
+def decode(spec):
+    return np.frombuffer(base64.b64decode(spec['bdata']), dtype=spec['dtype'])
+
+
+def assert_same_figure(expected, actual):
+    """Identical figure JSON, key order included, except trendline y values, which need only agree to rounding."""
+    expected, actual = json.loads(expected.to_json()), json.loads(actual.to_json())
+    for want, got in zip(expected['data'], actual['data']):
+        if want['mode'] == 'lines' and 'y' in want:
+            np.testing.assert_allclose(decode(got['y']), decode(want['y']), rtol=1e-9)
+            want['y'] = got['y'] = None
+    assert json.dumps(actual) == json.dumps(expected)
+
+
+def catalog(n_rows):
+    rng = np.random.default_rng(3)
+    df = pd.DataFrame({'dlc_count': rng.poisson(2, n_rows), 'price': rng.uniform(0, 60, n_rows).round(2)})
+    df['engagement_score'] = 40 + 3 * df['dlc_count'] + rng.normal(0, 10, n_rows)
+    return df.assign(pricing_tier=data_analysis.pricing_tiers(df['price']))
+
+
+def test_scatter_matches_plotly_express():
+    # Under and over px's WebGL threshold, with and without color groups (at 3000 rows the
+    # Free tier is a single game, so its trendline is left empty)
+    for n_rows in (300, 3000):
+        df = catalog(n_rows)
+        kwargs = dict(x='price', y='engagement_score', color='pricing_tier', trendline='ols', title='Pricing',
+                      opacity=0.3, color_discrete_sequence=px.colors.qualitative.Set2)
+        assert_same_figure(px.scatter(df, **kwargs), figure_engine.scatter(df, **kwargs))
+        kwargs = dict(x='dlc_count', y='engagement_score', trendline='ols', color_discrete_sequence=['#38bdf8'],
+                      trendline_color_override='#f472b6')
+        assert_same_figure(px.scatter(df, **kwargs), figure_engine.scatter(df, **kwargs))
+
+
+def test_budgeted_scatter_matches_plotly_express():
+    df = catalog(5000)
+    kwargs = dict(x='price', y='engagement_score', color='pricing_tier', point_budget=500, trendline='ols',
+                  title='Pricing', opacity=0.3)
+    lean, reference = (data_analysis.budgeted_scatter(df, builder=builder, **kwargs) for builder in ('lean', 'px'))
+    for fig in (lean, reference):
+        fig.update_layout(yaxis_rangemode='tozero')
+        fig.add_annotation(x=0.02, y=0.98, xref="paper", yref="paper", text="β", showarrow=False)
+    assert_same_figure(reference, lean)
+    assert data_analysis.figure_json(lean) == data_analysis.figure_json(reference)
+
+
+def test_ols_matches_a_closed_form_fit():
+    x = np.array([0.0, 1, 2, 3, 4])
+    y = 2 * x + 1 + np.array([0.1, -0.1, 0.0, 0.1, -0.1])
+    intercept, slope, r2 = figure_engine.ols(x, y)
+    slope_ref, intercept_ref = np.polyfit(x, y, 1)
+    np.testing.assert_allclose([intercept, slope], [intercept_ref, slope_ref])
+    assert np.isclose(r2, np.corrcoef(x, y)[0, 1] ** 2)
@@ -0,0 +1,60 @@
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import StandardScaler
+
+from forest_engine import CompiledForest, compile_forest, save_forest
+
+
+def make_games(n, seed=0):
+    rng = np.random.default_rng(seed)
+    X = np.column_stack([
+        rng.choice([0, 4.99, 9.99, 19.99, 29.99, 59.99], n),  # price
+        rng.poisson(2, n) * (rng.random(n) < 0.5),            # dlc_count
+        rng.integers(2005, 2026, n),                          # release_year
+        np.where(rng.random(n) < 0.7, 0, rng.integers(40, 98, n)),  # metacritic_score
+    ]).astype(float)
+    y = 40 + 0.2 * X[:, 0] + 2 * np.log1p(X[:, 1]) + 0.1 * X[:, 3] + rng.normal(0, 5, n)
+    return X, y
+
+
+def test_compiled_forest_matches_sklearn(tmp_path):
+    X, y = make_games(4000)
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    scaler = StandardScaler().fit(X_train)
+    model = RandomForestRegressor(n_estimators=25, max_depth=10, random_state=42)
+    model.fit(scaler.transform(X_train), y_train)
+
+    path = tmp_path / 'rf_forest.joblib'
+    save_forest(compile_forest(model, scaler), path)
+    forest = CompiledForest.load(path)
+    assert isinstance(forest.threshold.base, np.memmap)  # mapped, not copied
+
+    expected = model.predict(scaler.transform(X_test))
+    np.testing.assert_allclose(forest.predict(X_test), expected, rtol=0, atol=1e-6)
+    assert forest.n_trees == 25
+
+
+def test_compiled_forest_rejects_wrong_width():
+    X, y = make_games(200)
+    model = RandomForestRegressor(n_estimators=3, random_state=0).fit(X, y)
+    forest = CompiledForest(compile_forest(model))
+    try:
+        forest.predict(X[:, :3])
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("expected a ValueError for a 3-column input")
+
+
+def test_compiled_boosting_matches_sklearn():
+    from sklearn.ensemble import HistGradientBoostingRegressor
+    from forest_engine import compile_model
+
+    X, y = make_games(4000)
+    scaler = StandardScaler().fit(X[:3000])
+    model = HistGradientBoostingRegressor(max_iter=40, random_state=0).fit(scaler.transform(X[:3000]), y[:3000])
+    forest = CompiledForest(compile_model(model, scaler))
+    expected = model.predict(scaler.transform(X[3000:]))
+    np.testing.assert_allclose(forest.predict(X[3000:]), expected, rtol=0, atol=1e-6)
+    assert forest.n_trees == model.n_iter_
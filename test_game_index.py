@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+import data_analysis
+from benchmarks.synthetic import write_steam_csv
+from game_index import GameIndex, build_game_index, save_game_index
+
+
+@pytest.fixture(scope='module')
+def catalog(tmp_path_factory):
+    tmp_path = tmp_path_factory.mktemp('catalog')
+    df = data_analysis.clean_data(write_steam_csv(tmp_path / 'games.csv', 5000))
+    path = str(tmp_path / 'game_index.joblib')
+    save_game_index(build_game_index(df), path)
+    # Reference order: a full sort, ties by catalog order
+    return df.iloc[np.argsort(-df['engagement_score'].to_numpy(), kind='stable')].reset_index(drop=True), \
+        GameIndex.load(path)
+
+
+def pages(index, limit, **filters):
+    ranks, cursor = index.query(limit=limit, **filters)
+    result = [ranks]
+    while cursor is not None:
+        ranks, cursor = index.query(limit=limit, cursor=cursor, **filters)
+        result.append(ranks)
+    return np.concatenate(result)
+
+
+@pytest.mark.parametrize('filters', [
+    {},
+    {'genre': 'indie'},
+    {'year_min': 2010, 'year_max': 2012},
+    {'genre': 'RPG', 'year_min': 2015, 'pricing': 'free'},
+    {'year_max': 2008, 'pricing': 'paid'},
+    {'genre': 'No Such Genre'},
+])
+def test_paged_queries_match_a_full_sort(catalog, filters):
+    ordered, index = catalog
+    mask = np.ones(len(ordered), dtype=bool)
+    if 'genre' in filters:
+        mask &= ordered['genres'].str.lower().str.contains(f"'{filters['genre'].lower()}'", regex=False).to_numpy()
+    mask &= ordered['release_year'].between(filters.get('year_min', 0), filters.get('year_max', 9999)).to_numpy()
+    if 'pricing' in filters:
+        mask &= (ordered['price'] == 0).to_numpy() == (filters['pricing'] == 'free')
+    np.testing.assert_array_equal(pages(index, 100, **filters), np.flatnonzero(mask))
+
+
+def test_records_and_cursor_validation(catalog, tmp_path):
+    ordered, index = catalog
+    ranks, cursor = index.query(limit=3)
+    records = index.records(ranks)
+    assert [r['rank'] for r in records] == [1, 2, 3]
+    assert [r['name'] for r in records] == ordered['name'].head(3).tolist()
+    assert records[0]['engagement_score'] == round(ordered['engagement_score'].iloc[0], 1)
+
+    with pytest.raises(ValueError, match="limit"):
+        index.query(limit=0)
+    with pytest.raises(ValueError, match="Malformed"):
+        index.query(cursor='not-a-cursor')
+    # A cursor only pages through the snapshot that issued it
+    rebuilt = build_game_index(ordered.assign(engagement_score=ordered['engagement_score'][::-1].to_numpy()))
+    with pytest.raises(ValueError, match="older snapshot"):
+        GameIndex(rebuilt).query(cursor=cursor)
+
+
+def test_an_empty_catalog_gives_an_empty_index(catalog, tmp_path):
+    ordered, _ = catalog
+    path = str(tmp_path / 'game_index.joblib')
+    save_game_index(build_game_index(ordered.iloc[:0]), path)
+    index = GameIndex.load(path)
+    for filters in ({}, {'genre': 'Indie'}, {'year_min': 2015, 'pricing': 'free'}):
+        ranks, cursor = index.query(limit=10, **filters)
+        assert len(ranks) == 0 and cursor is None
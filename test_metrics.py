@@ -0,0 +1,59 @@
+import time
+
+import numpy as np
+import pytest
+
+import metrics
+from metrics import Histogram, MetricsRegistry, PeakRSSSampler
+
+
+def test_histogram_buckets_are_cumulative():
+    h = Histogram([1, 10])
+    for value in [0.5, 1, 3, 50]:
+        h.observe(value)
+    snap = h.snapshot()
+    assert snap['buckets'] == {'1': 2, '10': 3, '+Inf': 4}
+    assert snap['max'] == 50 and snap['mean'] == pytest.approx(13.625)
+
+
+def test_registry_renders_prometheus_text():
+    registry = MetricsRegistry()
+    latency = registry.histogram('req_seconds', 'Latency', bounds=(0.1, 1), labelnames=('route',))
+    in_flight = registry.gauge('in_flight', 'In flight')
+    latency.labels('/a"b').observe(0.05)
+    latency.labels('/a"b').observe(2)
+    in_flight.inc()
+    in_flight.inc()
+    in_flight.dec()
+
+    @registry.collector
+    def collect():
+        yield 'counter', 'hits_total', 'Hits', [({}, 7)]
+
+    assert registry.render().splitlines() == [
+        '# HELP req_seconds Latency',
+        '# TYPE req_seconds histogram',
+        'req_seconds_bucket{route="/a\\"b",le="0.1"} 1',
+        'req_seconds_bucket{route="/a\\"b",le="1"} 1',
+        'req_seconds_bucket{route="/a\\"b",le="+Inf"} 2',
+        'req_seconds_sum{route="/a\\"b"} 2.05',
+        'req_seconds_count{route="/a\\"b"} 2',
+        '# HELP in_flight In flight',
+        '# TYPE in_flight gauge',
+        'in_flight 1',
+        '# HELP hits_total Hits',
+        '# TYPE hits_total counter',
+        'hits_total 7',
+    ]
+
+
+def test_peak_rss_sampler_sees_allocations():
+    if metrics.rss_bytes() is None:
+        pytest.skip("needs /proc")
+    with PeakRSSSampler() as idle:
+        pass
+    with PeakRSSSampler() as busy:
+        block = np.ones(64 << 20 >> 3)  # 64 MiB, touched
+        time.sleep(0.05)
+        del block
+    assert busy.peak - idle.peak > 32 << 20
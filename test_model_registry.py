@@ -0,0 +1,92 @@
+import os
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.preprocessing import StandardScaler
+
+import model_registry
+from forest_engine import compile_forest
+from model_registry import ModelRegistry, UnknownModelVersion, publish_model
+
+
+def train(seed, n_estimators=5):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(300, 4))
+    y = X @ [1.0, 2.0, 0.5, -1.0] + rng.normal(size=300)
+    scaler = StandardScaler().fit(X)
+    model = RandomForestRegressor(n_estimators=n_estimators, max_depth=4, random_state=seed)
+    model.fit(scaler.transform(X), y)
+    return model, scaler, compile_forest(model, scaler)
+
+
+def test_publish_dedupes_and_prunes(tmp_path):
+    registry_dir = tmp_path / 'models'
+    first = publish_model(*train(0), metrics={'r2_score': 0.5}, registry_dir=registry_dir, keep=2)
+    again = publish_model(*train(0), metrics={'r2_score': 0.6}, registry_dir=registry_dir, keep=2)
+    assert again == first
+    manifest = model_registry.read_manifest(registry_dir)
+    assert [entry['version'] for entry in manifest['versions']] == [first]
+    assert manifest['versions'][0]['metrics'] == {'r2_score': 0.6}
+
+    second = publish_model(*train(1), metrics={}, registry_dir=registry_dir, keep=2)
+    third = publish_model(*train(2), metrics={}, registry_dir=registry_dir, keep=2)
+    manifest = model_registry.read_manifest(registry_dir)
+    assert manifest['latest'] == third
+    assert [entry['version'] for entry in manifest['versions']] == [second, third]
+    assert not os.path.exists(registry_dir / first)
+    assert sorted(os.listdir(registry_dir)) == sorted([second, third, 'manifest.json'])
+
+
+def test_registry_swaps_to_new_versions_and_serves_pins(tmp_path):
+    registry_dir = tmp_path / 'models'
+    first = publish_model(*train(0), metrics={'r2_score': 0.5}, registry_dir=registry_dir)
+    registry = ModelRegistry(registry_dir, legacy_dir=tmp_path)
+    registry.refresh()
+    old = registry.get()
+    assert old.version == first and old.load_seconds > 0 and old.memory_bytes > 0
+    assert old.metrics == {'r2_score': 0.5}
+
+    second = publish_model(*train(1), metrics={}, registry_dir=registry_dir)
+    assert registry.get() is old  # nothing changes until the poller refreshes
+    registry.refresh()
+    assert registry.get().version == second
+    assert registry.get(first) is old  # still loaded, so pinning it costs nothing
+    with pytest.raises(UnknownModelVersion):
+        registry.get('nope')
+
+    described = registry.describe()
+    assert described['latest'] == second
+    assert [v['version'] for v in described['versions']] == [first, second]
+    assert all(v['loaded'] and v['memory_bytes'] > 0 for v in described['versions'])
+
+
+def test_registry_falls_back_to_legacy_artifacts(tmp_path):
+    import joblib
+    model, scaler, _ = train(0)
+    joblib.dump(model, tmp_path / 'rf_model.joblib')
+    joblib.dump(scaler, tmp_path / 'rf_scaler.joblib')
+    registry = ModelRegistry(tmp_path / 'models', legacy_dir=tmp_path)
+    registry.refresh()
+    legacy = registry.get()
+    assert legacy.version == 'legacy' and legacy.forest is None
+
+    # Publishing the first registry version replaces the legacy model
+    version = publish_model(*train(1), metrics={}, registry_dir=tmp_path / 'models')
+    registry.refresh()
+    assert registry.get().version == version
+    with pytest.raises(UnknownModelVersion):
+        registry.get('legacy')
+
+
+def test_versions_map_the_forest_and_load_estimators_on_demand(tmp_path):
+    version = publish_model(*train(0), metrics={}, registry_dir=tmp_path / 'models')
+    registry = ModelRegistry(tmp_path / 'models', legacy_dir=tmp_path)
+    mv = registry.get()  # no refresh yet: the first request loads the model itself
+    assert mv.version == version and mv.mapped_bytes > 0
+    assert not mv.describe()['estimators_loaded']
+
+    before = mv.memory_bytes
+    X = np.random.default_rng(0).normal(size=(10, 4))
+    np.testing.assert_allclose(mv.forest.predict(X), mv.model.predict(mv.scaler.transform(X)), atol=1e-6)
+    assert mv.describe()['estimators_loaded'] and mv.memory_bytes > before
@@ -0,0 +1,231 @@
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import pytest
+
+import data_analysis
+from benchmarks.synthetic import write_steam_csv
+from data_analysis import Stage, run_stages
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """Run pipeline stages inside a scratch directory so assets and models land there."""
+    monkeypatch.chdir(tmp_path)
+    os.makedirs(data_analysis.ASSETS_DIR)
+    return tmp_path
+
+
+@pytest.fixture
+def cleaned(workdir):
+    return data_analysis.clean_data(write_steam_csv(workdir / 'games.csv', 4000))
+
+
+def slow_stage(df):
+    time.sleep(0.05)
+    return {'a': 1}
+
+
+def test_fragments_merge_in_declaration_order():
+    stages = [
+        Stage('slow', slow_stage, inputs=('x',), outputs=('a',)),
+        Stage('fast', lambda df: {'b': len(df.columns)}, inputs=('x',), outputs=('b',)),
+        Stage('last', lambda: {'c': 3}, outputs=('c',), after=('slow', 'fast')),
+    ]
+    insights, timings = run_stages(pd.DataFrame({'x': [1], 'y': [2]}), stages, max_workers=3)
+    assert list(insights.items()) == [('a', 1), ('b', 1), ('c', 3)]
+    assert set(timings) == {'slow', 'fast', 'last'}
+
+
+def test_undeclared_outputs_are_rejected():
+    stages = [Stage('leaky', lambda: {'surprise': 1})]
+    with pytest.raises(ValueError, match='undeclared'):
+        run_stages(pd.DataFrame(), stages)
+
+
+def test_unsatisfiable_dependencies_are_rejected():
+    with pytest.raises(ValueError, match='Unsatisfiable'):
+        run_stages(pd.DataFrame(), [Stage('orphan', lambda: {}, after=('missing',))])
+
+
+def test_pipeline_stages_leave_the_frame_untouched(cleaned):
+    before = cleaned.copy()
+    insights, _ = run_stages(cleaned, data_analysis.STAGES, max_workers=4)
+    pd.testing.assert_frame_equal(cleaned, before)
+    declared = [key for stage in data_analysis.STAGES for key in stage.outputs]
+    assert list(insights) == declared
+    for stage in data_analysis.STAGES:
+        for name in stage.assets:
+            assert os.path.exists(os.path.join(data_analysis.ASSETS_DIR, name))
+
+
+def test_incremental_runs_skip_unchanged_stages():
+    calls = []
+
+    def count(df):
+        calls.append('count')
+        return {'n': int(df['x'].sum())}
+
+    def label():
+        calls.append('label')
+        return {'label': 'ok'}
+
+    stages = [Stage('count', count, inputs=('x',), outputs=('n',)),
+              Stage('label', label, outputs=('label',), after=('count',))]
+    df = pd.DataFrame({'x': [1, 2], 'y': [3, 4]})
+    state = {}
+    first, _ = run_stages(df, stages, state=state)
+
+    # Unused columns may change freely; nothing reruns and the fragments are reused
+    second, timings = run_stages(df.assign(y=[0, 0]), stages, state=state)
+    assert second == first and calls == ['count', 'label']
+    assert timings == {'count': None, 'label': None}
+
+    # Changing an input reruns the stage and, through its fingerprint, its dependents
+    third, _ = run_stages(df.assign(x=[5, 5]), stages, state=state)
+    assert third == {'n': 10, 'label': 'ok'} and calls[2:] == ['count', 'label']
+
+    run_stages(df.assign(x=[5, 5]), stages, state=state, force=('label',))
+    assert calls[4:] == ['label']
+
+    # --only keeps the other stages' last fragments even when they are stale
+    only, _ = run_stages(df, stages, state=state, force=('label',), only=('label',))
+    assert only == third and calls[5:] == ['label']
+
+
+PAID_FROM = 0.0
+
+
+def tier(price):
+    return 'paid' if price > PAID_FROM else 'free'
+
+
+def count_tiers(df):
+    return {'tiers': sorted(tier(price) for price in df['x'])}
+
+
+def test_changing_a_helper_or_its_constants_reruns_the_stage(monkeypatch):
+    stages = [Stage('tiers', count_tiers, inputs=('x',), outputs=('tiers',))]
+    df, state = pd.DataFrame({'x': [0.0, 5.0]}), {}
+    assert run_stages(df, stages, state=state)[0] == {'tiers': ['free', 'paid']}
+    assert run_stages(df, stages, state=state)[1] == {'tiers': None}
+
+    monkeypatch.setattr(sys.modules[__name__], 'PAID_FROM', 10.0)
+    assert run_stages(df, stages, state=state)[0] == {'tiers': ['free', 'free']}
+    monkeypatch.setattr(sys.modules[__name__], 'tier', lambda price: 'any')
+    assert run_stages(df, stages, state=state)[0] == {'tiers': ['any', 'any']}
+
+
+def test_missing_asset_forces_rerun(workdir):
+    calls = []
+
+    def chart(budget):
+        calls.append(('chart', budget))
+        with open(os.path.join(data_analysis.ASSETS_DIR, 'chart.json'), 'w') as f:
+            f.write('{}')
+        return {}
+
+    stages = [Stage('chart', chart, assets=('chart.json',), params={'budget': 10})]
+    state = {}
+    run_stages(pd.DataFrame(), stages, state=state)
+    run_stages(pd.DataFrame(), stages, state=state)
+    os.remove(os.path.join(data_analysis.ASSETS_DIR, 'chart.json'))
+    run_stages(pd.DataFrame(), stages, state=state)
+    run_stages(pd.DataFrame(), [Stage('chart', chart, assets=('chart.json',), params={'budget': 20})], state=state)
+    assert calls == [('chart', 10), ('chart', 10), ('chart', 20)]
+
+
+def test_scatter_sampling_keeps_outliers_and_strata():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({'x': rng.normal(size=20000), 'y': rng.normal(size=20000),
+                       'tier': np.where(np.arange(20000) < 50, 'rare', 'common')})
+    df.loc[7, ['x', 'y']] = [40.0, -40.0]
+    keep = data_analysis.sample_scatter_rows(df, 'x', 'y', 1000, strata='tier')
+    assert 900 < keep.sum() <= 1000
+    assert keep[7]
+    assert keep[:50].all()  # a small group fits under the per-cell cap and survives intact
+    np.testing.assert_array_equal(keep, data_analysis.sample_scatter_rows(df, 'x', 'y', 1000, strata='tier'))
+
+
+def test_budgeted_scatter_fits_trendlines_on_all_rows():
+    rng = np.random.default_rng(1)
+    df = pd.DataFrame({'x': rng.uniform(0, 10, 5000)})
+    df['y'] = 3 * df['x'] + rng.normal(size=5000)
+    full = px.scatter(df, x='x', y='y', trendline='ols')
+    fig = data_analysis.budgeted_scatter(df, x='x', y='y', point_budget=500, trendline='ols')
+    markers, line = fig.data
+    assert len(markers.x) <= 500 and markers.customdata is None
+    assert line.hovertemplate == full.data[1].hovertemplate
+    np.testing.assert_allclose(line.y, np.asarray(full.data[1].y)[[0, -1]])
+    assert data_analysis.budgeted_scatter(df, x='x', y='y', point_budget=5000, trendline='ols') == full
+
+
+def test_compact_typed_arrays_narrow_losslessly():
+    import base64
+
+    def spec(values):
+        return {'dtype': 'f8', 'bdata': base64.b64encode(np.asarray(values, dtype='<f8').tobytes()).decode()}
+
+    def decode(node):
+        return np.frombuffer(base64.b64decode(node['bdata']), dtype='<' + node['dtype'])
+
+    fig = {'data': [{'x': spec([2015, 2016, 2017]), 'y': spec([0.1, np.nan, 48.5965]),
+                     'z': spec([1e39, 1e-42, 0.5]), 'text': ['a', 'b']}]}
+    trace = data_analysis.compact_typed_arrays(fig)['data'][0]
+    assert trace['x']['dtype'] == 'i2' and decode(trace['x']).tolist() == [2015, 2016, 2017]
+    assert trace['y']['dtype'] == 'f4'
+    np.testing.assert_allclose(decode(trace['y']), [0.1, np.nan, 48.5965], rtol=1e-6)
+    assert trace['z'] == fig['data'][0]['z']  # out of float32 range, so it stays float64
+    assert trace['text'] == ['a', 'b']
+
+
+def test_shared_values_reach_dependents_and_rerun_with_them():
+    calls = []
+
+    def totals(df):
+        calls.append('totals')
+        return {'total': df['x'].sum()}
+
+    def report(total):
+        calls.append('report')
+        return {'report': int(total)}
+
+    def other():
+        calls.append('other')
+        return {'other': 1}
+
+    stages = [Stage('totals', totals, inputs=('x',), shared=('total',)),
+              Stage('report', report, outputs=('report',), after=('totals',)),
+              Stage('other', other, outputs=('other',))]
+    state = {}
+    insights, _ = run_stages(pd.DataFrame({'x': [1, 2]}), stages, state=state)
+    assert insights == {'report': 3, 'other': 1}
+
+    # Nothing changed: the provider is skipped along with its consumer
+    run_stages(pd.DataFrame({'x': [1, 2]}), stages, state=state)
+    assert sorted(calls) == ['other', 'report', 'totals']
+
+    # A forced consumer needs the shared value again, so its provider reruns too
+    insights, _ = run_stages(pd.DataFrame({'x': [1, 2]}), stages, state=state, force=('report',))
+    assert insights['report'] == 3 and calls[3:] == ['totals', 'report']
+
+
+def test_subsampled_training_is_reproducible_and_reported():
+    rng = np.random.default_rng(2)
+    X = rng.normal(size=(3000, 3))
+    y = 2 * X[:, 0] + rng.normal(scale=0.1, size=3000)
+    model, report = data_analysis.train_engagement_model(X, y, backend='hgb', train_rows=1000, seed=5)
+    assert report['n_train'] == 1000 and report['n_train_available'] == 3000
+    assert report['cv_scores'].mean() > 0.9
+    assert report['train_seconds'] >= report['cv_seconds'] + report['fit_seconds']
+
+    again, repeat = data_analysis.train_engagement_model(X, y, backend='hgb', train_rows=1000, seed=5)
+    np.testing.assert_array_equal(report['cv_scores'], repeat['cv_scores'])
+    np.testing.assert_array_equal(model.predict(X[:50]), again.predict(X[:50]))
+
+    # A generous budget keeps every row
+    assert data_analysis.budget_train_rows(X, y, 'hgb', 0, budget_seconds=60) == 3000
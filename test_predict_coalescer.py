@@ -0,0 +1,59 @@
+import threading
+import time
+
+import pytest
+
+from predict_coalescer import PredictionCoalescer
+
+
+class Recorder:
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, X, model):
+        self.batches.append((model, len(X)))
+        return X.sum(axis=1) * model
+
+
+def test_admitted_requests_share_one_batch():
+    score = Recorder()
+    coalescer = PredictionCoalescer(score, max_rows=64, max_delay=5.0)
+    tickets = [coalescer.admit() for _ in range(8)]
+    futures = [ticket.submit((i, 1.0), 1) for i, ticket in enumerate(tickets)]
+    assert [f.result(timeout=5) for f in futures] == [i + 1.0 for i in range(8)]
+    assert score.batches == [(1, 8)]
+    for ticket in tickets:
+        ticket.__exit__(None, None, None)
+
+    stats = coalescer.stats()
+    assert stats['batch_size']['count'] == 1 and stats['batch_size']['buckets']['8'] == 1
+    assert stats['queue_delay_ms']['count'] == 8
+
+
+def test_lone_and_departing_requests_do_not_wait():
+    coalescer = PredictionCoalescer(Recorder(), max_delay=5.0)
+    start = time.perf_counter()
+    assert coalescer.submit((1.0, 2.0), 1).result(timeout=5) == 3.0
+
+    # A request that leaves without submitting (cache hit, bad input) releases the batch
+    with coalescer.admit() as ticket:
+        other = coalescer.admit()
+        future = ticket.submit((1.0, 1.0), 1)
+        threading.Timer(0.05, other.__exit__, (None, None, None)).start()
+        assert future.result(timeout=5) == 2.0
+    assert time.perf_counter() - start < 2.0
+
+
+def test_models_are_scored_separately_and_errors_propagate():
+    score = Recorder()
+    coalescer = PredictionCoalescer(score, max_delay=5.0)
+    tickets = [coalescer.admit() for _ in range(3)]
+    a, b, c = (ticket.submit((1.0,), model) for ticket, model in zip(tickets, [1, 2, 1]))
+    assert (a.result(timeout=5), b.result(timeout=5), c.result(timeout=5)) == (1.0, 2.0, 1.0)
+    assert sorted(score.batches) == [(1, 2), (2, 1)]
+
+    def broken(X, model):
+        raise ValueError("bad model")
+    with pytest.raises(ValueError, match="bad model"):
+        PredictionCoalescer(broken).submit((1.0,), 1).result(timeout=5)
+
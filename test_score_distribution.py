@@ -0,0 +1,32 @@
+import numpy as np
+
+from score_distribution import ScoreDistribution, build_score_distribution, pricing_tier, pricing_tiers
+
+
+def exact(scores, score):
+    scores = np.asarray(scores)
+    return {'percentile': round(100 * np.mean(scores < score), 1), 'rank': int(np.sum(scores > score)) + 1,
+            'out_of': len(scores)}
+
+
+def test_small_groups_rank_exactly_and_large_ones_within_the_sketch(tmp_path):
+    rng = np.random.default_rng(0)
+    scores = np.round(rng.gamma(2.0, 10.0, 50_000).clip(0, 100), 1)
+    prices = rng.choice([0.0, 4.99, 29.99], len(scores))
+    genres = np.where(np.arange(len(scores)) < 300, 'Racing', 'Action')
+    path = str(tmp_path / 'score_distribution.json')
+    ScoreDistribution(build_score_distribution(scores, genres, pricing_tiers(prices))).save(path)
+    distribution = ScoreDistribution.load(path)
+    assert distribution.groups('pricing_tier') == ['Free', 'Low-cost (<$20)', 'Premium ($20+)']
+
+    racing = scores[:300]
+    for score in [-1.0, 0.0, racing.min(), 12.3, float(np.median(racing)), racing.max(), 101.0]:
+        assert distribution.rank(score, 'genre', 'racing') == {'group': 'Racing', **exact(racing, score)}
+
+    for score in [0.5, 7.0, 20.0, 45.5, 80.0]:
+        ranked, expected = distribution.rank(score), exact(scores, score)
+        assert abs(ranked['percentile'] - expected['percentile']) <= 0.2
+        assert abs(ranked['rank'] - expected['rank']) <= len(scores) / 500
+    free = distribution.rank(20.0, 'pricing_tier', pricing_tier(0))
+    assert free['out_of'] == np.sum(prices == 0)
+    assert distribution.rank(20.0, 'genre', 'Puzzle') is None
@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+import scipy.stats as stats
+
+import stats_engine
+
+
+def test_grouped_moments_match_pandas():
+    rng = np.random.default_rng(0)
+    values = rng.normal(50, 10, 5000)
+    values[::97] = np.nan
+    codes = rng.integers(-1, 4, 5000)
+    m = stats_engine.grouped_moments(values, codes, n_groups=5)
+
+    expected = pd.DataFrame({'v': values, 'g': codes})[codes >= 0].groupby('g')['v'].agg(['count', 'mean', 'var'])
+    np.testing.assert_array_equal(m.count[:4], expected['count'])
+    np.testing.assert_allclose(m.mean[:4], expected['mean'])
+    np.testing.assert_allclose(m.var[:4], expected['var'])
+    assert m.count[4] == 0 and np.isnan(m.mean[4])
+
+
+def test_effect_sizes_match_reference_formulas():
+    rng = np.random.default_rng(1)
+    x, y = rng.normal(1, 2, 800), rng.normal(0, 1, 1200)
+    a, b = stats_engine.moments(x), stats_engine.moments(y)
+
+    t_stat, p_val = stats_engine.welch_t_test(a, b)
+    expected_t, expected_p = stats.ttest_ind(x, y, equal_var=False)
+    np.testing.assert_allclose([t_stat, p_val], [expected_t, expected_p])
+
+    pooled = np.sqrt(((len(x) - 1) * np.std(x, ddof=1) ** 2 + (len(y) - 1) * np.std(y, ddof=1) ** 2) / (len(x) + len(y) - 2))
+    np.testing.assert_allclose(stats_engine.cohens_d(a, b), (x.mean() - y.mean()) / pooled)
+    np.testing.assert_allclose(stats_engine.normal_ci_margin(a, b),
+                               1.96 * np.sqrt(np.var(x, ddof=1) / len(x) + np.var(y, ddof=1) / len(y)))
+
+
+def test_bootstrap_is_seeded_and_independent_of_batch_size():
+    rng = np.random.default_rng(2)
+    x, y = rng.normal(1, 1, 3000), rng.normal(0, 1, 2000)
+    statistics = {'diff': stats_engine.mean_difference, 'd': stats_engine.cohens_d}
+    big = stats_engine.bootstrap_two_sample(x, y, statistics, n_resamples=2000)
+    small = stats_engine.bootstrap_two_sample(x, y, statistics, n_resamples=2000, max_batch_bytes=1 << 20)
+    assert big.intervals == small.intervals
+    assert big.n_resamples == 2000 and not big.truncated
+
+    # The percentile interval should sit close to the normal approximation here
+    low, high = big.intervals['diff']
+    margin = stats_engine.normal_ci_margin(stats_engine.moments(x), stats_engine.moments(y))
+    np.testing.assert_allclose([low, high], [x.mean() - y.mean() - margin, x.mean() - y.mean() + margin], atol=0.01)
+
+
+def test_bootstrap_stops_at_the_time_budget():
+    x, y = np.random.default_rng(3).random((2, 5000))
+    result = stats_engine.bootstrap_two_sample(x, y, {'diff': stats_engine.mean_difference},
+                                               n_resamples=10**7, time_budget=0.05, max_batch_bytes=1 << 20)
+    assert result.truncated and 0 < result.n_resamples < 10**7
+
+
+def test_group_cube_rollups_match_pandas_groupby():
+    rng = np.random.default_rng(4)
+    n = 20000
+    df = pd.DataFrame({
+        'year': rng.integers(2000, 2025, n).astype(float),
+        'tier': pd.cut(rng.random(n), [0, 0.3, 0.6, 0.9], labels=['low', 'mid', 'high']),  # ~10% NaN keys
+        'genre': rng.choice(['RPG', 'Indie', 'Action', 'Sports'], n),
+        'score': rng.normal(50, 10, n),
+    })
+    df.loc[::37, 'score'] = np.nan
+    cube = stats_engine.GroupCube.build(df, ['year', 'tier', 'genre'], ['score'])
+    assert len(cube) < n
+
+    for keys in (['year'], ['tier'], ['genre', 'year']):
+        rolled = cube.rollup(keys, 'score')
+        expected = df.groupby(keys, observed=False)['score'].agg(['mean', 'std', 'count']).reset_index()
+        pd.testing.assert_frame_equal(rolled[keys + ['count']], expected[keys + ['count']])
+        np.testing.assert_allclose(rolled['mean'], expected['mean'], rtol=1e-12)
+        np.testing.assert_allclose(rolled['std'], expected['std'], rtol=1e-12)
+
+    recent = cube.rollup(['genre'], 'score', where=lambda cells: cells['year'] >= 2015)
+    expected = df[df['year'] >= 2015].groupby('genre')['score'].agg(['mean', 'count']).reset_index()
+    np.testing.assert_array_equal(recent['count'], expected['count'])
+    np.testing.assert_allclose(recent['mean'], expected['mean'], rtol=1e-12)